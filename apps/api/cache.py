@@ -0,0 +1,71 @@
+"""Small thread-safe LRU cache with optional TTL, shared by the serving caches."""
+
+from __future__ import annotations
+
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Dict, Generic, Hashable, Optional, Tuple, TypeVar
+
+V = TypeVar('V')
+
+_MISSING = object()
+
+
+class LRUCache(Generic[V]):
+    """Bounded mapping that evicts least-recently-used entries and expires stale ones.
+
+    `ttl_s=None` keeps entries until evicted by size. Every lookup is counted so the
+    owner can expose hit rates through the metrics overview.
+    """
+
+    def __init__(self, max_entries: int, ttl_s: Optional[float] = None) -> None:
+        self.max_entries = max(1, max_entries)
+        self.ttl_s = ttl_s
+        self._data: 'OrderedDict[Hashable, Tuple[V, float]]' = OrderedDict()
+        self._lock = threading.Lock()
+        self._stats = {'hits': 0, 'misses': 0, 'evictions': 0, 'expirations': 0, 'invalidations': 0}
+
+    def get(self, key: Hashable, default: Any = None) -> Any:
+        now = time.monotonic()
+        with self._lock:
+            entry = self._data.get(key, _MISSING)
+            if entry is _MISSING:
+                self._stats['misses'] += 1
+                return default
+            value, expires_at = entry
+            if expires_at and expires_at <= now:
+                del self._data[key]
+                self._stats['expirations'] += 1
+                self._stats['misses'] += 1
+                return default
+            self._data.move_to_end(key)
+            self._stats['hits'] += 1
+            return value
+
+    def put(self, key: Hashable, value: V) -> None:
+        expires_at = time.monotonic() + self.ttl_s if self.ttl_s else 0.0
+        with self._lock:
+            self._data[key] = (value, expires_at)
+            self._data.move_to_end(key)
+            while len(self._data) > self.max_entries:
+                self._data.popitem(last=False)
+                self._stats['evictions'] += 1
+
+    def clear(self) -> None:
+        with self._lock:
+            self._data.clear()
+            self._stats['invalidations'] += 1
+
+    def __len__(self) -> int:
+        return len(self._data)
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            lookups = self._stats['hits'] + self._stats['misses']
+            return {
+                **self._stats,
+                'size': len(self._data),
+                'max_entries': self.max_entries,
+                'hit_rate': round(self._stats['hits'] / lookups, 4) if lookups else 0.0,
+            }
@@ -31,6 +31,7 @@ class AppSettings(BaseSettings):
 
     # API
     port: int = Field(default=8080, alias='PORT')
+    api_workers: int = Field(default=1, alias='API_WORKERS')
 
     # Database
     postgres_host: str = Field(default='postgres', alias='POSTGRES_HOST')
@@ -50,21 +51,78 @@ class AppSettings(BaseSettings):
     aws_access_key_id: Optional[str] = Field(default=None, alias='AWS_ACCESS_KEY_ID')
     aws_secret_access_key: Optional[str] = Field(default=None, alias='AWS_SECRET_ACCESS_KEY')
 
+    # Model lifecycle
+    model_cache_dir: Path = Field(default=Path('/tmp/model_artifacts'), alias='MODEL_CACHE_DIR')
+    model_cache_max_bytes: int = Field(default=2 * 1024**3, alias='MODEL_CACHE_MAX_BYTES')
+    model_boot_mode: Literal['mlflow', 'cache_first'] = Field(default='mlflow', alias='MODEL_BOOT_MODE')
+    model_watch_interval_s: float = Field(default=60.0, alias='MODEL_WATCH_INTERVAL_S')  # 0 disables hot swap
+
+    # Classifier serving
+    classifier_batch_max_size: int = Field(default=64, alias='CLASSIFIER_BATCH_MAX_SIZE')
+    classifier_batch_max_wait_ms: float = Field(default=2.0, alias='CLASSIFIER_BATCH_MAX_WAIT_MS')
+    classifier_compiled_preprocessing: bool = Field(default=True, alias='CLASSIFIER_COMPILED_PREPROCESSING')
+    prediction_cache_max_entries: int = Field(default=0, alias='PREDICTION_CACHE_MAX_ENTRIES')  # 0 disables
+    prediction_cache_ttl_s: float = Field(default=3600.0, alias='PREDICTION_CACHE_TTL_S')
+    classifier_pool_workers: int = Field(default=4, alias='CLASSIFIER_POOL_WORKERS')
+    classifier_process_workers: int = Field(default=0, alias='CLASSIFIER_PROCESS_WORKERS')
+    classifier_process_min_batch: int = Field(default=2000, alias='CLASSIFIER_PROCESS_MIN_BATCH')
+
     # Kafka
     kafka_bootstrap_servers: Optional[str] = Field(default=None, alias='KAFKA_BOOTSTRAP_SERVERS')
     kafka_topic_predictions: str = Field(default='predictions', alias='KAFKA_TOPIC_PREDICTIONS')
+    kafka_queue_max_size: int = Field(default=10000, alias='KAFKA_QUEUE_MAX_SIZE')
+    kafka_overflow_policy: Literal['drop_oldest', 'block'] = Field(
+        default='drop_oldest', alias='KAFKA_OVERFLOW_POLICY'
+    )
+    kafka_block_timeout_ms: float = Field(default=50.0, alias='KAFKA_BLOCK_TIMEOUT_MS')
+    kafka_linger_ms: int = Field(default=20, alias='KAFKA_LINGER_MS')
+    kafka_batch_size: int = Field(default=262144, alias='KAFKA_BATCH_SIZE')
+    kafka_compression_type: str = Field(default='lz4', alias='KAFKA_COMPRESSION_TYPE')
+    kafka_poll_interval_ms: float = Field(default=100.0, alias='KAFKA_POLL_INTERVAL_MS')
+    kafka_flush_timeout_s: float = Field(default=10.0, alias='KAFKA_FLUSH_TIMEOUT_S')
 
     # RAG / LLM
     rag_docs_path: Path = Field(default=Path('rag/docs'), alias='RAG_DOCS_PATH')
     rag_vectorstore_path: Path = Field(default=Path('chroma_db'), alias='RAG_VECTORSTORE_PATH')
+    rag_collections_path: Path = Field(default=Path('rag/collections'), alias='RAG_COLLECTIONS_PATH')  # one subdir per collection
+    rag_collections_vectorstore_path: Path = Field(default=Path('chroma_collections'), alias='RAG_COLLECTIONS_VECTORSTORE_PATH')
+    rag_max_resident_collections: int = Field(default=4, alias='RAG_MAX_RESIDENT_COLLECTIONS')  # besides the default
     rag_top_k: int = Field(default=3, alias='RAG_TOP_K')
+    rag_retrieval_mode: Literal['vector', 'lexical', 'hybrid', 'auto'] = Field(default='vector', alias='RAG_RETRIEVAL_MODE')
+    rag_vector_backend: Literal['chroma', 'numpy'] = Field(default='chroma', alias='RAG_VECTOR_BACKEND')
+    rag_numpy_dtype: Literal['float32', 'float16', 'int8'] = Field(default='float32', alias='RAG_NUMPY_DTYPE')
+    rag_query_cache_max_entries: int = Field(default=1024, alias='RAG_QUERY_CACHE_MAX_ENTRIES')  # 0 disables
+    rag_retrieval_cache_max_entries: int = Field(default=1024, alias='RAG_RETRIEVAL_CACHE_MAX_ENTRIES')  # 0 disables
+    rag_context_token_budget: int = Field(default=1024, alias='RAG_CONTEXT_TOKEN_BUDGET')  # 0 = unlimited
+    rag_context_mmr_lambda: float = Field(default=1.0, alias='RAG_CONTEXT_MMR_LAMBDA')  # <1 enables MMR re-ranking
+    rag_answer_cache_max_entries: int = Field(default=0, alias='RAG_ANSWER_CACHE_MAX_ENTRIES')  # 0 disables
+    rag_answer_cache_threshold: float = Field(default=0.95, alias='RAG_ANSWER_CACHE_THRESHOLD')  # min cosine similarity
+    rag_answer_cache_ttl_s: float = Field(default=3600.0, alias='RAG_ANSWER_CACHE_TTL_S')
+    rag_embedding_cache_dir: Path = Field(default=Path('embedding_cache'), alias='RAG_EMBEDDING_CACHE_DIR')
+    rag_embed_batch_size: int = Field(default=64, alias='RAG_EMBED_BATCH_SIZE')
+    rag_embed_processes: int = Field(default=0, alias='RAG_EMBED_PROCESSES')  # >1 encodes cache misses in a process pool
+    rag_split_processes: int = Field(default=0, alias='RAG_SPLIT_PROCESSES')  # >0 loads/splits files in a process pool
+    rag_ingest_batch_size: int = Field(default=256, alias='RAG_INGEST_BATCH_SIZE')  # chunks per upsert + checkpoint
     embedding_model_name: str = Field(
         default='sentence-transformers/all-MiniLM-L6-v2',
         alias='EMBEDDING_MODEL_NAME',
     )
+    llm_pool_workers: int = Field(default=8, alias='LLM_POOL_WORKERS')
+    llm_warmup_on_startup: bool = Field(default=True, alias='LLM_WARMUP_ON_STARTUP')
     llm_provider: Literal['sherlock', 'google'] = Field(default='sherlock', alias='LLM_PROVIDER')
+    llm_max_concurrency: int = Field(default=16, alias='LLM_MAX_CONCURRENCY')
+    llm_timeout_s: float = Field(default=30.0, alias='LLM_TIMEOUT_S')
+    sherlock_delay_ms: float = Field(default=0.0, alias='SHERLOCK_DELAY_MS')  # simulated generation time for the mock
     google_api_key: Optional[str] = Field(default=None, alias='GOOGLE_API_KEY')
 
+    # Metrics
+    metrics_windows_s: str = Field(default='60,300', alias='METRICS_WINDOWS_S')  # comma-separated trailing windows
+    metrics_slice_s: float = Field(default=10.0, alias='METRICS_SLICE_S')  # window granularity
+    metrics_stripes: int = Field(default=8, alias='METRICS_STRIPES')  # independently locked shards per histogram
+    metrics_stage_timing: bool = Field(default=True, alias='METRICS_STAGE_TIMING')  # per-stage histograms
+    metrics_multiproc_dir: Optional[Path] = Field(default=None, alias='METRICS_MULTIPROC_DIR')  # unset: per-process /metrics
+    metrics_publish_interval_s: float = Field(default=5.0, alias='METRICS_PUBLISH_INTERVAL_S')
+
     @property
     def resolved_postgres_dsn(self) -> str:
         if self.postgres_dsn:
@@ -1,13 +1,22 @@
 import logging
+from contextlib import asynccontextmanager
+
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import JSONResponse
 
 from .config.settings import get_settings
+from .timing import StageTimingMiddleware
 from .routers.classifier import router as classifier_router
 from .routers.llm import router as llm_router
 from .routers.meta import router as meta_router
 from .routers.metrics import router as metrics_router
-from .schemas import HealthResponse
+from .schemas import HealthResponse, ReadinessResponse
+from .services.executors import get_executor_pools
+from .services.llm_orchestrator import llm_warmup_status, warmup_llm_orchestrator
+from .services.metrics_collector import metrics_collector
+from .services.model_service import get_model_service
+from .services.prometheus import MetricsPublisher, get_metrics_store
 
 settings = get_settings()
 
@@ -17,10 +26,32 @@ logging.basicConfig(
 )
 logger = logging.getLogger(__name__)
 
+
+@asynccontextmanager
+async def lifespan(_: FastAPI):
+    if settings.llm_warmup_on_startup:
+        # Off the event loop: /health answers immediately while /ready waits for the warmup.
+        get_executor_pools().llm.submit(warmup_llm_orchestrator)
+    # Started here, i.e. in each worker after the fork, like the other background threads.
+    store = get_metrics_store()
+    publisher = MetricsPublisher(store, metrics_collector, settings.metrics_publish_interval_s) if store else None
+    if publisher is not None:
+        publisher.start()
+    yield
+    if publisher is not None:
+        publisher.stop()
+    # Only tear down the model service if a request actually created it.
+    if get_model_service.cache_info().currsize:
+        get_model_service().close()
+    if get_executor_pools.cache_info().currsize:
+        get_executor_pools().shutdown()
+
+
 app = FastAPI(
     title=settings.app_name,
     description='ML/LLM/MLOps demo per PRD',
-    version='0.1.0'
+    version='0.1.0',
+    lifespan=lifespan,
 )
 
 app.add_middleware(
@@ -30,6 +61,7 @@ app.add_middleware(
     allow_methods=['*'],
     allow_headers=['*']
 )
+app.add_middleware(StageTimingMiddleware)
 
 app.include_router(classifier_router)
 app.include_router(llm_router)
@@ -40,6 +72,16 @@ app.include_router(meta_router)
 async def health():
     return HealthResponse()
 
+@app.get('/ready', response_model=ReadinessResponse)
+async def ready():
+    llm = llm_warmup_status()
+    if not settings.llm_warmup_on_startup and llm['state'] == 'pending':
+        llm['state'] = 'disabled'
+    checks = {'llm': llm}
+    is_ready = all(check['state'] in ('ready', 'disabled') for check in checks.values())
+    payload = ReadinessResponse(ready=is_ready, checks=checks)
+    return JSONResponse(payload.model_dump(), status_code=200 if is_ready else 503)
+
 if __name__ == '__main__':
     import uvicorn
     uvicorn.run(app, host='0.0.0.0', port=settings.port)
@@ -1,7 +1,15 @@
+import asyncio
 import time
 from fastapi import APIRouter, HTTPException, Depends
-from ..schemas import ClassifierRequest, ClassifierResponse
+from ..schemas import (
+    ClassifierBatchItem,
+    ClassifierBatchRequest,
+    ClassifierBatchResponse,
+    ClassifierRequest,
+    ClassifierResponse,
+)
 from ..services.model_service import ModelService, get_model_service
+from ..services.executors import get_executor_pools
 from ..services.metrics_collector import metrics_collector
 
 router = APIRouter(prefix='/predict', tags=['predict'])
@@ -10,16 +18,37 @@ router = APIRouter(prefix='/predict', tags=['predict'])
 async def predict_classifier(request: ClassifierRequest, service: ModelService = Depends(get_model_service)):
     start = time.time()
     try:
-        prediction, proba, latency_ms, event_id = service.predict(request.features)
+        result = await asyncio.wrap_future(service.submit(request.features))
         metrics_collector.record('classifier', (time.time() - start) * 1000, success=True)
         return ClassifierResponse(
-            prediction=prediction,
-            proba=proba,
-            model_version=service.version,
-            latency_ms=latency_ms,
+            prediction=result.prediction,
+            proba=result.proba,
+            model_version=result.model_version,
+            latency_ms=result.latency_ms,
             artifact_source=service.artifact_source,
-            event_id=event_id,
+            event_id=result.event_id,
+            cached=result.cached,
         )
     except Exception as e:
         metrics_collector.record('classifier', (time.time() - start) * 1000, success=False)
         raise HTTPException(status_code=500, detail=str(e))
+
+@router.post('/classifier/batch', response_model=ClassifierBatchResponse)
+async def predict_classifier_batch(request: ClassifierBatchRequest, service: ModelService = Depends(get_model_service)):
+    start = time.time()
+    try:
+        batch = await get_executor_pools().classifier.run(service.predict_batch, request.items)
+    except Exception as e:
+        metrics_collector.record('classifier_batch', (time.time() - start) * 1000, success=False)
+        raise HTTPException(status_code=500, detail=str(e)) from e
+    metrics_collector.record('classifier_batch', (time.time() - start) * 1000, success=True)
+    items = [ClassifierBatchItem(**result) for result in batch.results]
+    failed = sum(1 for item in items if item.error)
+    return ClassifierBatchResponse(
+        results=items,
+        model_version=batch.model_version,
+        latency_ms=batch.latency_ms,
+        artifact_source=service.artifact_source,
+        succeeded=len(items) - failed,
+        failed=failed,
+    )
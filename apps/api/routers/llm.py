@@ -1,21 +1,130 @@
+import asyncio
+import json
 import time
+from typing import AsyncIterator, Generator, Optional, Tuple
 
 from fastapi import APIRouter, Depends, HTTPException
+from fastapi.responses import StreamingResponse
 
-from ..schemas import LLMRequest, LLMResponse
-from ..services.llm_orchestrator import LLMOrchestrator
+from rag.config import DEFAULT_COLLECTION, UnknownCollection
+
+from ..schemas import LLMBatchItem, LLMBatchRequest, LLMBatchResponse, LLMRequest, LLMResponse
+from ..services.executors import get_executor_pools
+from ..services.llm_orchestrator import LLMOrchestrator, get_llm_orchestrator
 from ..services.metrics_collector import metrics_collector
 
 router = APIRouter(prefix='/predict', tags=['llm'])
 
 
 @router.post('/llm', response_model=LLMResponse)
-async def predict_llm(request: LLMRequest, service: LLMOrchestrator = Depends(LLMOrchestrator)):
+async def predict_llm(request: LLMRequest, service: LLMOrchestrator = Depends(get_llm_orchestrator)):
     start = time.time()
     try:
-        response = service.query(request.query)
+        response = await service.aquery(request.query, request.retrieval_mode, request.collection)
         metrics_collector.record('llm', (time.time() - start) * 1000, success=True)
         return response
+    except UnknownCollection as exc:
+        metrics_collector.record('llm', (time.time() - start) * 1000, success=False)
+        raise HTTPException(status_code=404, detail=str(exc)) from exc
+    except asyncio.TimeoutError as exc:
+        metrics_collector.record('llm', (time.time() - start) * 1000, success=False)
+        raise HTTPException(status_code=504, detail='LLM provider timed out') from exc
     except Exception as exc:  # noqa: BLE001 - we want to capture all errors for telemetry
         metrics_collector.record('llm', (time.time() - start) * 1000, success=False)
         raise HTTPException(status_code=500, detail=str(exc)) from exc
+
+
+@router.post('/llm/batch', response_model=LLMBatchResponse)
+async def predict_llm_batch(request: LLMBatchRequest, service: LLMOrchestrator = Depends(get_llm_orchestrator)):
+    """Answer several queries at once; one query failing is reported in its item, not as a request error."""
+
+    start = time.time()
+    try:
+        payloads = await service.abatch(request.queries, request.retrieval_mode, request.collection)
+    except UnknownCollection as exc:
+        metrics_collector.record('llm_batch', (time.time() - start) * 1000, success=False)
+        raise HTTPException(status_code=404, detail=str(exc)) from exc
+    except Exception as exc:  # noqa: BLE001 - we want to capture all errors for telemetry
+        metrics_collector.record('llm_batch', (time.time() - start) * 1000, success=False)
+        raise HTTPException(status_code=500, detail=str(exc)) from exc
+    latency_ms = (time.time() - start) * 1000
+    metrics_collector.record('llm_batch', latency_ms, success=True)
+    items = [
+        LLMBatchItem(index=index, error=_batch_error(payload))
+        if isinstance(payload, BaseException)
+        else LLMBatchItem(index=index, **{key: payload[key] for key in LLMBatchItem.model_fields.keys() & payload.keys()})
+        for index, payload in enumerate(payloads)
+    ]
+    failed = sum(1 for item in items if item.error)
+    return LLMBatchResponse(
+        results=items,
+        latency_ms=latency_ms,
+        model_provider=service.llm_provider,
+        collection=request.collection or DEFAULT_COLLECTION,
+        succeeded=len(items) - failed,
+        failed=failed,
+    )
+
+
+def _batch_error(exc: BaseException) -> str:
+    if isinstance(exc, asyncio.TimeoutError):
+        return 'LLM provider timed out'
+    return str(exc) or type(exc).__name__
+
+
+def _close_stream(events: Generator[Tuple[str, dict], None, None], pending: Optional[asyncio.Future]) -> None:
+    """Close `events` and the provider stream behind it, once no pool thread is still inside it."""
+
+    if pending is None or pending.done():
+        events.close()
+    else:
+        pending.add_done_callback(lambda _: events.close())
+
+
+def _sse(event: str, data: dict) -> str:
+    return f'event: {event}\ndata: {json.dumps(data)}\n\n'
+
+
+@router.post('/llm/stream')
+async def predict_llm_stream(request: LLMRequest, service: LLMOrchestrator = Depends(get_llm_orchestrator)):
+    """Server-sent events: `sources`, then `token`s as the provider emits them, then `done` (or `error`)."""
+
+    try:
+        service.collections.get(request.collection)
+    except UnknownCollection as exc:
+        raise HTTPException(status_code=404, detail=str(exc)) from exc
+    pool = get_executor_pools().llm
+    timeout_s = service.settings.llm_timeout_s
+    events: Generator[Tuple[str, dict], None, None] = service.query_stream(request.query, request.retrieval_mode, request.collection)
+
+    async def _stream() -> AsyncIterator[str]:
+        start = time.time()
+        pending: Optional[asyncio.Future] = None
+        try:
+            # The stream holds a generation slot for its whole life, like /predict/llm.
+            async with service.generation_slot():
+                while True:
+                    # Each step blocks on retrieval or the provider, so pull events on the LLM pool.
+                    # The step is shielded: on timeout or disconnect it finishes in the background.
+                    pending = asyncio.wrap_future(pool.submit(next, events, None))
+                    item = await asyncio.wait_for(asyncio.shield(pending), timeout_s)
+                    if item is None:
+                        break
+                    yield _sse(*item)
+        except asyncio.TimeoutError:
+            metrics_collector.record('llm_stream', (time.time() - start) * 1000, success=False)
+            yield _sse('error', {'detail': 'LLM provider timed out'})
+            return
+        except Exception as exc:  # noqa: BLE001 - headers are already sent; report in-band
+            metrics_collector.record('llm_stream', (time.time() - start) * 1000, success=False)
+            yield _sse('error', {'detail': str(exc)})
+            return
+        finally:
+            _close_stream(events, pending)
+        metrics_collector.record('llm_stream', (time.time() - start) * 1000, success=True)
+
+    return StreamingResponse(
+        _stream(),
+        media_type='text/event-stream',
+        headers={'Cache-Control': 'no-cache', 'X-Accel-Buffering': 'no'},
+    )
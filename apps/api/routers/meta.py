@@ -4,6 +4,7 @@ from pathlib import Path
 from fastapi import APIRouter, Depends
 
 from ..config.settings import AppSettings, get_settings
+from ..services.llm_orchestrator import llm_warmup_status, rag_collections_status
 
 router = APIRouter(prefix='/meta', tags=['meta'])
 
@@ -42,7 +43,7 @@ async def get_architecture(settings: AppSettings = Depends(get_settings)):
             'port': settings.port,
         },
         'services': [
-            {'name': 'api', 'tech': 'FastAPI', 'endpoints': ['health', 'predict/classifier', 'predict/llm', 'metrics/overview', 'meta/architecture']},
+            {'name': 'api', 'tech': 'FastAPI', 'endpoints': ['health', 'predict/classifier', 'predict/classifier/batch', 'predict/llm', 'predict/llm/batch', 'predict/llm/stream', 'metrics', 'metrics/overview', 'meta/architecture', 'ready']},
             {'name': 'postgres', 'port': settings.postgres_port, 'purpose': 'metrics + logging'},
             {'name': 'kafka', 'bootstrap_servers': settings.kafka_bootstrap_servers, 'purpose': 'stream predictions'},
             {'name': 'mlflow', 'tracking_uri': settings.mlflow_tracking_uri, 'purpose': 'model registry + artifacts'},
@@ -61,9 +62,13 @@ async def get_architecture(settings: AppSettings = Depends(get_settings)):
                 'provider': settings.llm_provider,
                 'embedding_model': settings.embedding_model_name,
                 'vector_store_path': str(settings.rag_vectorstore_path),
+                'vector_backend': settings.rag_vector_backend,
                 'docs_path': str(settings.rag_docs_path),
                 'docs_indexed': docs_count,
                 'vectorstore_ready': vector_ready,
+                'warmup': llm_warmup_status(),
+                'collections': rag_collections_status(settings),
+                'max_resident_collections': settings.rag_max_resident_collections,
             },
         },
         'dependencies': {
@@ -1,10 +1,19 @@
 from fastapi import APIRouter, Depends
+from fastapi.responses import PlainTextResponse
 
 from ..services.metrics_service import MetricsService
+from ..services.prometheus import CONTENT_TYPE, exposition, get_metrics_store
 
 router = APIRouter(prefix='/metrics', tags=['metrics'])
 
 
+@router.get('', response_class=PlainTextResponse)
+async def get_metrics_prometheus():
+    """Prometheus text exposition, merged across workers when `METRICS_MULTIPROC_DIR` is set."""
+
+    return PlainTextResponse(exposition(get_metrics_store()), media_type=CONTENT_TYPE)
+
+
 @router.get('/overview')
 async def get_metrics_overview(service: MetricsService = Depends(MetricsService)):
     return service.get_overview()
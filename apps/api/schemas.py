@@ -1,5 +1,5 @@
-from typing import Dict, Any, Optional
-from pydantic import BaseModel
+from typing import Dict, Any, Literal, Optional
+from pydantic import BaseModel, Field
 from typing_extensions import List
 
 class ClassifierRequest(BaseModel):
@@ -12,10 +12,34 @@ class ClassifierResponse(BaseModel):
     latency_ms: float
     artifact_source: str
     event_id: Optional[str] = None
+    cached: bool = False
+
+class ClassifierBatchRequest(BaseModel):
+    items: List[Dict[str, Any]] = Field(..., min_length=1)
+
+class ClassifierBatchItem(BaseModel):
+    index: int
+    prediction: Optional[int] = None
+    proba: Optional[float] = None
+    event_id: Optional[str] = None
+    cached: bool = False
+    error: Optional[str] = None
+
+class ClassifierBatchResponse(BaseModel):
+    results: List[ClassifierBatchItem]
+    model_version: str
+    latency_ms: float
+    artifact_source: str
+    succeeded: int
+    failed: int
 
 class HealthResponse(BaseModel):
     status: str = 'ok'
 
+class ReadinessResponse(BaseModel):
+    ready: bool
+    checks: Dict[str, Dict[str, Any]]
+
 class MetricsResponse(BaseModel):
     total_predictions: int
     churn_rate: float
@@ -23,6 +47,13 @@ class MetricsResponse(BaseModel):
 
 class LLMRequest(BaseModel):
     query: str
+    retrieval_mode: Optional[Literal['vector', 'lexical', 'hybrid', 'auto']] = None
+    collection: Optional[str] = None  # named knowledge base; defaults to the primary one
+
+class LLMBatchRequest(BaseModel):
+    queries: List[str] = Field(..., min_length=1)
+    retrieval_mode: Optional[Literal['vector', 'lexical', 'hybrid', 'auto']] = None
+    collection: Optional[str] = None
 
 class LLMResponse(BaseModel):
     answer: str
@@ -32,3 +63,28 @@ class LLMResponse(BaseModel):
     model_provider: str
     embedding_model: str
     context_tokens_estimate: int
+    context_tokens_saved: int = 0
+    retrieval_path: Optional[str] = None
+    collection: str = 'default'
+    from_cache: bool = False
+    cache_similarity: Optional[float] = None
+
+class LLMBatchItem(BaseModel):
+    index: int
+    answer: Optional[str] = None
+    sources: List[str] = Field(default_factory=list)
+    llm_tier: Optional[str] = None
+    latency_ms: Optional[float] = None
+    context_tokens_estimate: Optional[int] = None
+    context_tokens_saved: Optional[int] = None
+    retrieval_path: Optional[str] = None
+    from_cache: bool = False
+    error: Optional[str] = None
+
+class LLMBatchResponse(BaseModel):
+    results: List[LLMBatchItem]
+    latency_ms: float
+    model_provider: str
+    collection: str
+    succeeded: int
+    failed: int
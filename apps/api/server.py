@@ -0,0 +1,209 @@
+"""Pre-fork multi-worker launcher for the API.
+
+`uvicorn --workers N` spawns fresh interpreters, so every worker imports pandas,
+MLflow and LightGBM and loads its own copy of the Production model. This launcher
+instead imports the app and loads the model once in the master, freezes the GC
+(so collections in the workers do not write to the shared objects' headers), binds
+the listening socket, and then forks the workers. Pages the workers never write to
+stay shared copy-on-write.
+
+Threads do not survive `fork()`, so the master deliberately starts none: the Kafka
+publisher, micro-batcher, prediction cache and model watcher are created inside each
+worker by `get_model_service()`.
+
+Usage::
+
+    python -m apps.api.server --workers 4            # preload (default)
+    python -m apps.api.server --workers 4 --no-preload
+"""
+
+from __future__ import annotations
+
+import argparse
+import gc
+import logging
+import os
+import signal
+import socket
+import sys
+import tempfile
+import time
+from pathlib import Path
+from typing import Dict, List, Optional, Sequence
+
+from apps.api.config.settings import get_settings
+
+logger = logging.getLogger('apps.api.server')
+
+# Minimum delay between respawns so a worker that crashes on boot cannot spin the master.
+RESPAWN_BACKOFF_S = 1.0
+
+
+def worker_memory(pid: int) -> Dict[str, int]:
+    """Return rss/pss/shared/private memory of `pid` in bytes (Linux only).
+
+    PSS divides each shared page between the processes mapping it, so summing PSS
+    across workers gives their true combined footprint; RSS double-counts shared pages.
+    """
+
+    fields = {'Rss': 'rss', 'Pss': 'pss', 'Shared_Clean': 'shared', 'Shared_Dirty': 'shared',
+              'Private_Clean': 'private', 'Private_Dirty': 'private'}
+    usage = {'rss': 0, 'pss': 0, 'shared': 0, 'private': 0}
+    for line in Path(f'/proc/{pid}/smaps_rollup').read_text().splitlines():
+        name, _, rest = line.partition(':')
+        if name in fields:
+            usage[fields[name]] += int(rest.split()[0]) * 1024
+    return usage
+
+
+def child_pids(pid: int) -> List[int]:
+    """Direct children of `pid`, read from /proc (Linux only)."""
+
+    path = Path(f'/proc/{pid}/task/{pid}/children')
+    return [int(child) for child in path.read_text().split()]
+
+
+def _bind(host: str, port: int, backlog: int = 2048) -> socket.socket:
+    family = socket.AF_INET6 if ':' in host else socket.AF_INET
+    sock = socket.socket(family, socket.SOCK_STREAM)
+    sock.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+    sock.bind((host, port))
+    sock.listen(backlog)
+    sock.set_inheritable(True)
+    return sock
+
+
+def _preload() -> None:
+    from apps.api.main import app  # noqa: F401 - import the full dependency graph before forking
+    from apps.api.services.model_service import preload_model_service
+
+    try:
+        service = preload_model_service()
+        logger.info('Preloaded model %s in master %s', service.version, os.getpid())
+    except Exception as exc:  # noqa: BLE001 - workers fall back to loading lazily
+        logger.warning('Could not preload model in master; workers will load their own copy: %s', exc)
+    gc.collect()
+    gc.freeze()
+
+
+def _run_worker(sock: socket.socket, log_level: str) -> None:
+    import uvicorn
+
+    from apps.api.main import app
+    from apps.api.services.model_service import get_model_service
+
+    service = get_model_service()
+    logger.info('Worker %s ready (model %s)', os.getpid(), service.version)
+    config = uvicorn.Config(app, log_level=log_level.lower(), lifespan='on')
+    uvicorn.Server(config).run(sockets=[sock])
+
+
+class PreforkServer:
+    """Fork `workers` copies of the app onto one shared listening socket and keep them alive."""
+
+    def __init__(self, host: str, port: int, workers: int, preload: bool = True, log_level: str = 'INFO') -> None:
+        self.host = host
+        self.port = port
+        self.workers = max(1, workers)
+        self.preload = preload
+        self.log_level = log_level
+        self._children: Dict[int, float] = {}
+        self._stopping = False
+        self._sock: Optional[socket.socket] = None
+
+    def run(self) -> int:
+        self._prepare_metrics_dir()
+        if self.preload:
+            _preload()
+        self._sock = _bind(self.host, self.port)
+        logger.info(
+            'Serving on %s:%s with %d workers (preload=%s, master %s)',
+            self.host, self.port, self.workers, self.preload, os.getpid(),
+        )
+        signal.signal(signal.SIGTERM, self._handle_stop)
+        signal.signal(signal.SIGINT, self._handle_stop)
+        for _ in range(self.workers):
+            self._spawn()
+        return self._supervise()
+
+    def _prepare_metrics_dir(self) -> None:
+        """Give the workers an empty shared metrics directory so /metrics covers all of them."""
+
+        from apps.api.services.prometheus import MultiprocessStore
+
+        settings = get_settings()
+        directory = settings.metrics_multiproc_dir
+        if directory is None:
+            if self.workers == 1:
+                return
+            directory = Path(tempfile.mkdtemp(prefix='asfotec-metrics-'))
+            os.environ['METRICS_MULTIPROC_DIR'] = str(directory)
+            get_settings.cache_clear()
+        MultiprocessStore(directory).clear()
+        logger.info('Aggregating worker metrics in %s', directory)
+
+    def _spawn(self) -> None:
+        pid = os.fork()
+        if pid == 0:
+            signal.signal(signal.SIGTERM, signal.SIG_DFL)
+            signal.signal(signal.SIGINT, signal.SIG_DFL)
+            code = 0
+            try:
+                _run_worker(self._sock, self.log_level)
+            except BaseException:  # noqa: BLE001 - report and exit the child, never return into the master loop
+                logger.exception('Worker %s crashed', os.getpid())
+                code = 1
+            finally:
+                os._exit(code)
+        self._children[pid] = time.monotonic()
+
+    def _supervise(self) -> int:
+        while self._children:
+            try:
+                pid, status = os.waitpid(-1, 0)
+            except ChildProcessError:
+                break
+            except InterruptedError:
+                continue
+            started = self._children.pop(pid, None)
+            if started is None or self._stopping:
+                continue
+            logger.warning('Worker %s exited with status %s; respawning', pid, os.waitstatus_to_exitcode(status))
+            time.sleep(max(0.0, RESPAWN_BACKOFF_S - (time.monotonic() - started)))
+            if not self._stopping:
+                self._spawn()
+        if self._sock is not None:
+            self._sock.close()
+        return 0
+
+    def _handle_stop(self, signum: int, _frame) -> None:
+        self._stopping = True
+        for pid in list(self._children):
+            try:
+                os.kill(pid, signal.SIGTERM)
+            except ProcessLookupError:
+                pass
+
+
+def main(argv: Optional[Sequence[str]] = None) -> int:
+    settings = get_settings()
+    parser = argparse.ArgumentParser(description='Run the API with pre-forked workers.')
+    parser.add_argument('--host', default='0.0.0.0')
+    parser.add_argument('--port', type=int, default=settings.port)
+    parser.add_argument('--workers', type=int, default=settings.api_workers)
+    parser.add_argument(
+        '--preload', action=argparse.BooleanOptionalAction, default=True,
+        help='Load the app and Production model in the master before forking (default: on).',
+    )
+    args = parser.parse_args(argv)
+
+    logging.basicConfig(
+        level=getattr(logging, settings.log_level.upper(), logging.INFO),
+        format='%(asctime)s | %(levelname)s | %(name)s | %(message)s'
+    )
+    server = PreforkServer(args.host, args.port, args.workers, preload=args.preload, log_level=settings.log_level)
+    return server.run()
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,233 @@
+"""Persistent, checksum-verified local cache of Production model artifacts.
+
+Layout under the cache root::
+
+    manifest.json              # {"production_run_id": ..., "runs": {run_id: {...}}}
+    runs/<run_id>/preprocessor.joblib
+    runs/<run_id>/model/...    # MLflow model directory
+    runs/<run_id>/CHECKSUMS    # sha256 of every file above, written last
+
+A run directory only appears (via atomic rename) once every artifact is downloaded
+and hashed, so a crash mid-download never leaves a half-populated run behind. Each
+process hashes a run at most once: later lookups reuse that result for as long as the
+files' sizes and modification times are unchanged.
+"""
+
+from __future__ import annotations
+
+import contextlib
+import hashlib
+import json
+import logging
+import os
+import shutil
+import time
+import uuid
+from pathlib import Path
+from typing import Any, Dict, Iterator, Optional, Tuple
+
+try:  # POSIX only; without it concurrent manifest updates are last-writer-wins.
+    import fcntl
+except ImportError:  # pragma: no cover - non-POSIX platforms
+    fcntl = None
+
+logger = logging.getLogger(__name__)
+
+ARTIFACTS = ('preprocessor.joblib', 'model')
+CHECKSUMS_FILE = 'CHECKSUMS'
+
+
+class ModelArtifactCache:
+    """Run-keyed artifact store with a manifest, sha256 verification and LRU eviction."""
+
+    def __init__(self, root: Path, max_bytes: int) -> None:
+        self.root = Path(root)
+        self.max_bytes = max_bytes
+        self.runs_dir = self.root / 'runs'
+        self.runs_dir.mkdir(parents=True, exist_ok=True)
+        self.manifest_path = self.root / 'manifest.json'
+        self._stats = {'hits': 0, 'downloads': 0, 'corrupt': 0, 'evictions': 0}
+        # run_id -> file stats at the time this process verified the run's checksums.
+        self._verified: Dict[str, Tuple[Tuple[str, int, int], ...]] = {}
+
+    # ------------------------------------------------------------------
+    # Lookup / population
+    # ------------------------------------------------------------------
+    def run_dir(self, run_id: str) -> Path:
+        return self.runs_dir / run_id
+
+    def get(self, run_id: str) -> Optional[Path]:
+        """Return the verified run directory, or None (removing it if corrupt)."""
+
+        path = self.run_dir(run_id)
+        if not path.exists():
+            self._verified.pop(run_id, None)
+            return None
+        signature = _tree_signature(path)
+        if self._verified.get(run_id) != signature:
+            if not self.verify(run_id):
+                logger.warning('Cached artifacts for run %s failed checksum verification; discarding', run_id)
+                self._verified.pop(run_id, None)
+                self._count('corrupt')
+                shutil.rmtree(path, ignore_errors=True)
+                self._update_manifest(lambda m: m['runs'].pop(run_id, None))
+                return None
+            self._verified[run_id] = signature
+        self._count('hits')
+        self._touch(run_id)
+        return path
+
+    def fetch(self, client: Any, run_id: str) -> Path:
+        """Return the local run directory, downloading it from MLflow on a miss."""
+
+        cached = self.get(run_id)
+        if cached is not None:
+            return cached
+
+        staging = self.root / f'.staging-{run_id}-{uuid.uuid4().hex}'
+        staging.mkdir(parents=True)
+        try:
+            for artifact in ARTIFACTS:
+                client.download_artifacts(run_id, artifact, str(staging))
+            checksums = _hash_tree(staging)
+            (staging / CHECKSUMS_FILE).write_text(json.dumps(checksums, indent=2, sort_keys=True))
+            target = self.run_dir(run_id)
+            try:
+                os.rename(staging, target)
+            except OSError:
+                # Another process published the same run first; theirs is equally valid.
+                if not target.exists():
+                    raise
+            else:
+                # Just hashed it ourselves; no need to hash it again on the next lookup.
+                self._verified[run_id] = _tree_signature(target)
+        finally:
+            shutil.rmtree(staging, ignore_errors=True)
+
+        self._count('downloads')
+        size = _dir_size(self.run_dir(run_id))
+        self._update_manifest(lambda m: m['runs'].__setitem__(run_id, {'size_bytes': size, 'last_used': time.time()}))
+        self.evict(keep=run_id)
+        return self.run_dir(run_id)
+
+    def verify(self, run_id: str) -> bool:
+        path = self.run_dir(run_id)
+        checksum_file = path / CHECKSUMS_FILE
+        if not checksum_file.exists():
+            return False
+        try:
+            expected = json.loads(checksum_file.read_text())
+        except json.JSONDecodeError:
+            return False
+        return _hash_tree(path) == expected
+
+    # ------------------------------------------------------------------
+    # Manifest
+    # ------------------------------------------------------------------
+    def production_run_id(self) -> Optional[str]:
+        return self._read_manifest().get('production_run_id')
+
+    def set_production(self, run_id: str) -> None:
+        self._update_manifest(lambda m: m.__setitem__('production_run_id', run_id))
+
+    def evict(self, keep: Optional[str] = None) -> None:
+        """Drop least-recently-used runs until under `max_bytes`.
+
+        The Production run and `keep` (a run about to be loaded) are never evicted.
+        """
+
+        def _evict(manifest: Dict[str, Any]) -> None:
+            runs = manifest['runs']
+            total = sum(entry.get('size_bytes', 0) for entry in runs.values())
+            protected = {manifest.get('production_run_id'), keep}
+            for run_id in sorted(runs, key=lambda r: runs[r].get('last_used', 0)):
+                if total <= self.max_bytes:
+                    break
+                if run_id in protected:
+                    continue
+                total -= runs[run_id].get('size_bytes', 0)
+                shutil.rmtree(self.run_dir(run_id), ignore_errors=True)
+                del runs[run_id]
+                self._verified.pop(run_id, None)
+                self._stats['evictions'] += 1  # already under the manifest lock
+                logger.info('Evicted cached model artifacts for run %s', run_id)
+
+        self._update_manifest(_evict)
+
+    def stats(self) -> Dict[str, Any]:
+        with self._locked():
+            counters = dict(self._stats)
+            manifest = self._read_manifest()
+        return {
+            **counters,
+            'runs': len(manifest['runs']),
+            'size_bytes': sum(entry.get('size_bytes', 0) for entry in manifest['runs'].values()),
+            'max_bytes': self.max_bytes,
+            'production_run_id': manifest.get('production_run_id'),
+        }
+
+    def _count(self, key: str) -> None:
+        with self._locked():
+            self._stats[key] += 1
+
+    def _touch(self, run_id: str) -> None:
+        def _update(manifest: Dict[str, Any]) -> None:
+            entry = manifest['runs'].setdefault(run_id, {'size_bytes': _dir_size(self.run_dir(run_id))})
+            entry['last_used'] = time.time()
+
+        self._update_manifest(_update)
+
+    def _read_manifest(self) -> Dict[str, Any]:
+        try:
+            manifest = json.loads(self.manifest_path.read_text())
+        except (FileNotFoundError, json.JSONDecodeError):
+            manifest = {}
+        manifest.setdefault('runs', {})
+        return manifest
+
+    def _update_manifest(self, mutate) -> None:
+        with self._locked():
+            manifest = self._read_manifest()
+            mutate(manifest)
+            tmp = self.manifest_path.with_suffix(f'.{uuid.uuid4().hex}.tmp')
+            tmp.write_text(json.dumps(manifest, indent=2, sort_keys=True))
+            os.replace(tmp, self.manifest_path)
+
+    @contextlib.contextmanager
+    def _locked(self) -> Iterator[None]:
+        if fcntl is None:
+            yield
+            return
+        with open(self.root / '.lock', 'w') as handle:
+            fcntl.flock(handle, fcntl.LOCK_EX)
+            try:
+                yield
+            finally:
+                fcntl.flock(handle, fcntl.LOCK_UN)
+
+
+def _hash_tree(root: Path) -> Dict[str, str]:
+    checksums: Dict[str, str] = {}
+    for path in sorted(root.rglob('*')):
+        if path.is_file() and path.name != CHECKSUMS_FILE:
+            digest = hashlib.sha256()
+            with open(path, 'rb') as handle:
+                for block in iter(lambda: handle.read(1 << 20), b''):
+                    digest.update(block)
+            checksums[path.relative_to(root).as_posix()] = digest.hexdigest()
+    return checksums
+
+
+def _tree_signature(root: Path) -> Tuple[Tuple[str, int, int], ...]:
+    """`(path, size, mtime_ns)` of every file under `root`: cheap to compare, unlike hashing."""
+
+    entries = []
+    for path in sorted(root.rglob('*')):
+        if path.is_file():
+            stat = path.stat()
+            entries.append((path.relative_to(root).as_posix(), stat.st_size, stat.st_mtime_ns))
+    return tuple(entries)
+
+
+def _dir_size(root: Path) -> int:
+    return sum(path.stat().st_size for path in root.rglob('*') if path.is_file())
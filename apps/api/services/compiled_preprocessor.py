@@ -0,0 +1,135 @@
+"""Pandas-free re-implementation of the fitted churn `ColumnTransformer`.
+
+`mlops/training/feature_pipeline.preprocess_pipeline` fits a `StandardScaler` over the
+numerical columns and a `OneHotEncoder(drop='first', handle_unknown='ignore')` over the
+categorical ones. Once fitted, both reduce to plain lookups: mean/scale arrays and one
+`category -> output column` dict per categorical feature. Compiling them at model load
+lets a feature dict be written straight into a NumPy row without building a DataFrame
+or going through sklearn's `transform` dispatch.
+"""
+
+from __future__ import annotations
+
+import logging
+import math
+from typing import Any, Dict, List, Mapping, Optional, Sequence, Tuple
+
+import numpy as np
+from sklearn.compose import ColumnTransformer
+from sklearn.preprocessing import OneHotEncoder, StandardScaler
+
+logger = logging.getLogger(__name__)
+
+
+class CompiledPreprocessor:
+    """Lookup-table form of a fitted scaler + one-hot `ColumnTransformer`."""
+
+    def __init__(
+        self,
+        n_features_out: int,
+        numerical: Sequence[Tuple[str, int, float, float]],
+        categorical: Sequence[Tuple[str, Dict[Any, int]]],
+        dtype: Any = np.float64,
+    ) -> None:
+        self.n_features_out = n_features_out
+        # (column, output position, mean, scale); kept as parallel arrays for the batch path.
+        self._num_cols = [col for col, _, _, _ in numerical]
+        self._num_pos = np.array([pos for _, pos, _, _ in numerical], dtype=np.intp)
+        self._num_mean = np.array([mean for _, _, mean, _ in numerical], dtype=np.float64)
+        self._num_scale = np.array([scale for _, _, _, scale in numerical], dtype=np.float64)
+        self._categorical = list(categorical)
+        self.dtype = dtype
+
+    @classmethod
+    def compile(cls, preprocessor: Any) -> Optional['CompiledPreprocessor']:
+        """Return a compiled form of `preprocessor`, or None if it uses unsupported pieces.
+
+        Only the shapes produced by `preprocess_pipeline` are supported; anything else
+        (passthrough columns, sparse output, NaN categories, ...) keeps the sklearn path.
+        """
+
+        if not isinstance(preprocessor, ColumnTransformer) or not hasattr(preprocessor, 'transformers_'):
+            return None
+        if getattr(preprocessor, 'sparse_output_', False):
+            return None
+
+        numerical: List[Tuple[str, int, float, float]] = []
+        categorical: List[Tuple[str, Dict[Any, int]]] = []
+        offset = 0
+        for name, transformer, columns in preprocessor.transformers_:
+            if transformer == 'drop' or len(columns) == 0:
+                continue
+            if not all(isinstance(col, str) for col in columns):
+                return None
+            if isinstance(transformer, StandardScaler):
+                mean = transformer.mean_ if transformer.with_mean else np.zeros(len(columns))
+                scale = transformer.scale_ if transformer.with_std else np.ones(len(columns))
+                for idx, col in enumerate(columns):
+                    numerical.append((col, offset + idx, float(mean[idx]), float(scale[idx])))
+                offset += len(columns)
+            elif isinstance(transformer, OneHotEncoder):
+                lookups = cls._compile_one_hot(transformer, columns, offset)
+                if lookups is None:
+                    return None
+                categorical.extend(lookups)
+                offset += sum(len(mapping) for _, mapping in lookups)
+            else:
+                logger.info('Transformer %s (%s) is not compilable; using sklearn transform', name, type(transformer).__name__)
+                return None
+
+        if offset != len(preprocessor.get_feature_names_out()):
+            return None
+        return cls(offset, numerical, categorical)
+
+    @staticmethod
+    def _compile_one_hot(
+        encoder: OneHotEncoder, columns: Sequence[str], offset: int
+    ) -> Optional[List[Tuple[str, Dict[Any, int]]]]:
+        if encoder.sparse_output or encoder.handle_unknown != 'ignore':
+            return None
+        if getattr(encoder, '_infrequent_enabled', False):
+            return None
+        drop_idx = encoder.drop_idx_ if encoder.drop_idx_ is not None else [None] * len(columns)
+        lookups: List[Tuple[str, Dict[Any, int]]] = []
+        for col, categories, dropped in zip(columns, encoder.categories_, drop_idx, strict=True):
+            mapping: Dict[Any, int] = {}
+            for idx, category in enumerate(categories):
+                if isinstance(category, float) and math.isnan(category):
+                    return None
+                if dropped is not None and idx == dropped:
+                    continue
+                mapping[category] = offset + len(mapping)
+            lookups.append((col, mapping))
+            offset += len(mapping)
+        return lookups
+
+    def transform_row(self, features: Mapping[str, Any], out: Optional[np.ndarray] = None) -> np.ndarray:
+        """Encode one feature dict into `out` (allocated if omitted); shape `(n_features_out,)`."""
+
+        row = np.zeros(self.n_features_out, dtype=self.dtype) if out is None else out
+        for i, col in enumerate(self._num_cols):
+            row[self._num_pos[i]] = (_to_float(features[col]) - self._num_mean[i]) / self._num_scale[i]
+        for col, mapping in self._categorical:
+            # Unknown and dropped categories encode to all zeros, as with handle_unknown='ignore'.
+            pos = mapping.get(features[col])
+            if pos is not None:
+                row[pos] = 1.0
+        return row
+
+    def transform_rows(self, rows: Sequence[Mapping[str, Any]]) -> np.ndarray:
+        """Encode many feature dicts into one preallocated `(len(rows), n_features_out)` matrix."""
+
+        X = np.zeros((len(rows), self.n_features_out), dtype=self.dtype)
+        if self._num_cols:
+            raw = np.array([[_to_float(row[col]) for col in self._num_cols] for row in rows], dtype=np.float64)
+            X[:, self._num_pos] = (raw - self._num_mean) / self._num_scale
+        for col, mapping in self._categorical:
+            for r, row in enumerate(rows):
+                pos = mapping.get(row[col])
+                if pos is not None:
+                    X[r, pos] = 1.0
+        return X
+
+
+def _to_float(value: Any) -> float:
+    return math.nan if value is None else float(value)
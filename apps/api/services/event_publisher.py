@@ -0,0 +1,177 @@
+"""Background, batched publishing of prediction events to Kafka."""
+
+from __future__ import annotations
+
+import json
+import logging
+import threading
+import time
+from collections import deque
+from typing import Any, Deque, Dict, Literal, Optional, Sequence
+
+logger = logging.getLogger(__name__)
+
+OverflowPolicy = Literal['drop_oldest', 'block']
+
+
+class PredictionEventPublisher:
+    """Decouple request threads from the Kafka producer.
+
+    `publish` only appends to a bounded in-memory queue; a daemon thread hands events
+    to `producer.produce`, serves delivery callbacks through a periodic `poll()`, and
+    leaves batching/compression to librdkafka (`linger.ms`, `batch.size`). When the
+    queue is full, `drop_oldest` evicts the oldest pending event while `block` waits
+    up to `block_timeout_ms` per `publish` call for room and then drops the rest of the
+    batch.
+    """
+
+    def __init__(
+        self,
+        producer: Any,
+        topic: str,
+        *,
+        max_queue_size: int = 10000,
+        overflow_policy: OverflowPolicy = 'drop_oldest',
+        block_timeout_ms: float = 50.0,
+        poll_interval_ms: float = 100.0,
+        flush_timeout_s: float = 10.0,
+    ) -> None:
+        if overflow_policy not in ('drop_oldest', 'block'):
+            raise ValueError(f'Unsupported overflow policy: {overflow_policy}')
+        self.producer = producer
+        self.topic = topic
+        self.max_queue_size = max(1, max_queue_size)
+        self.overflow_policy = overflow_policy
+        self.block_timeout_s = max(0.0, block_timeout_ms) / 1000
+        self.poll_interval_s = max(0.001, poll_interval_ms) / 1000
+        self.flush_timeout_s = flush_timeout_s
+        self._queue: Deque[Dict[str, Any]] = deque()
+        self._cond = threading.Condition()
+        self._counters = {'enqueued': 0, 'delivered': 0, 'failed': 0, 'dropped': 0}
+        self._thread: Optional[threading.Thread] = None
+        self._closing = False
+
+    # ------------------------------------------------------------------
+    # Request side
+    # ------------------------------------------------------------------
+    def publish(self, events: Sequence[Dict[str, Any]]) -> None:
+        if not events:
+            return
+        self._ensure_worker()
+        # One wait budget per call, so a batch sent to a full queue blocks for at most
+        # `block_timeout_ms` in total rather than once per event.
+        deadline = time.monotonic() + self.block_timeout_s
+        with self._cond:
+            if self._closing:
+                self._counters['dropped'] += len(events)
+                return
+            for position, event in enumerate(events):
+                if not self._enqueue(event, deadline):
+                    self._counters['dropped'] += len(events) - position
+                    break
+            self._cond.notify()
+
+    def _enqueue(self, event: Dict[str, Any], deadline: float) -> bool:
+        """Queue `event`, or return False if the `block` policy ran out of time; caller holds self._cond."""
+
+        if len(self._queue) >= self.max_queue_size:
+            if self.overflow_policy == 'drop_oldest':
+                self._queue.popleft()
+                self._counters['dropped'] += 1
+            else:
+                while len(self._queue) >= self.max_queue_size:
+                    remaining = deadline - time.monotonic()
+                    if remaining <= 0 or self._closing:
+                        return False
+                    self._cond.wait(remaining)
+        self._queue.append(event)
+        self._counters['enqueued'] += 1
+        return True
+
+    def stats(self) -> Dict[str, Any]:
+        with self._cond:
+            return {'queued': len(self._queue), **self._counters, 'overflow_policy': self.overflow_policy}
+
+    def close(self, timeout: Optional[float] = None) -> None:
+        """Stop accepting events, publish what is still queued, and flush the producer."""
+
+        with self._cond:
+            self._closing = True
+            self._cond.notify_all()
+        if self._thread is not None:
+            self._thread.join(timeout if timeout is not None else self.flush_timeout_s + 1)
+        else:
+            self._drain()
+            self._flush()
+
+    # ------------------------------------------------------------------
+    # Worker side
+    # ------------------------------------------------------------------
+    def _ensure_worker(self) -> None:
+        if self._thread is not None:
+            return
+        with self._cond:
+            if self._thread is None:
+                self._thread = threading.Thread(target=self._run, name='kafka-publisher', daemon=True)
+                self._thread.start()
+
+    def _run(self) -> None:
+        while True:
+            with self._cond:
+                if not self._queue and not self._closing:
+                    self._cond.wait(self.poll_interval_s)
+                closing = self._closing
+            self._drain()
+            self.producer.poll(0)
+            if closing:
+                self._drain()
+                self._flush()
+                return
+
+    def _drain(self) -> None:
+        while True:
+            with self._cond:
+                if not self._queue:
+                    return
+                event = self._queue.popleft()
+                self._cond.notify_all()  # wake publishers blocked on a full queue
+            self._produce(event)
+
+    def _produce(self, event: Dict[str, Any]) -> None:
+        payload = json.dumps(event)
+        for _ in range(3):
+            try:
+                self.producer.produce(
+                    self.topic,
+                    key=event.get('event_id'),
+                    value=payload,
+                    on_delivery=self._on_delivery,
+                )
+                return
+            except BufferError:
+                # librdkafka's local queue is full; serve callbacks to make room, then retry.
+                self.producer.poll(self.poll_interval_s)
+            except Exception as exc:
+                logger.warning('Failed to publish prediction event: %s', exc)
+                break
+        self._count('failed')
+
+    def _flush(self) -> None:
+        try:
+            remaining = self.producer.flush(self.flush_timeout_s)
+        except Exception as exc:
+            logger.warning('Kafka flush failed on shutdown: %s', exc)
+            return
+        if remaining:
+            logger.warning('%s prediction event(s) still undelivered after flush', remaining)
+
+    def _on_delivery(self, err: Any, msg: Any) -> None:
+        if err is not None:
+            logger.warning('Prediction event delivery failed: %s', err)
+            self._count('failed')
+        else:
+            self._count('delivered')
+
+    def _count(self, key: str) -> None:
+        with self._cond:
+            self._counters[key] += 1
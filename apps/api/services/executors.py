@@ -0,0 +1,165 @@
+"""Dedicated, instrumented worker pools that keep blocking work off the event loop.
+
+Classifier scoring and LLM/RAG calls run on separate pools so a slow LLM provider
+cannot starve classifier traffic. An optional process pool takes large classifier
+batches, where LightGBM/NumPy work would otherwise compete for the GIL.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import contextvars
+import multiprocessing
+import threading
+import time
+from concurrent.futures import Executor, Future, ProcessPoolExecutor, ThreadPoolExecutor
+from functools import lru_cache
+from typing import Any, Callable, Dict, Optional, Tuple
+
+from apps.api.config.settings import AppSettings, get_settings
+from .metrics_collector import metrics_collector
+
+
+def _timed_call(fn: Callable[..., Any], args: Tuple[Any, ...], kwargs: Dict[str, Any]) -> Tuple[Any, float]:
+    # Module level so it pickles into process pools; wall-clock start is comparable across processes.
+    return fn(*args, **kwargs), time.time()
+
+
+class InstrumentedExecutor:
+    """Wrap an executor and track in-flight depth and queue wait per pool."""
+
+    def __init__(self, name: str, executor: Executor, max_workers: int) -> None:
+        self.name = name
+        self.max_workers = max_workers
+        self._executor = executor
+        # Thread workers run in the caller's context so per-request stage timings follow the call.
+        self._copy_context = isinstance(executor, ThreadPoolExecutor)
+        self._lock = threading.Lock()
+        self._stats = {'submitted': 0, 'completed': 0, 'failed': 0, 'in_flight': 0}
+        self._wait_total_ms = 0.0
+        self._wait_max_ms = 0.0
+
+    def submit(self, fn: Callable[..., Any], *args: Any, **kwargs: Any) -> Future:
+        enqueued_at = time.time()
+        with self._lock:
+            self._stats['submitted'] += 1
+            self._stats['in_flight'] += 1
+        if self._copy_context:
+            inner = self._executor.submit(contextvars.copy_context().run, _timed_call, fn, args, kwargs)
+        else:
+            inner = self._executor.submit(_timed_call, fn, args, kwargs)
+        outer: Future = Future()
+
+        def _done(done: Future) -> None:
+            try:
+                result, started_at = done.result()
+            except BaseException as exc:  # noqa: BLE001 - forwarded to the caller
+                self._finish(None, failed=True)
+                outer.set_exception(exc)
+                return
+            self._finish(max(0.0, started_at - enqueued_at) * 1000, failed=False)
+            outer.set_result(result)
+
+        inner.add_done_callback(_done)
+        return outer
+
+    async def run(self, fn: Callable[..., Any], *args: Any, **kwargs: Any) -> Any:
+        """Await `fn(*args, **kwargs)` on this pool without blocking the event loop."""
+
+        return await asyncio.wrap_future(self.submit(fn, *args, **kwargs))
+
+    def _finish(self, wait_ms: Optional[float], failed: bool) -> None:
+        with self._lock:
+            self._stats['in_flight'] -= 1
+            self._stats['failed' if failed else 'completed'] += 1
+            if wait_ms is not None:
+                self._wait_total_ms += wait_ms
+                self._wait_max_ms = max(self._wait_max_ms, wait_ms)
+
+    def stats(self) -> Dict[str, float]:
+        with self._lock:
+            finished = self._stats['completed']
+            return {
+                **self._stats,
+                'max_workers': self.max_workers,
+                'queued': max(0, self._stats['in_flight'] - self.max_workers),
+                'avg_wait_ms': round(self._wait_total_ms / finished, 2) if finished else 0.0,
+                'max_wait_ms': round(self._wait_max_ms, 2),
+            }
+
+    def shutdown(self, wait: bool = True) -> None:
+        self._executor.shutdown(wait=wait)
+
+
+class ExecutorPools:
+    """Process-wide pools for classifier and LLM work, sized from `AppSettings`."""
+
+    def __init__(self, settings: Optional[AppSettings] = None) -> None:
+        self.settings = settings or get_settings()
+        self.classifier = InstrumentedExecutor(
+            'classifier',
+            ThreadPoolExecutor(self.settings.classifier_pool_workers, thread_name_prefix='classifier'),
+            self.settings.classifier_pool_workers,
+        )
+        self.llm = InstrumentedExecutor(
+            'llm',
+            ThreadPoolExecutor(self.settings.llm_pool_workers, thread_name_prefix='llm'),
+            self.settings.llm_pool_workers,
+        )
+        self._classifier_process: Optional[InstrumentedExecutor] = None
+        self._process_key: Optional[str] = None
+        self._process_lock = threading.Lock()
+
+    def classifier_process(
+        self,
+        key: str,
+        initializer: Callable[..., None],
+        initargs: Tuple[Any, ...] = (),
+    ) -> Optional[InstrumentedExecutor]:
+        """Return the process pool for large batches, or None when it is disabled.
+
+        Workers run `initializer(*initargs)` once to load their own model copy; the pool
+        is rebuilt when `key` (the model version) changes.
+        """
+
+        workers = self.settings.classifier_process_workers
+        if workers <= 0:
+            return None
+        with self._process_lock:
+            if self._classifier_process is not None and self._process_key == key:
+                return self._classifier_process
+            previous = self._classifier_process
+            self._classifier_process = InstrumentedExecutor(
+                'classifier_process',
+                ProcessPoolExecutor(
+                    workers,
+                    # spawn: the parent already runs batcher/publisher threads, which fork would copy mid-state.
+                    mp_context=multiprocessing.get_context('spawn'),
+                    initializer=initializer,
+                    initargs=initargs,
+                ),
+                workers,
+            )
+            self._process_key = key
+        if previous is not None:
+            previous.shutdown(wait=False)
+        return self._classifier_process
+
+    def stats(self) -> Dict[str, Dict[str, float]]:
+        pools = [self.classifier, self.llm]
+        if self._classifier_process is not None:
+            pools.append(self._classifier_process)
+        return {pool.name: pool.stats() for pool in pools}
+
+    def shutdown(self) -> None:
+        self.classifier.shutdown()
+        self.llm.shutdown()
+        if self._classifier_process is not None:
+            self._classifier_process.shutdown()
+
+
+@lru_cache(maxsize=1)
+def get_executor_pools() -> ExecutorPools:
+    pools = ExecutorPools()
+    metrics_collector.register_source('executors', pools.stats)
+    return pools
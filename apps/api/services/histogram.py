@@ -0,0 +1,223 @@
+"""Log-bucketed latency histograms with striped, time-windowed recording.
+
+Latencies are bucketed HDR-style on whole microseconds: exact below 128 µs, then 64
+linear sub-buckets per power of two. Every bucket spans at most 1/64 of its values, so
+a percentile reported at the bucket midpoint is within ~0.8% of the true sample.
+Recording is one dict increment, merging is adding bucket counts, and a percentile is a
+cumulative sum over a fixed number of buckets whatever the sample count.
+"""
+
+from __future__ import annotations
+
+import itertools
+import math
+import threading
+import time
+from typing import Any, Callable, Dict, Iterable, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+SUB_BUCKETS = 128
+_HALF = SUB_BUCKETS // 2
+MAX_VALUE_US = 1 << 40  # ~12.7 days; larger values land in the last bucket
+PERCENTILES: Tuple[Tuple[str, float], ...] = (
+    ('p50', 0.50),
+    ('p90', 0.90),
+    ('p95', 0.95),
+    ('p99', 0.99),
+    ('p999', 0.999),
+)
+
+
+def bucket_index(value_us: int) -> int:
+    value_us = min(max(value_us, 0), MAX_VALUE_US - 1)
+    if value_us < SUB_BUCKETS:
+        return value_us
+    shift = value_us.bit_length() - 7  # value_us >> shift is in [64, 128)
+    return SUB_BUCKETS + (shift - 1) * _HALF + (value_us >> shift) - _HALF
+
+
+def bucket_bounds(index: int) -> Tuple[int, int]:
+    """Half-open `[low, high)` range of microsecond values in bucket `index`."""
+
+    if index < SUB_BUCKETS:
+        return index, index + 1
+    shift, sub = divmod(index - SUB_BUCKETS, _HALF)
+    return (sub + _HALF) << (shift + 1), (sub + _HALF + 1) << (shift + 1)
+
+
+N_BUCKETS = bucket_index(MAX_VALUE_US - 1) + 1
+_MIDPOINTS_MS = np.array([sum(bucket_bounds(i)) / 2000 for i in range(N_BUCKETS)])
+_UPPER_BOUNDS_US = np.array([bucket_bounds(i)[1] for i in range(N_BUCKETS)])
+
+
+class HistogramCounts:
+    """Counts, sum, max and sparse bucket counts for one slice of samples; not thread-safe."""
+
+    __slots__ = ('count', 'errors', 'total_ms', 'max_ms', 'buckets')
+
+    def __init__(self) -> None:
+        self.count = 0
+        self.errors = 0
+        self.total_ms = 0.0
+        self.max_ms = 0.0
+        self.buckets: Dict[int, int] = {}
+
+    def add(self, value_ms: float, success: bool = True) -> None:
+        self.count += 1
+        if not success:
+            self.errors += 1
+        self.total_ms += value_ms
+        if value_ms > self.max_ms:
+            self.max_ms = value_ms
+        # bucket_index(), inlined: this is the per-request hot path.
+        value_us = int(value_ms * 1000)
+        if value_us < SUB_BUCKETS:
+            index = value_us if value_us > 0 else 0
+        else:
+            if value_us >= MAX_VALUE_US:
+                value_us = MAX_VALUE_US - 1
+            shift = value_us.bit_length() - 7
+            index = SUB_BUCKETS + (shift - 1) * _HALF + (value_us >> shift) - _HALF
+        buckets = self.buckets
+        buckets[index] = buckets.get(index, 0) + 1
+
+    def merge(self, other: 'HistogramCounts') -> 'HistogramCounts':
+        self.count += other.count
+        self.errors += other.errors
+        self.total_ms += other.total_ms
+        self.max_ms = max(self.max_ms, other.max_ms)
+        for index, n in other.buckets.items():
+            self.buckets[index] = self.buckets.get(index, 0) + n
+        return self
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            'count': self.count,
+            'errors': self.errors,
+            'total_ms': self.total_ms,
+            'max_ms': self.max_ms,
+            'buckets': sorted(self.buckets.items()),
+        }
+
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> 'HistogramCounts':
+        counts = cls()
+        counts.count = data['count']
+        counts.errors = data['errors']
+        counts.total_ms = data['total_ms']
+        counts.max_ms = data['max_ms']
+        counts.buckets = {int(index): int(n) for index, n in data['buckets']}
+        return counts
+
+    def _cumulative(self) -> np.ndarray:
+        dense = np.zeros(N_BUCKETS, dtype=np.int64)
+        if self.buckets:
+            dense[np.fromiter(self.buckets.keys(), dtype=np.intp)] = np.fromiter(self.buckets.values(), dtype=np.int64)
+        return np.cumsum(dense)
+
+    def counts_at_most(self, bounds_ms: Sequence[float]) -> List[int]:
+        """Samples at or below each bound, e.g. for Prometheus `le` buckets.
+
+        A bucket straddling a bound is counted above it, so counts are exact at bucket
+        boundaries and otherwise short by at most the one straddling bucket.
+        """
+
+        cumulative = self._cumulative()
+        last = np.searchsorted(_UPPER_BOUNDS_US, np.asarray(bounds_ms) * 1000, side='right') - 1
+        return [int(cumulative[i]) if i >= 0 else 0 for i in last]
+
+    def percentiles(self, quantiles: Sequence[float]) -> List[float]:
+        if not self.count:
+            return [0.0] * len(quantiles)
+        cumulative = self._cumulative()
+        ranks = np.maximum(np.ceil(np.asarray(quantiles) * cumulative[-1]), 1)
+        indices = np.searchsorted(cumulative, ranks)
+        # The top bucket's midpoint can overshoot the largest sample; never report past it.
+        return [min(float(_MIDPOINTS_MS[i]), self.max_ms) for i in indices]
+
+    def summary(self) -> Dict[str, float]:
+        values = self.percentiles([q for _, q in PERCENTILES])
+        return {
+            'count': self.count,
+            'errors': self.errors,
+            'avg_latency_ms': round(self.total_ms / self.count, 2) if self.count else 0.0,
+            **{f'{name}_latency_ms': round(value, 2) for (name, _), value in zip(PERCENTILES, values, strict=True)},
+            'max_latency_ms': round(self.max_ms, 2),
+        }
+
+
+class _Stripe:
+    __slots__ = ('lock', 'retired', 'slices')
+
+    def __init__(self, n_slices: int) -> None:
+        self.lock = threading.Lock()
+        self.retired = HistogramCounts()  # slices that fell out of the ring, kept for lifetime totals
+        self.slices: List[Tuple[int, HistogramCounts]] = [(-1, HistogramCounts()) for _ in range(n_slices)]
+
+
+class WindowedHistogram:
+    """Latency histogram over the process lifetime and over trailing time windows.
+
+    Time is cut into `slice_s` slices kept in a ring long enough for the largest window,
+    so a window covers its last `ceil(window / slice_s)` slices, the current partial one
+    included. A sample is counted once, in its slice; a slice is folded into the lifetime
+    totals when the ring reuses it. Each thread records into one of `stripes` stripes with
+    its own lock, so concurrent requests rarely wait on each other; a snapshot merges the
+    stripes.
+    """
+
+    _thread_slot = threading.local()
+    _next_slot = itertools.count()
+
+    def __init__(
+        self,
+        windows_s: Iterable[float] = (60, 300),
+        *,
+        slice_s: float = 10.0,
+        stripes: int = 8,
+        clock: Callable[[], float] = time.monotonic,
+    ) -> None:
+        self.windows_s = sorted({float(w) for w in windows_s if w > 0})
+        self.slice_s = slice_s
+        self._clock = clock
+        self._n_slices = max((math.ceil(w / slice_s) for w in self.windows_s), default=0) + 1
+        self._stripes = [_Stripe(self._n_slices) for _ in range(max(1, stripes))]
+
+    def _stripe(self) -> _Stripe:
+        slot = getattr(self._thread_slot, 'slot', None)
+        if slot is None:
+            slot = self._thread_slot.slot = next(self._next_slot)
+        return self._stripes[slot % len(self._stripes)]
+
+    def record(self, value_ms: float, success: bool = True) -> None:
+        epoch = int(self._clock() // self.slice_s)
+        stripe = self._stripe()
+        with stripe.lock:
+            position = epoch % self._n_slices
+            slice_epoch, counts = stripe.slices[position]
+            if slice_epoch != epoch:
+                stripe.retired.merge(counts)
+                counts = HistogramCounts()
+                stripe.slices[position] = (epoch, counts)
+            counts.add(value_ms, success)
+
+    def merged(self, window_s: Optional[float] = None) -> HistogramCounts:
+        """All stripes' counts over the lifetime (`window_s=None`) or the trailing window."""
+
+        merged = HistogramCounts()
+        oldest = int(self._clock() // self.slice_s) - math.ceil(window_s / self.slice_s) if window_s else None
+        for stripe in self._stripes:
+            with stripe.lock:
+                if oldest is None:
+                    merged.merge(stripe.retired)
+                for slice_epoch, counts in stripe.slices:
+                    if oldest is None or slice_epoch > oldest:
+                        merged.merge(counts)
+        return merged
+
+    def snapshot(self) -> Dict[str, Any]:
+        return {
+            **self.merged().summary(),
+            'windows': {f'{w:g}s': self.merged(w).summary() for w in self.windows_s},
+        }
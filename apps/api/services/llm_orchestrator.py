@@ -2,13 +2,27 @@
 
 from __future__ import annotations
 
-from typing import Callable, Dict, Optional
+import asyncio
+import contextlib
+import logging
+import threading
+import time
+import weakref
+from functools import lru_cache
+from typing import Any, AsyncIterator, Awaitable, Callable, Dict, Generator, Iterator, List, Optional, Sequence, Tuple, Union
 
 from langchain_google_genai import ChatGoogleGenerativeAI
 from langchain_core.messages import AIMessage
 
 from apps.api.config.settings import AppSettings, get_settings
-from rag.service import RAGService
+from apps.api.timing import stage
+from rag.collections import RAGCollections, describe_collections
+from rag.service import RAGService, Retrieval, normalize_query
+from .executors import get_executor_pools
+from .metrics_collector import metrics_collector
+from .singleflight import Singleflight
+
+logger = logging.getLogger(__name__)
 
 
 class LLMOrchestrator:
@@ -17,10 +31,17 @@ class LLMOrchestrator:
     def __init__(self, settings: Optional[AppSettings] = None):
         self.settings = settings or get_settings()
         self.rag_service = RAGService(self.settings)
+        self.collections = RAGCollections(self.rag_service, self.settings.rag_max_resident_collections)
         self.llm_provider = self.settings.llm_provider
         self.api_key = self.settings.google_api_key
         self._model = None
         self._llm_fn = self._build_llm_fn()
+        self._singleflight = Singleflight()
+        # One semaphore per event loop; asyncio primitives cannot be shared across loops.
+        self._limiters: 'weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, asyncio.Semaphore]' = (
+            weakref.WeakKeyDictionary()
+        )
+        self._waiting = 0
 
     def _build_llm_fn(self) -> Optional[Callable[[str, str], str]]:
         if self.llm_provider == 'sherlock':
@@ -31,31 +52,222 @@ class LLMOrchestrator:
             self._model = ChatGoogleGenerativeAI(model='gemini-1.5-flash', google_api_key=self.api_key)
 
             def _call(context: str, question: str) -> str:
-                prompt = (
-                    'Answer the user question using only the provided ASFOTEC context.\n'
-                    f'Context:\n{context}\nQuestion: {question}'
-                )
-                response = self._model.invoke(prompt)
-                if isinstance(response, AIMessage):
-                    if isinstance(response.content, str):
-                        return response.content
-                    return ' '.join(
-                        getattr(part, 'text', '') for part in response.content if getattr(part, 'text', '')
-                    ).strip()
-                if isinstance(response, dict):
-                    return response.get('text') or response.get('content', '')
-                return str(response)
+                return _response_text(self._model.invoke(_prompt(context, question)))
 
             return _call
         raise ValueError(f'Unsupported llm_provider: {self.llm_provider}')
 
-    def query(self, query: str) -> Dict[str, object]:
+    def _llm_afn(self) -> Optional[Callable[[str, str], Awaitable[str]]]:
+        if self._model is None:
+            return None  # sherlock: RAG service awaits the (optionally delayed) mock answer
+
+        async def _acall(context: str, question: str) -> str:
+            return _response_text(await self._model.ainvoke(_prompt(context, question)))
+
+        return _acall
+
+    def _llm_stream_fn(self) -> Optional[Callable[[str, str], Iterator[str]]]:
+        if self._model is None:
+            return None  # sherlock: RAG service streams the mock answer in chunks
+
+        def _stream(context: str, question: str) -> Iterator[str]:
+            with contextlib.closing(self._model.stream(_prompt(context, question))) as chunks:
+                for chunk in chunks:
+                    yield _message_text(chunk)
+
+        return _stream
+
+    def warmup(self) -> None:
+        self.rag_service.warmup()
+
+    def query(
+        self, query: str, retrieval_mode: Optional[str] = None, collection: Optional[str] = None
+    ) -> Dict[str, object]:
         tier = 'mock-local' if self.llm_provider == 'sherlock' else 'google-flash'
-        payload = self.rag_service.answer(
-            query,
-            llm_fn=self._llm_fn,
-            tier=tier,
-            top_k=self.settings.rag_top_k,
-        )
+        with self.collections.use(collection) as rag_service:
+            payload = rag_service.answer(
+                query,
+                llm_fn=self._llm_fn,
+                tier=tier,
+                top_k=self.settings.rag_top_k,
+                retrieval_mode=retrieval_mode,
+            )
+        payload['model_provider'] = self.llm_provider
+        return payload
+
+    async def aquery(
+        self, query: str, retrieval_mode: Optional[str] = None, collection: Optional[str] = None
+    ) -> Dict[str, object]:
+        """Async `query()`. Identical queries already in flight share one retrieval + generation."""
+
+        with self.collections.use(collection) as rag_service:
+            key = (rag_service.collection, normalize_query(query), retrieval_mode or self.settings.rag_retrieval_mode)
+            payload = await self._singleflight.do(key, lambda: self._aquery(rag_service, query, retrieval_mode))
+        return dict(payload)
+
+    async def abatch(
+        self, queries: Sequence[str], retrieval_mode: Optional[str] = None, collection: Optional[str] = None
+    ) -> List[Union[Dict[str, object], Exception]]:
+        """Answer many queries: one batched retrieval, then generation under the shared concurrency limit.
+
+        Each entry is that query's payload, or the exception it raised.
+        """
+
+        with self.collections.use(collection) as rag_service:
+            retrievals = await get_executor_pools().llm.run(
+                rag_service.search_many, queries, self.settings.rag_top_k, retrieval_mode
+            )
+
+            async def _answer(query: str, retrieval: Any) -> Dict[str, object]:
+                if isinstance(retrieval, Exception):
+                    raise retrieval
+                return await self._aquery(rag_service, query, retrieval_mode, retrieval)
+
+            return await asyncio.gather(
+                *(_answer(query, retrieval) for query, retrieval in zip(queries, retrievals, strict=True)),
+                return_exceptions=True,
+            )
+
+    async def _aquery(
+        self,
+        rag_service: RAGService,
+        query: str,
+        retrieval_mode: Optional[str],
+        retrieval: Optional[Retrieval] = None,
+    ) -> Dict[str, object]:
+        tier = 'mock-local' if self.llm_provider == 'sherlock' else 'google-flash'
+        async with self.generation_slot():
+            payload = await rag_service.answer_async(
+                query,
+                llm_afn=self._llm_afn(),
+                tier=tier,
+                top_k=self.settings.rag_top_k,
+                retrieval_mode=retrieval_mode,
+                run_blocking=get_executor_pools().llm.run,
+                timeout_s=self.settings.llm_timeout_s,
+                retrieval=retrieval,
+            )
         payload['model_provider'] = self.llm_provider
         return payload
+
+    @contextlib.asynccontextmanager
+    async def generation_slot(self) -> AsyncIterator[None]:
+        """Hold one of the `LLM_MAX_CONCURRENCY` generation slots of this event loop."""
+
+        limiter = self._limiter()
+        self._waiting += 1
+        try:
+            with stage('llm.slot_wait'):
+                await limiter.acquire()
+        finally:
+            self._waiting -= 1
+        try:
+            yield
+        finally:
+            limiter.release()
+
+    def _limiter(self) -> asyncio.Semaphore:
+        loop = asyncio.get_running_loop()
+        limiter = self._limiters.get(loop)
+        if limiter is None:
+            limiter = self._limiters[loop] = asyncio.Semaphore(self.settings.llm_max_concurrency)
+        return limiter
+
+    def async_stats(self) -> Dict[str, Any]:
+        return {
+            'singleflight': self._singleflight.stats(),
+            'max_concurrency': self.settings.llm_max_concurrency,
+            'waiting_for_slot': self._waiting,
+            'timeout_s': self.settings.llm_timeout_s,
+        }
+
+    def query_stream(
+        self, query: str, retrieval_mode: Optional[str] = None, collection: Optional[str] = None
+    ) -> Generator[Tuple[str, Dict[str, Any]], None, None]:
+        """Yield `(event, data)`: `sources` first, then one `token` per provider chunk, then `done`."""
+
+        tier = 'mock-local' if self.llm_provider == 'sherlock' else 'google-flash'
+        with self.collections.use(collection) as rag_service:
+            events = rag_service.answer_stream(
+                query,
+                llm_stream_fn=self._llm_stream_fn(),
+                tier=tier,
+                top_k=self.settings.rag_top_k,
+                retrieval_mode=retrieval_mode,
+            )
+            # Closing this generator (client gone) closes the RAG stream and, through it, the provider's.
+            with contextlib.closing(events):
+                for event, data in events:
+                    if event == 'sources':
+                        data['model_provider'] = self.llm_provider
+                    yield event, data
+
+
+def _prompt(context: str, question: str) -> str:
+    return (
+        'Answer the user question using only the provided ASFOTEC context.\n'
+        f'Context:\n{context}\nQuestion: {question}'
+    )
+
+
+def _response_text(response: Any) -> str:
+    if isinstance(response, AIMessage):
+        return _message_text(response).strip()
+    if isinstance(response, dict):
+        return response.get('text') or response.get('content', '')
+    return str(response)
+
+
+def _message_text(message: Any) -> str:
+    content = message.content
+    if isinstance(content, str):
+        return content
+    return ' '.join(
+        getattr(part, 'text', '') for part in content if getattr(part, 'text', '')
+    )
+
+
+@lru_cache()
+def get_llm_orchestrator() -> LLMOrchestrator:
+    """Process-wide orchestrator, so the embedding model and Chroma handle are loaded once."""
+
+    orchestrator = LLMOrchestrator()
+    metrics_collector.register_source('rag_cache', orchestrator.rag_service.cache_stats)
+    metrics_collector.register_source('rag_retrieval', orchestrator.rag_service.retrieval_stats)
+    metrics_collector.register_source('llm_async', orchestrator.async_stats)
+    metrics_collector.register_source('rag_collections', orchestrator.collections.stats)
+    return orchestrator
+
+
+def rag_collections_status(settings: AppSettings) -> List[Dict[str, Any]]:
+    """Size of every collection, plus residency once the orchestrator exists (never builds it)."""
+
+    registry = get_llm_orchestrator().collections if get_llm_orchestrator.cache_info().currsize else None
+    return describe_collections(settings, registry)
+
+
+_warmup_lock = threading.Lock()
+_warmup_status: Dict[str, Any] = {'state': 'pending', 'error': None, 'duration_ms': None}
+
+
+def warmup_llm_orchestrator() -> None:
+    """Build the orchestrator and embed a dummy query; blocking, run it off the event loop."""
+
+    with _warmup_lock:
+        if _warmup_status['state'] in ('warming', 'ready'):
+            return
+        _warmup_status.update(state='warming', error=None)
+    start = time.time()
+    try:
+        get_llm_orchestrator().warmup()
+    except Exception as exc:  # noqa: BLE001 - a failed warmup leaves the service not ready, not crashed
+        logger.warning('LLM warmup failed: %s', exc)
+        _warmup_status.update(state='failed', error=str(exc))
+        return
+    _warmup_status.update(state='ready', duration_ms=round((time.time() - start) * 1000, 2))
+    logger.info('LLM orchestrator warm in %.0f ms', _warmup_status['duration_ms'])
+
+
+def llm_warmup_status() -> Dict[str, Any]:
+    with _warmup_lock:
+        return dict(_warmup_status)
@@ -1,65 +1,131 @@
-"""Thread-safe in-memory metrics collector for FastAPI endpoints."""
+"""Thread-safe in-memory metrics collector for FastAPI endpoints.
+
+Endpoint latencies go into per-endpoint `WindowedHistogram`s, so recording is constant
+time and contention-free across threads, and a snapshot reports percentiles over the
+process lifetime and over the `METRICS_WINDOWS_S` trailing windows without sorting samples.
+"""
 
 from __future__ import annotations
 
-from collections import deque
-from statistics import mean
 from threading import Lock
-from typing import Deque, Dict
+from typing import Any, Callable, Dict, Iterable, List
+
+from apps.api import timing
+from apps.api.config.settings import AppSettings, get_settings
+
+from .histogram import WindowedHistogram
+
+
+def parse_windows(value: str) -> List[float]:
+    """`'60,300'` -> `[60.0, 300.0]`; blanks are ignored."""
+
+    return [float(part) for part in value.split(',') if part.strip()]
 
 
 class MetricsCollector:
-    def __init__(self, max_samples: int = 1000) -> None:
+    def __init__(self, windows_s: Iterable[float] = (60, 300), slice_s: float = 10.0, stripes: int = 8) -> None:
         self._lock = Lock()
-        self._max_samples = max_samples
-        self._state: Dict[str, Dict[str, object]] = {}
-
-    def _ensure_endpoint(self, name: str) -> Dict[str, object]:
-        if name not in self._state:
-            self._state[name] = {
-                'count': 0,
-                'errors': 0,
-                'latencies': deque(maxlen=self._max_samples),
-            }
-        return self._state[name]
+        self._windows_s = list(windows_s)
+        self._slice_s = slice_s
+        self._stripes = stripes
+        self._state: Dict[str, WindowedHistogram] = {}
+        self._stages: Dict[str, WindowedHistogram] = {}
+        self._batches: Dict[str, Dict[str, int]] = {}
+        self._sources: Dict[str, Callable[[], Dict[str, Any]]] = {}
+        self._info: Dict[str, Dict[str, str]] = {}
+
+    @classmethod
+    def from_settings(cls, settings: AppSettings) -> 'MetricsCollector':
+        return cls(
+            parse_windows(settings.metrics_windows_s),
+            slice_s=settings.metrics_slice_s,
+            stripes=settings.metrics_stripes,
+        )
 
     def record(self, name: str, latency_ms: float, success: bool = True) -> None:
+        # The histogram stripes its own locks; the collector lock only guards endpoint creation.
+        self._histogram(self._state, name).record(latency_ms, success)
+
+    def record_stage(self, name: str, elapsed_ms: float) -> None:
+        """Time spent in one hot-path stage (see `apps.api.timing`), reported under `stages`."""
+
+        self._histogram(self._stages, name).record(elapsed_ms)
+
+    def _histogram(self, histograms: Dict[str, WindowedHistogram], name: str) -> WindowedHistogram:
+        histogram = histograms.get(name)
+        if histogram is None:
+            with self._lock:
+                histogram = histograms.get(name)
+                if histogram is None:
+                    histogram = histograms[name] = WindowedHistogram(
+                        self._windows_s, slice_s=self._slice_s, stripes=self._stripes
+                    )
+        return histogram
+
+    def record_batch(self, name: str, size: int) -> None:
+        """Track the effective size of batches formed by a batcher."""
+
         with self._lock:
-            bucket = self._ensure_endpoint(name)
-            bucket['count'] = int(bucket['count']) + 1
-            if not success:
-                bucket['errors'] = int(bucket['errors']) + 1
-            latencies: Deque[float] = bucket['latencies']  # type: ignore[assignment]
-            latencies.append(latency_ms)
-
-    def snapshot(self) -> Dict[str, Dict[str, float]]:
+            bucket = self._batches.setdefault(name, {'batches': 0, 'rows': 0, 'max_batch_size': 0})
+            bucket['batches'] += 1
+            bucket['rows'] += size
+            bucket['max_batch_size'] = max(bucket['max_batch_size'], size)
+
+    def register_source(self, name: str, source: Callable[[], Dict[str, Any]]) -> None:
+        """Include `source()` under `components.<name>` in every snapshot (e.g. component counters)."""
+
         with self._lock:
-            result: Dict[str, Dict[str, float]] = {}
-            for name, data in self._state.items():
-                latencies = list(data['latencies'])  # type: ignore[arg-type]
-                avg_latency = mean(latencies) if latencies else 0.0
-                p95_latency = self._percentile(latencies, 95) if latencies else 0.0
-                result[name] = {
-                    'count': int(data['count']),
-                    'errors': int(data['errors']),
-                    'avg_latency_ms': round(avg_latency, 2),
-                    'p95_latency_ms': round(p95_latency, 2),
-                }
-            return result
-
-    @staticmethod
-    def _percentile(values: list[float], percentile: float) -> float:
-        if not values:
-            return 0.0
-        ordered = sorted(values)
-        k = (len(ordered) - 1) * (percentile / 100)
-        f = int(k)
-        c = min(f + 1, len(ordered) - 1)
-        if f == c:
-            return ordered[int(k)]
-        d0 = ordered[f] * (c - k)
-        d1 = ordered[c] * (k - f)
-        return d0 + d1
-
-
-metrics_collector = MetricsCollector()
+            self._sources[name] = source
+
+    def set_info(self, name: str, labels: Dict[str, str]) -> None:
+        """Describe a component with labels (e.g. the serving model version); exported as `<name>_info`."""
+
+        with self._lock:
+            self._info[name] = dict(labels)
+
+    def export(self) -> Dict[str, Any]:
+        """JSON-serialisable lifetime state, mergeable across worker processes (see `prometheus.py`)."""
+
+        with self._lock:
+            sources = dict(self._sources)
+            histograms = dict(self._state)
+            stages = dict(self._stages)
+            batches = {name: dict(batch) for name, batch in self._batches.items()}
+            info = {name: dict(labels) for name, labels in self._info.items()}
+        return {
+            'endpoints': {name: histogram.merged().to_dict() for name, histogram in histograms.items()},
+            'stages': {name: histogram.merged().to_dict() for name, histogram in stages.items()},
+            'batches': batches,
+            'info': info,
+            'components': {name: source() for name, source in sources.items()},
+        }
+
+    def snapshot(self) -> Dict[str, Dict[str, Any]]:
+        """Per-endpoint stats at the top level; `stages` and `components` are namespaced under their keys."""
+
+        with self._lock:
+            sources = dict(self._sources)
+            histograms = dict(self._state)
+            stages = dict(self._stages)
+            batches = {name: dict(batch) for name, batch in self._batches.items()}
+        # Sources and histograms take their own locks; call them outside ours.
+        components: Dict[str, Any] = {
+            name: {
+                'batches': batch['batches'],
+                'rows': batch['rows'],
+                'avg_batch_size': round(batch['rows'] / batch['batches'], 2) if batch['batches'] else 0.0,
+                'max_batch_size': batch['max_batch_size'],
+            }
+            for name, batch in batches.items()
+        }
+        components.update({name: source() for name, source in sources.items()})
+        result: Dict[str, Dict[str, Any]] = {name: histogram.snapshot() for name, histogram in histograms.items()}
+        if stages:
+            result['stages'] = {name: histogram.snapshot() for name, histogram in sorted(stages.items())}
+        if components:
+            result['components'] = components
+        return result
+
+metrics_collector = MetricsCollector.from_settings(get_settings())
+if get_settings().metrics_stage_timing:
+    timing.set_sink(metrics_collector.record_stage)
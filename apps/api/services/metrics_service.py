@@ -1,4 +1,4 @@
-from typing import Dict
+from typing import Any, Dict
 
 from .metrics_collector import metrics_collector
 
@@ -6,5 +6,5 @@ from .metrics_collector import metrics_collector
 class MetricsService:
     """Expose in-memory metrics snapshots for HTTP handlers."""
 
-    def get_overview(self) -> Dict[str, Dict[str, float]]:
+    def get_overview(self) -> Dict[str, Dict[str, Any]]:
         return metrics_collector.snapshot()
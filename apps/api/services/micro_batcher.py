@@ -0,0 +1,125 @@
+"""Coalesce concurrent single-item calls into one vectorized batch call."""
+
+from __future__ import annotations
+
+import logging
+import queue
+import threading
+import time
+from concurrent.futures import Future
+from typing import Any, Callable, Generic, List, Optional, Sequence, Tuple, TypeVar
+
+from apps.api import timing
+
+T = TypeVar('T')
+R = TypeVar('R')
+
+logger = logging.getLogger(__name__)
+
+_STOP = object()
+
+
+class MicroBatcher(Generic[T, R]):
+    """Queue items from many threads and score them together on one worker thread.
+
+    `batch_fn` receives the queued items in arrival order and must return one entry
+    per item; an entry that is an `Exception` is raised to that item's caller only.
+
+    Batching is adaptive: a lone request is scored immediately, and the worker only
+    holds the window open (up to `max_wait_ms`) when requests are already arriving
+    concurrently, i.e. the queue is non-empty or the previous batch had more than one
+    item. Under load, items that arrive while a batch is being scored form the next one.
+    Stages timed inside `batch_fn` count toward every request in the batch.
+    """
+
+    def __init__(
+        self,
+        batch_fn: Callable[[List[T]], Sequence[Any]],
+        *,
+        max_batch_size: int = 64,
+        max_wait_ms: float = 2.0,
+        name: str = 'micro-batcher',
+    ) -> None:
+        self._batch_fn = batch_fn
+        self.max_batch_size = max(1, max_batch_size)
+        self.max_wait_s = max(0.0, max_wait_ms) / 1000
+        self.name = name
+        self._queue: 'queue.Queue[Any]' = queue.Queue()
+        self._thread: Optional[threading.Thread] = None
+        self._start_lock = threading.Lock()
+        self._last_batch_size = 0
+        self._closed = False
+
+    def submit(self, item: T) -> 'Future[R]':
+        if self._closed:
+            raise RuntimeError(f'{self.name} is closed')
+        self._ensure_worker()
+        future: 'Future[R]' = Future()
+        self._queue.put((item, future, timing.current_breakdowns()))
+        return future
+
+    def close(self, timeout: Optional[float] = None) -> None:
+        """Score whatever is still queued, then stop the worker thread."""
+
+        self._closed = True
+        if self._thread is not None:
+            self._queue.put(_STOP)
+            self._thread.join(timeout)
+
+    def _ensure_worker(self) -> None:
+        # Started lazily so the thread is created in the serving process, not before a fork.
+        if self._thread is not None and self._thread.is_alive():
+            return
+        with self._start_lock:
+            if self._thread is None or not self._thread.is_alive():
+                self._thread = threading.Thread(target=self._run, name=self.name, daemon=True)
+                self._thread.start()
+
+    def _run(self) -> None:
+        while True:
+            first = self._queue.get()
+            if first is _STOP:
+                return
+            batch, stop = self._collect(first)
+            self._dispatch(batch)
+            if stop:
+                return
+
+    def _collect(self, first: Tuple[T, 'Future[R]', Any]) -> Tuple[List[Tuple[T, 'Future[R]', Any]], bool]:
+        batch = [first]
+        hold_window = self._last_batch_size > 1 or not self._queue.empty()
+        deadline = time.monotonic() + (self.max_wait_s if hold_window else 0.0)
+        while len(batch) < self.max_batch_size:
+            remaining = deadline - time.monotonic()
+            try:
+                item = self._queue.get(timeout=remaining) if remaining > 0 else self._queue.get_nowait()
+            except queue.Empty:
+                break
+            if item is _STOP:
+                return batch, True
+            batch.append(item)
+        return batch, False
+
+    def _dispatch(self, batch: List[Tuple[T, 'Future[R]', Any]]) -> None:
+        self._last_batch_size = len(batch)
+        live = [(item, future) for item, future, _ in batch if future.set_running_or_notify_cancel()]
+        if not live:
+            return
+        breakdowns = {id(b): b for _, _, request in batch for b in request}
+        try:
+            with timing.attribute_to(breakdowns.values()):
+                outputs = self._batch_fn([item for item, _ in live])
+        except Exception as exc:  # noqa: BLE001 - surfaced to every waiting caller
+            for _, future in live:
+                future.set_exception(exc)
+            return
+        if len(outputs) != len(live):
+            error = RuntimeError(f'{self.name}: batch_fn returned {len(outputs)} results for {len(live)} items')
+            for _, future in live:
+                future.set_exception(error)
+            return
+        for (_, future), output in zip(live, outputs, strict=True):
+            if isinstance(output, Exception):
+                future.set_exception(output)
+            else:
+                future.set_result(output)
@@ -1,60 +1,218 @@
+import hashlib
 import json
 import logging
 import time
+import threading
 import uuid
+from concurrent.futures import Future
+from dataclasses import dataclass
 from datetime import datetime
 from pathlib import Path
-from typing import Any, Dict, Optional, Tuple
+from typing import Any, Dict, List, NamedTuple, Optional, Sequence, Tuple
 
 import joblib
+import numpy as np
 import pandas as pd
 from confluent_kafka import Producer
 import mlflow.lightgbm
 from mlflow.tracking import MlflowClient
 
+from apps.api.cache import LRUCache
+from apps.api.timing import stage
 from apps.api.config.settings import get_settings
 from mlops.utils import resolve_tracking_uri, apply_mlflow_env
+from .artifact_cache import ModelArtifactCache
+from .compiled_preprocessor import CompiledPreprocessor
+from .event_publisher import PredictionEventPublisher
+from .executors import get_executor_pools
+from .metrics_collector import metrics_collector
+from .micro_batcher import MicroBatcher
+from .model_watcher import ModelWatcher
+
+
+@dataclass(frozen=True)
+class LoadedModel:
+    """Everything needed to score one Production run, swapped as a single reference."""
+
+    version: str
+    preprocessor: Any
+    model: Any
+    feature_names_in_: Tuple[str, ...]
+    compiled: Optional[CompiledPreprocessor]
+
+
+class Prediction(NamedTuple):
+    prediction: int
+    proba: float
+    latency_ms: float
+    event_id: Optional[str]
+    cached: bool
+    model_version: str
+
+
+class BatchPrediction(NamedTuple):
+    results: List[Dict[str, Any]]
+    latency_ms: float
+    model_version: str
+
 
 class ModelService:
-    def __init__(self):
+    def __init__(self, *, background_workers: bool = True):
         self.settings = get_settings()
         self.logger = logging.getLogger(self.__class__.__name__)
         apply_mlflow_env(self.settings)
-        self._initialized = False
-        self.model = None
-        self.preprocessor = None
-        self.feature_names_in_ = None
-        self.version = None
+        # Requests read `_active` once and use that bundle throughout, so a hot swap
+        # never mixes the preprocessor of one run with the model of another.
+        self._active: Optional[LoadedModel] = None
+        self._load_lock = threading.Lock()
         self._artifact_source = 'unknown'
-        self.artifact_dir = Path('/tmp/model_artifacts')
-        self.artifact_dir.mkdir(parents=True, exist_ok=True)
-        self.tracking_uri = resolve_tracking_uri(
-            self.settings.mlflow_tracking_uri,
-            allow_fallback=False,
-            logger=self.logger,
+        self.artifact_cache = ModelArtifactCache(
+            Path(self.settings.model_cache_dir), self.settings.model_cache_max_bytes
         )
+        try:
+            self.tracking_uri = resolve_tracking_uri(
+                self.settings.mlflow_tracking_uri,
+                allow_fallback=False,
+                logger=self.logger,
+            )
+        except ConnectionError:
+            if self.settings.model_boot_mode != 'cache_first':
+                raise
+            # Boot from the artifact cache; the watcher/revalidation retries MLflow later.
+            self.tracking_uri = self.settings.mlflow_tracking_uri
         self._artifact_source = (
             'mlflow-remote'
             if self.tracking_uri.startswith(('http://', 'https://'))
             else 'mlflow-local'
         )
         self.client = MlflowClient(tracking_uri=self.tracking_uri)
-        self.producer = self._init_producer()
+        self.publisher: Optional[PredictionEventPublisher] = None
+        self._batcher: Optional[MicroBatcher] = None
+        self.cache: Optional[LRUCache] = None
+        self.watcher: Optional[ModelWatcher] = None
+        self._background_started = False
+        self._needs_revalidation = False
+        # Process-pool workers only score, and a pre-fork master must not own threads
+        # (librdkafka starts its own as soon as the Producer exists).
+        if background_workers:
+            self.start_background_workers()
+
+    def start_background_workers(self) -> None:
+        """Create the Kafka publisher, micro-batcher and prediction cache (idempotent)."""
+
+        if self._background_started:
+            return
+        self._background_started = True
+        self.publisher = self._init_publisher()
+        self._batcher = self._init_batcher()
+        self.cache = self._init_cache()
+        metrics_collector.register_source('model_artifact_cache', self.artifact_cache.stats)
+        if self._needs_revalidation:
+            self._needs_revalidation = False
+            self._revalidate_in_background()
 
-    def _init_producer(self):
+    def _init_publisher(self) -> Optional[PredictionEventPublisher]:
         bootstrap_servers = self.settings.kafka_bootstrap_servers
         if not bootstrap_servers:
             return None
-        return Producer({'bootstrap.servers': bootstrap_servers})
+        producer = Producer({
+            'bootstrap.servers': bootstrap_servers,
+            'linger.ms': self.settings.kafka_linger_ms,
+            'batch.size': self.settings.kafka_batch_size,
+            'compression.type': self.settings.kafka_compression_type,
+        })
+        publisher = PredictionEventPublisher(
+            producer,
+            self.settings.kafka_topic_predictions,
+            max_queue_size=self.settings.kafka_queue_max_size,
+            overflow_policy=self.settings.kafka_overflow_policy,
+            block_timeout_ms=self.settings.kafka_block_timeout_ms,
+            poll_interval_ms=self.settings.kafka_poll_interval_ms,
+            flush_timeout_s=self.settings.kafka_flush_timeout_s,
+        )
+        metrics_collector.register_source('kafka_publisher', publisher.stats)
+        return publisher
 
-    def _load_model(self):
-        if self._initialized:
-            return
+    def _init_batcher(self) -> Optional[MicroBatcher]:
+        if self.settings.classifier_batch_max_size <= 1:
+            return None
+        return MicroBatcher(
+            self._predict_many,
+            max_batch_size=self.settings.classifier_batch_max_size,
+            max_wait_ms=self.settings.classifier_batch_max_wait_ms,
+            name='classifier-batcher',
+        )
+
+    def _init_cache(self) -> Optional[LRUCache]:
+        if self.settings.prediction_cache_max_entries <= 0:
+            return None
+        cache: LRUCache = LRUCache(
+            self.settings.prediction_cache_max_entries,
+            ttl_s=self.settings.prediction_cache_ttl_s or None,
+        )
+        metrics_collector.register_source('prediction_cache', cache.stats)
+        return cache
+
+    @property
+    def version(self) -> Optional[str]:
+        return self._active.version if self._active else None
+
+    @property
+    def model(self) -> Any:
+        return self._active.model if self._active else None
+
+    @property
+    def preprocessor(self) -> Any:
+        return self._active.preprocessor if self._active else None
+
+    @property
+    def feature_names_in_(self) -> Optional[Tuple[str, ...]]:
+        return self._active.feature_names_in_ if self._active else None
+
+    def _load_model(self) -> LoadedModel:
+        active = self._active
+        if active is not None:
+            return active
+        with self._load_lock:
+            if self._active is None:
+                cached = self._load_cached_production() if self.settings.model_boot_mode == 'cache_first' else None
+                if cached is not None:
+                    self._activate(cached)
+                    if self._background_started:
+                        self._revalidate_in_background()
+                    else:
+                        self._needs_revalidation = True
+                else:
+                    self._activate(self._load_bundle(self._resolve_production_run_id()))
+            return self._active
+
+    def _load_cached_production(self) -> Optional[LoadedModel]:
+        """Load the last known Production run straight from disk, without contacting MLflow."""
+
+        run_id = self.artifact_cache.production_run_id()
+        if run_id is None or self.artifact_cache.get(run_id) is None:
+            return None
+        try:
+            return self._load_bundle(run_id)
+        except Exception as exc:
+            self.logger.warning('Cached Production model %s unusable, falling back to MLflow: %s', run_id, exc)
+            return None
+
+    def _revalidate_in_background(self) -> None:
+        def _revalidate() -> None:
+            try:
+                self.refresh()
+            except Exception as exc:
+                self.logger.warning('Could not revalidate cached model against MLflow: %s', exc)
+
+        threading.Thread(target=_revalidate, name='model-revalidate', daemon=True).start()
+
+    def _resolve_production_run_id(self) -> str:
         exp_name = self.settings.mlflow_experiment_name
         exp = self.client.get_experiment_by_name(exp_name)
         if not exp:
             raise RuntimeError(f'Experiment {exp_name} not found on MLflow server {self.tracking_uri}')
-        
+
         runs = self.client.search_runs(
             experiment_ids=[exp.experiment_id],
             filter_string="tags.stage = 'Production'",
@@ -63,79 +221,402 @@ class ModelService:
         )
         if not runs:
             raise RuntimeError('No Production stage model found. Run MLOps pipeline and promote a model first.')
-        
-        run_id = runs[0].info.run_id
-        self.version = run_id
-        
+        return runs[0].info.run_id
+
+    def _load_run(self, run_id: str) -> None:
+        with self._load_lock:
+            self._activate(self._load_bundle(run_id))
+
+    def _load_bundle(self, run_id: str) -> LoadedModel:
         self.logger.info('Loading Production model %s from %s', run_id, self.tracking_uri)
 
-        preprocessor_path = self.client.download_artifacts(
-            run_id, 'preprocessor.joblib', str(self.artifact_dir)
+        run_dir = self.artifact_cache.fetch(self.client, run_id)
+        preprocessor = joblib.load(run_dir / 'preprocessor.joblib')
+        model = mlflow.lightgbm.load_model(str(run_dir / 'model'))
+
+        return LoadedModel(
+            version=run_id,
+            preprocessor=preprocessor,
+            model=model,
+            feature_names_in_=tuple(preprocessor.feature_names_in_),
+            compiled=self._compile_preprocessor(preprocessor),
         )
-        self.preprocessor = joblib.load(preprocessor_path)
-        self.feature_names_in_ = self.preprocessor.feature_names_in_
-        
-        model_uri = f'runs:/{run_id}/model'
-        self.model = mlflow.lightgbm.load_model(model_uri)
-        
-        self._initialized = True
-        self.logger.info('Loaded Production model %s', run_id)
-
-    def _prepare_features(self, features: Dict[str, Any]) -> pd.DataFrame:
-        df = pd.DataFrame([features])
-        expected = list(self.feature_names_in_)
-        missing = [col for col in expected if col not in df.columns]
+
+    def _activate(self, bundle: LoadedModel) -> None:
+        # Caller holds self._load_lock. A single reference assignment is the swap.
+        self._active = bundle
+        self.artifact_cache.set_production(bundle.version)
+        if self.cache is not None:
+            # Keys already include the version; clearing just frees the old model's entries.
+            self.cache.clear()
+        metrics_collector.set_info('model', {'version': bundle.version})
+        self.logger.info('Loaded Production model %s', bundle.version)
+
+    def refresh(self) -> bool:
+        """Load the newest Production run off the request path and swap it in if it warms up.
+
+        Returns True when a new version was activated. Any failure (lookup, download,
+        warmup) propagates and leaves the current model serving.
+        """
+
+        run_id = self._resolve_production_run_id()
+        if self._active is not None and run_id == self._active.version:
+            return False
+        bundle = self._load_bundle(run_id)
+        self._warmup(bundle)
+        with self._load_lock:
+            previous = self.version
+            self._activate(bundle)
+        self.logger.info('Hot-swapped Production model %s -> %s', previous, run_id)
+        return True
+
+    def _warmup(self, bundle: LoadedModel) -> None:
+        """Score a synthetic row so a broken artifact is caught before it serves traffic."""
+
+        row = _warmup_row(bundle.preprocessor, bundle.feature_names_in_)
+        predictions, probas = self._score(bundle, [row])
+        if len(predictions) != 1 or not np.isfinite(probas).all():
+            raise RuntimeError(f'Warmup prediction for {bundle.version} returned invalid output')
+
+    def start_watcher(self) -> Optional[ModelWatcher]:
+        interval = self.settings.model_watch_interval_s
+        if interval <= 0 or self.watcher is not None:
+            return self.watcher
+        self.watcher = ModelWatcher(self.refresh, interval)
+        metrics_collector.register_source('model_watcher', self.watcher.stats)
+        self.watcher.start()
+        return self.watcher
+
+    def _compile_preprocessor(self, preprocessor) -> Optional[CompiledPreprocessor]:
+        if not self.settings.classifier_compiled_preprocessing:
+            return None
+        compiled = CompiledPreprocessor.compile(preprocessor)
+        if compiled is None:
+            self.logger.info('Preprocessor is not compilable; using sklearn transform')
+        return compiled
+
+    @staticmethod
+    def _missing_features(bundle: LoadedModel, features: Dict[str, Any]) -> List[str]:
+        return [col for col in bundle.feature_names_in_ if col not in features]
+
+    def _validate_features(self, bundle: LoadedModel, features: Dict[str, Any]) -> None:
+        missing = self._missing_features(bundle, features)
         if missing:
             raise ValueError(f'Missing required features: {missing}')
-        df = df[expected]
-        return df
 
-    def predict(self, features: Dict[str, Any]) -> Tuple[int, float, float, Optional[str]]:
-        self._load_model()
-        start_time = time.time()
+    @staticmethod
+    def _prepare_batch(bundle: LoadedModel, rows: Sequence[Dict[str, Any]]) -> pd.DataFrame:
+        # Rows are assumed validated; build a single frame in the fitted column order.
+        return pd.DataFrame.from_records(list(rows), columns=list(bundle.feature_names_in_))
 
-        df = self._prepare_features(features)
-        X_proc = self.preprocessor.transform(df)
+    def _transform(self, bundle: LoadedModel, rows: Sequence[Dict[str, Any]]) -> np.ndarray:
+        if bundle.compiled is None:
+            with stage('classifier.prepare_features'):
+                frame = self._prepare_batch(bundle, rows)
+            with stage('classifier.transform'):
+                return bundle.preprocessor.transform(frame)
+        # The compiled preprocessor reads the dicts directly; there is no frame to build.
+        with stage('classifier.transform'):
+            if len(rows) == 1:
+                return bundle.compiled.transform_row(rows[0])[np.newaxis, :]
+            return bundle.compiled.transform_rows(rows)
 
-        prediction = int(self.model.predict(X_proc)[0])
-        proba = float(self.model.predict_proba(X_proc)[0][1])
-        latency_ms = (time.time() - start_time) * 1000
-        event_id = str(uuid.uuid4())
+    def _score(self, bundle: LoadedModel, rows: Sequence[Dict[str, Any]]) -> Tuple[np.ndarray, np.ndarray]:
+        """Run preprocessing and one `predict_proba` call over every validated row."""
 
-        event = {
+        X_proc = self._transform(bundle, rows)
+        with stage('classifier.predict_proba'):
+            probas = bundle.model.predict_proba(X_proc)
+        # Same decision rule as LGBMClassifier.predict, without a second model pass.
+        predictions = bundle.model.classes_[np.argmax(probas, axis=1)]
+        return predictions, probas[:, 1]
+
+    @staticmethod
+    def _build_event(
+        version: str, features: Dict[str, Any], prediction: int, proba: float, latency_ms: float
+    ) -> Dict[str, Any]:
+        return {
             'timestamp': datetime.utcnow().isoformat(),
             'prediction': prediction,
             'proba': proba,
-            'model_version': self.version,
+            'model_version': version,
             'latency_ms': latency_ms,
             'features': features,
-            'event_id': event_id,
+            'event_id': str(uuid.uuid4()),
         }
-        if self.producer:
+
+    def _publish_events(self, events: Sequence[Dict[str, Any]]) -> None:
+        """Hand events to the background publisher; never waits on the broker."""
+
+        if self.publisher:
+            with stage('classifier.publish'):
+                self.publisher.publish(events)
+
+    def _cache_key(self, bundle: LoadedModel, features: Dict[str, Any]) -> Optional[str]:
+        """Stable digest of the ordered model inputs plus model version (None if uncacheable)."""
+
+        if self.cache is None or self._missing_features(bundle, features):
+            return None
+        values = [features[col] for col in bundle.feature_names_in_]
+        try:
+            payload = json.dumps([bundle.version, values], separators=(',', ':'))
+        except (TypeError, ValueError):
+            return None
+        return hashlib.blake2b(payload.encode('utf-8'), digest_size=16).hexdigest()
+
+    def _cache_get(
+        self, bundle: LoadedModel, features: Dict[str, Any]
+    ) -> Tuple[Optional[str], Optional[Tuple[int, float]]]:
+        with stage('classifier.cache_lookup'):
+            key = self._cache_key(bundle, features)
+            return key, (self.cache.get(key) if key is not None else None)
+
+    def _cache_put(self, key: Optional[str], prediction: int, proba: float) -> None:
+        if key is not None:
+            self.cache.put(key, (prediction, proba))
+
+    def predict(self, features: Dict[str, Any]) -> Prediction:
+        return self.submit(features).result()
+
+    def submit(self, features: Dict[str, Any]) -> 'Future[Prediction]':
+        """Queue a single-row prediction; concurrent submissions are scored together."""
+
+        bundle = self._load_model()
+        start_time = time.time()
+        key, hit = self._cache_get(bundle, features)
+        if hit is not None:
+            future: Future = Future()
+            future.set_result(self._serve_cached(bundle, features, hit, start_time))
+            return future
+        if self._batcher is not None:
+            return self._batcher.submit(features)
+        return get_executor_pools().classifier.submit(self._predict_one, bundle, features, key)
+
+    def _serve_cached(
+        self, bundle: LoadedModel, features: Dict[str, Any], hit: Tuple[int, float], start_time: float
+    ) -> Prediction:
+        prediction, proba = hit
+        latency_ms = (time.time() - start_time) * 1000
+        event = self._build_event(bundle.version, features, prediction, proba, latency_ms)
+        self._publish_events([event])
+        event_id = event['event_id'] if self.publisher else None
+        return Prediction(prediction, proba, latency_ms, event_id, True, bundle.version)
+
+    def _predict_one(
+        self, bundle: LoadedModel, features: Dict[str, Any], cache_key: Optional[str] = None
+    ) -> Prediction:
+        start_time = time.time()
+
+        self._validate_features(bundle, features)
+        predictions, probas = self._score(bundle, [features])
+        prediction = int(predictions[0])
+        proba = float(probas[0])
+        latency_ms = (time.time() - start_time) * 1000
+        self._cache_put(cache_key, prediction, proba)
+
+        event = self._build_event(bundle.version, features, prediction, proba, latency_ms)
+        self._publish_events([event])
+
+        event_id = event['event_id'] if self.publisher else None
+        return Prediction(prediction, proba, latency_ms, event_id, False, bundle.version)
+
+    def _predict_many(self, rows: List[Dict[str, Any]]) -> List[Any]:
+        """Micro-batcher callback: fan `predict_batch` results back out as `Prediction`s."""
+
+        metrics_collector.record_batch('classifier_batching', len(rows))
+        # `submit` already missed the cache for these rows; only store the fresh scores.
+        batch = self._predict_batch(rows, lookup_cache=False)
+        outputs: List[Any] = []
+        for result in batch.results:
+            if result.get('error'):
+                outputs.append(ValueError(result['error']))
+            else:
+                outputs.append(Prediction(
+                    result['prediction'],
+                    result['proba'],
+                    batch.latency_ms,
+                    result.get('event_id'),
+                    False,
+                    batch.model_version,
+                ))
+        return outputs
+
+    def predict_batch(self, rows: Sequence[Dict[str, Any]]) -> BatchPrediction:
+        """Score many feature dicts with one preprocessing + `predict_proba` pass.
+
+        Returns one result per input row (in order), the batch latency, and the model
+        version that scored it. Rows that fail validation carry an `error` instead of a
+        prediction and do not abort the rest of the batch. Cached rows are served
+        without scoring, and batches of at least `CLASSIFIER_PROCESS_MIN_BATCH` uncached
+        rows are scored on the process pool when one is configured.
+        """
+
+        return self._predict_batch(rows, lookup_cache=True)
+
+    def _predict_batch(self, rows: Sequence[Dict[str, Any]], *, lookup_cache: bool) -> BatchPrediction:
+        bundle = self._load_model()
+        start_time = time.time()
+
+        results: List[Optional[Dict[str, Any]]] = [None] * len(rows)
+        keys: List[Optional[str]] = [None] * len(rows)
+        miss_idx: List[int] = []
+        for idx, features in enumerate(rows):
+            if lookup_cache:
+                keys[idx], hit = self._cache_get(bundle, features)
+            else:
+                keys[idx], hit = self._cache_key(bundle, features), None
+            if hit is not None:
+                results[idx] = {'index': idx, 'prediction': hit[0], 'proba': hit[1], 'cached': True}
+            else:
+                miss_idx.append(idx)
+
+        misses = [rows[idx] for idx in miss_idx]
+        pool = None
+        if len(misses) >= self.settings.classifier_process_min_batch:
+            pool = get_executor_pools().classifier_process(bundle.version, _init_process_worker, (bundle.version,))
+        if pool is not None:
+            scored = pool.submit(_score_in_process, misses).result()
+        else:
+            scored = self._score_batch(bundle, misses)
+        for idx, result in zip(miss_idx, scored, strict=True):
+            result['index'] = idx
+            result['cached'] = False
+            results[idx] = result
+            if 'error' not in result:
+                self._cache_put(keys[idx], result['prediction'], result['proba'])
+
+        latency_ms = (time.time() - start_time) * 1000
+        events = []
+        for idx, result in enumerate(results):
+            if 'error' in result:
+                continue
+            event = self._build_event(bundle.version, rows[idx], result['prediction'], result['proba'], latency_ms)
+            events.append(event)
+            if self.publisher:
+                result['event_id'] = event['event_id']
+        self._publish_events(events)
+
+        return BatchPrediction(results, latency_ms, bundle.version)
+
+    def _score_batch(self, bundle: LoadedModel, rows: Sequence[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        results: List[Dict[str, Any]] = [{'index': idx} for idx in range(len(rows))]
+        valid_idx: List[int] = []
+        for idx, features in enumerate(rows):
+            missing = self._missing_features(bundle, features)
+            if missing:
+                results[idx]['error'] = f'Missing required features: {missing}'
+            else:
+                valid_idx.append(idx)
+
+        if valid_idx:
+            try:
+                predictions, probas = self._score(bundle, [rows[i] for i in valid_idx])
+            except Exception:
+                # A bad value poisons the vectorized call; isolate it by scoring row by row.
+                predictions, probas = self._score_rows_individually(bundle, rows, valid_idx, results)
+            else:
+                predictions, probas = list(predictions), list(probas)
+            valid_idx = [i for i in valid_idx if 'error' not in results[i]]
+            for idx, prediction, proba in zip(valid_idx, predictions, probas, strict=True):
+                results[idx]['prediction'] = int(prediction)
+                results[idx]['proba'] = float(proba)
+        return results
+
+    def _score_rows_individually(
+        self,
+        bundle: LoadedModel,
+        rows: Sequence[Dict[str, Any]],
+        indices: Sequence[int],
+        results: List[Dict[str, Any]],
+    ) -> Tuple[List[Any], List[Any]]:
+        predictions: List[Any] = []
+        probas: List[Any] = []
+        for idx in indices:
             try:
-                self.producer.produce('predictions', key=event_id, value=json.dumps(event))
-                self.producer.flush()
+                prediction, proba = self._score(bundle, [rows[idx]])
             except Exception as exc:
-                self.logger.warning('Failed to publish prediction event: %s', exc)
+                results[idx]['error'] = str(exc)
+                continue
+            predictions.append(prediction[0])
+            probas.append(proba[0])
+        return predictions, probas
 
-        return prediction, proba, latency_ms, event_id if self.producer else None
+    def close(self) -> None:
+        """Stop background workers and flush queued prediction events."""
+
+        if self.watcher is not None:
+            self.watcher.stop()
+        if self._batcher is not None:
+            self._batcher.close(timeout=5)
+        if self.publisher is not None:
+            self.publisher.close()
 
     def get_version(self) -> str:
-        self._load_model()
-        return self.version
+        return self._load_model().version
 
     @property
     def artifact_source(self) -> str:
         return self._artifact_source
 
+def _warmup_row(preprocessor: Any, feature_names: Sequence[str]) -> Dict[str, Any]:
+    """Build a plausible feature dict from the fitted transformers' own statistics."""
+
+    row: Dict[str, Any] = {col: None for col in feature_names}
+    for _, transformer, columns in getattr(preprocessor, 'transformers_', []):
+        if hasattr(transformer, 'mean_') and transformer.mean_ is not None:
+            row.update(zip(columns, (float(v) for v in transformer.mean_), strict=True))
+        elif hasattr(transformer, 'categories_'):
+            row.update(zip(columns, (cats[0] for cats in transformer.categories_), strict=True))
+    return row
+
+
 from functools import lru_cache
 
+_process_service: Optional[ModelService] = None
+_preloaded_service: Optional[ModelService] = None
+
+
+def _init_process_worker(run_id: str) -> None:
+    """Process-pool initializer: load the parent's model version once per worker."""
+
+    global _process_service
+    _process_service = ModelService(background_workers=False)
+    # Scoring only: the serving process owns the manifest's Production run, the prediction
+    # cache and the model info, so skip `_activate()`'s side effects.
+    _process_service._active = _process_service._load_bundle(run_id)
+
+
+def _score_in_process(rows: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+    return _process_service._score_batch(_process_service._active, rows)
+
+
+def preload_model_service() -> ModelService:
+    """Load the Production model in a pre-fork master process.
+
+    The service is created without background threads, so it is safe to fork; each
+    worker adopts it through `get_model_service()` and shares the model's memory
+    pages copy-on-write instead of loading its own copy.
+    """
+
+    global _preloaded_service
+    service = ModelService(background_workers=False)
+    service._load_model()
+    _preloaded_service = service
+    return service
+
+
 @lru_cache()
 def get_model_service() -> ModelService:
-    service = ModelService()
-    # Pre-load model on startup to avoid first-request latency
-    try:
-        service._load_model()
-    except Exception as e:
-        service.logger.warning(f"Could not pre-load model: {e}")
+    service = _preloaded_service
+    if service is not None:
+        service.start_background_workers()
+    else:
+        service = ModelService()
+        # Pre-load model on startup to avoid first-request latency
+        try:
+            service._load_model()
+        except Exception as e:
+            service.logger.warning(f"Could not pre-load model: {e}")
+    # Keeps polling even if the pre-load failed, so a later promotion is picked up.
+    service.start_watcher()
     return service
@@ -0,0 +1,68 @@
+"""Background poller that hot-swaps newly promoted Production models."""
+
+from __future__ import annotations
+
+import logging
+import threading
+import time
+from typing import Any, Callable, Dict, Optional
+
+logger = logging.getLogger(__name__)
+
+
+class ModelWatcher:
+    """Call `refresh()` every `interval_s` seconds on a daemon thread.
+
+    `refresh` returns True when it activated a new model. Exceptions are logged and
+    counted; the currently loaded model keeps serving and the next poll retries.
+    """
+
+    def __init__(self, refresh: Callable[[], bool], interval_s: float) -> None:
+        self._refresh = refresh
+        self.interval_s = interval_s
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+        self._lock = threading.Lock()
+        self._stats: Dict[str, Any] = {'checks': 0, 'swaps': 0, 'failures': 0, 'last_error': None, 'last_check': None}
+
+    def start(self) -> None:
+        if self._thread is not None and self._thread.is_alive():
+            return
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._run, name='model-watcher', daemon=True)
+        self._thread.start()
+
+    def stop(self, timeout: Optional[float] = 5.0) -> None:
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join(timeout)
+
+    def check_now(self) -> bool:
+        """Run one poll synchronously; returns True if a new model was swapped in."""
+
+        try:
+            swapped = self._refresh()
+        except Exception as exc:  # noqa: BLE001 - a failed load must never kill the watcher
+            logger.warning('Production model refresh failed; keeping current model: %s', exc)
+            self._record(failed=True, error=str(exc))
+            return False
+        self._record(swapped=swapped)
+        return swapped
+
+    def _run(self) -> None:
+        while not self._stop.wait(self.interval_s):
+            self.check_now()
+
+    def _record(self, swapped: bool = False, failed: bool = False, error: Optional[str] = None) -> None:
+        with self._lock:
+            self._stats['checks'] += 1
+            self._stats['last_check'] = time.time()
+            if swapped:
+                self._stats['swaps'] += 1
+            if failed:
+                self._stats['failures'] += 1
+                self._stats['last_error'] = error
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            return {**self._stats, 'interval_s': self.interval_s}
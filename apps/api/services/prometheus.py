@@ -0,0 +1,250 @@
+"""Prometheus text exposition of the metrics collector, aggregated across worker processes.
+
+Each worker's `MetricsCollector` is per process. With ``METRICS_MULTIPROC_DIR`` set, every
+worker writes its lifetime state (`MetricsCollector.export()`) to ``<dir>/<pid>.json``
+every ``METRICS_PUBLISH_INTERVAL_S`` and on every scrape it serves. A scrape reads all the
+files and merges them:
+
+- Request and stage counters and histograms are summed over every file, including those
+  of workers that have exited, so totals never go backwards when a worker is respawned.
+- Component gauges (pool depth, cache sizes, ...) come from live workers only, labelled
+  with ``worker``, because summing ratios or sizes across processes rarely means anything.
+- ``*_info`` series count the live workers reporting each label set, which shows a
+  rolling model upgrade as two versions side by side.
+
+Scrapes therefore cost one small file read per worker, and other workers' numbers are at
+most one publish interval old. The directory must start empty: `apps.api.server` clears
+(or creates) it before forking.
+"""
+
+from __future__ import annotations
+
+import json
+import logging
+import math
+import os
+import re
+import threading
+from functools import lru_cache
+from pathlib import Path
+from typing import Any, Dict, Iterator, List, Optional, Sequence, Tuple
+
+from apps.api.config.settings import get_settings
+
+from .histogram import HistogramCounts
+from .metrics_collector import MetricsCollector, metrics_collector
+
+logger = logging.getLogger(__name__)
+
+NAMESPACE = 'asfotec'
+CONTENT_TYPE = 'text/plain; version=0.0.4; charset=utf-8'
+# Prometheus `le` bounds in seconds; the log-bucketed histograms are collapsed onto these.
+LATENCY_BUCKETS_S: Tuple[float, ...] = (
+    0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0,
+)
+
+_INVALID_NAME_CHARS = re.compile(r'[^a-zA-Z0-9_]')
+
+
+class MultiprocessStore:
+    """One JSON file per worker pid; writes are atomic so readers never see a partial file."""
+
+    def __init__(self, directory: Path) -> None:
+        self.directory = Path(directory)
+
+    def publish(self, state: Dict[str, Any], pid: Optional[int] = None) -> None:
+        pid = pid or os.getpid()
+        self.directory.mkdir(parents=True, exist_ok=True)
+        path = self.directory / f'{pid}.json'
+        tmp = path.with_suffix(f'.json.{threading.get_ident()}.tmp')
+        tmp.write_text(json.dumps(state, default=str))
+        os.replace(tmp, path)
+
+    def collect(self) -> List[Tuple[int, bool, Dict[str, Any]]]:
+        """`(pid, alive, state)` for every worker that has published, oldest pid first."""
+
+        states = []
+        for path in sorted(self.directory.glob('*.json'), key=lambda p: p.stem):
+            try:
+                pid = int(path.stem)
+                state = json.loads(path.read_text())
+            except (ValueError, OSError):  # foreign file, or removed mid-scan
+                continue
+            states.append((pid, _alive(pid), state))
+        return states
+
+    def clear(self) -> None:
+        self.directory.mkdir(parents=True, exist_ok=True)
+        for path in self.directory.iterdir():
+            if path.suffix in ('.json', '.tmp'):
+                path.unlink(missing_ok=True)
+
+
+def _alive(pid: int) -> bool:
+    if pid == os.getpid():
+        return True
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:  # exists, owned by someone else
+        return True
+    return True
+
+
+class MetricsPublisher:
+    """Background thread that publishes this worker's state; start it after the fork."""
+
+    def __init__(self, store: MultiprocessStore, collector: MetricsCollector, interval_s: float) -> None:
+        self.store = store
+        self.collector = collector
+        self.interval_s = max(0.1, interval_s)
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    def publish(self) -> None:
+        try:
+            self.store.publish(self.collector.export())
+        except Exception:  # noqa: BLE001 - metrics must never take a worker down
+            logger.exception('Could not publish metrics to %s', self.store.directory)
+
+    def start(self) -> None:
+        if self._thread is None:
+            self._thread = threading.Thread(target=self._run, name='metrics-publisher', daemon=True)
+            self._thread.start()
+
+    def _run(self) -> None:
+        while not self._stop.wait(self.interval_s):
+            self.publish()
+
+    def stop(self) -> None:
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join(self.interval_s)
+        self.publish()
+
+
+def render(states: Sequence[Tuple[int, bool, Dict[str, Any]]]) -> str:
+    """Prometheus text format for the merged `(pid, alive, state)` worker states."""
+
+    endpoints: Dict[str, HistogramCounts] = {}
+    stages: Dict[str, HistogramCounts] = {}
+    batches: Dict[str, Dict[str, int]] = {}
+    info: Dict[str, Dict[Tuple[Tuple[str, str], ...], int]] = {}
+    components: Dict[str, List[Tuple[Dict[str, str], float]]] = {}
+    for pid, alive, state in states:
+        for target, key in ((endpoints, 'endpoints'), (stages, 'stages')):
+            for name, data in state.get(key, {}).items():
+                target.setdefault(name, HistogramCounts()).merge(HistogramCounts.from_dict(data))
+        for name, batch in state.get('batches', {}).items():
+            total = batches.setdefault(name, {'batches': 0, 'rows': 0})
+            total['batches'] += batch['batches']
+            total['rows'] += batch['rows']
+        if not alive:
+            continue
+        for name, labels in state.get('info', {}).items():
+            workers = info.setdefault(name, {})
+            label_set = tuple(sorted(labels.items()))
+            workers[label_set] = workers.get(label_set, 0) + 1
+        for source, stats in state.get('components', {}).items():
+            for path, value in _numeric_leaves(stats):
+                components.setdefault(_metric_name(source, *path), []).append(({'worker': str(pid)}, value))
+
+    lines: List[str] = []
+    _counter(lines, 'requests_total', 'Requests served, by endpoint.',
+             [({'endpoint': name}, counts.count) for name, counts in sorted(endpoints.items())])
+    _counter(lines, 'request_errors_total', 'Requests that failed, by endpoint.',
+             [({'endpoint': name}, counts.errors) for name, counts in sorted(endpoints.items())])
+    _histogram(lines, 'request_latency_seconds', 'End-to-end request latency.', 'endpoint', endpoints)
+    _histogram(lines, 'stage_latency_seconds', 'Time spent in each hot-path stage.', 'stage', stages)
+    _counter(lines, 'batches_total', 'Batches formed by each batcher.',
+             [({'batcher': name}, batch['batches']) for name, batch in sorted(batches.items())])
+    _counter(lines, 'batch_rows_total', 'Rows scored through each batcher.',
+             [({'batcher': name}, batch['rows']) for name, batch in sorted(batches.items())])
+    for name, label_sets in sorted(info.items()):
+        _gauge(lines, f'{_metric_name(name)}_info', f'Live workers reporting each {name} label set.',
+               [(dict(labels), workers) for labels, workers in sorted(label_sets.items())])
+    for name, samples in sorted(components.items()):
+        _gauge(lines, name, 'Component gauge, per live worker.', samples)
+    return '\n'.join(lines) + '\n'
+
+
+def _counter(lines: List[str], name: str, help_text: str, samples: List[Tuple[Dict[str, str], float]]) -> None:
+    _samples(lines, name, help_text, 'counter', samples)
+
+
+def _gauge(lines: List[str], name: str, help_text: str, samples: List[Tuple[Dict[str, str], float]]) -> None:
+    _samples(lines, name, help_text, 'gauge', samples)
+
+
+def _samples(
+    lines: List[str], name: str, help_text: str, kind: str, samples: List[Tuple[Dict[str, str], float]]
+) -> None:
+    if not samples:
+        return
+    metric = f'{NAMESPACE}_{name}'
+    lines += [f'# HELP {metric} {help_text}', f'# TYPE {metric} {kind}']
+    lines += [f'{metric}{_labels(labels)} {_number(value)}' for labels, value in samples]
+
+
+def _histogram(lines: List[str], name: str, help_text: str, label: str, series: Dict[str, HistogramCounts]) -> None:
+    if not series:
+        return
+    metric = f'{NAMESPACE}_{name}'
+    lines += [f'# HELP {metric} {help_text}', f'# TYPE {metric} histogram']
+    for key, counts in sorted(series.items()):
+        at_most = counts.counts_at_most([bound * 1000 for bound in LATENCY_BUCKETS_S])
+        for bound, n in zip(LATENCY_BUCKETS_S, at_most, strict=True):
+            lines.append(f'{metric}_bucket{_labels({label: key, "le": _number(bound)})} {n}')
+        lines.append(f'{metric}_bucket{_labels({label: key, "le": "+Inf"})} {counts.count}')
+        lines.append(f'{metric}_sum{_labels({label: key})} {_number(counts.total_ms / 1000)}')
+        lines.append(f'{metric}_count{_labels({label: key})} {counts.count}')
+
+
+def _numeric_leaves(stats: Any, path: Tuple[str, ...] = ()) -> Iterator[Tuple[Tuple[str, ...], float]]:
+    if isinstance(stats, dict):
+        for key, value in stats.items():
+            yield from _numeric_leaves(value, path + (str(key),))
+    elif isinstance(stats, (bool, int, float)) and path:
+        yield path, float(stats)
+
+
+def _metric_name(*parts: str) -> str:
+    name = _INVALID_NAME_CHARS.sub('_', '_'.join(parts)).strip('_').lower()
+    return f'_{name}' if name[:1].isdigit() else name
+
+
+def _labels(labels: Dict[str, str]) -> str:
+    if not labels:
+        return ''
+    return '{' + ','.join(f'{key}="{_escape(str(value))}"' for key, value in labels.items()) + '}'
+
+
+def _escape(value: str) -> str:
+    return value.replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+
+
+def _number(value: float) -> str:
+    if isinstance(value, float) and math.isinf(value):
+        return '+Inf' if value > 0 else '-Inf'
+    if float(value).is_integer():
+        return str(int(value))
+    return repr(float(value))
+
+
+@lru_cache(maxsize=1)
+def get_metrics_store() -> Optional[MultiprocessStore]:
+    """The shared store when ``METRICS_MULTIPROC_DIR`` is set, else None (single-process metrics)."""
+
+    directory = get_settings().metrics_multiproc_dir
+    return MultiprocessStore(directory) if directory else None
+
+
+def exposition(store: Optional[MultiprocessStore], collector: MetricsCollector = metrics_collector) -> str:
+    """Current metrics in Prometheus text format: this worker alone, or every worker via `store`."""
+
+    state = collector.export()
+    if store is None:
+        return render([(os.getpid(), True, state)])
+    store.publish(state)
+    return render(store.collect())
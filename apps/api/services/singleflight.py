@@ -0,0 +1,49 @@
+"""Coalesce identical in-flight async calls into one execution."""
+
+from __future__ import annotations
+
+import asyncio
+import threading
+from typing import Any, Awaitable, Callable, Dict, Hashable, Tuple
+
+
+class Singleflight:
+    """While a call for `key` is running, later callers await its result instead of re-running it.
+
+    The work runs as its own task, so a leader whose client disconnects does not cancel
+    the followers waiting on the same result. Results are not cached past completion.
+    """
+
+    def __init__(self) -> None:
+        self._inflight: Dict[Tuple[int, Hashable], asyncio.Task] = {}
+        self._lock = threading.Lock()
+        self._stats = {'calls': 0, 'executions': 0, 'coalesced': 0}
+
+    async def do(self, key: Hashable, fn: Callable[[], Awaitable[Any]]) -> Any:
+        loop = asyncio.get_running_loop()
+        slot = (id(loop), key)
+        with self._lock:
+            self._stats['calls'] += 1
+            task = self._inflight.get(slot)
+            if task is None:
+                self._stats['executions'] += 1
+                task = loop.create_task(fn())
+                self._inflight[slot] = task
+                task.add_done_callback(lambda _: self._forget(slot, task))
+            else:
+                self._stats['coalesced'] += 1
+        return await asyncio.shield(task)
+
+    def _forget(self, slot: Tuple[int, Hashable], task: asyncio.Task) -> None:
+        with self._lock:
+            if self._inflight.get(slot) is task:
+                del self._inflight[slot]
+
+    def stats(self) -> Dict[str, float]:
+        with self._lock:
+            calls = self._stats['calls']
+            return {
+                **self._stats,
+                'in_flight': len(self._inflight),
+                'coalesce_rate': round(self._stats['coalesced'] / calls, 4) if calls else 0.0,
+            }
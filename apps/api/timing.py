@@ -0,0 +1,144 @@
+"""Per-stage timing for the serving hot paths.
+
+Services wrap each stage in ``with stage('rag.embed_query'):``. Every finished stage is
+handed to the process-wide sink (the metrics collector's per-stage histograms, installed
+unless ``METRICS_STAGE_TIMING=false``) and added to the breakdown of each request that
+opted in with the ``X-Stage-Timing`` header; that breakdown is returned as a standard
+``Server-Timing`` response header. With no sink and no opted-in request, `stage()` returns
+a shared no-op context manager, so instrumented code pays one context-variable lookup.
+
+The breakdown travels in a context variable: it follows ``await``s and
+`InstrumentedExecutor` thread-pool calls, and the micro-batcher attributes a shared batch
+to every request in it.
+"""
+
+from __future__ import annotations
+
+import contextlib
+import threading
+import time
+from contextvars import ContextVar
+from typing import Any, Awaitable, Callable, Dict, Iterable, Iterator, List, MutableMapping, Optional, Tuple
+
+REQUEST_HEADER = b'x-stage-timing'
+RESPONSE_HEADER = b'server-timing'
+
+_sink: Optional[Callable[[str, float], None]] = None
+
+
+class StageBreakdown:
+    """Milliseconds per stage for one request; stages that run more than once are summed."""
+
+    def __init__(self) -> None:
+        self._lock = threading.Lock()
+        self._stages: Dict[str, float] = {}
+
+    def add(self, name: str, elapsed_ms: float) -> None:
+        with self._lock:
+            self._stages[name] = self._stages.get(name, 0.0) + elapsed_ms
+
+    def as_dict(self) -> Dict[str, float]:
+        with self._lock:
+            return {name: round(ms, 3) for name, ms in self._stages.items()}
+
+    def server_timing(self) -> str:
+        return ', '.join(f'{name};dur={ms}' for name, ms in self.as_dict().items())
+
+
+_breakdowns: ContextVar[Tuple[StageBreakdown, ...]] = ContextVar('stage_breakdowns', default=())
+
+
+def set_sink(sink: Optional[Callable[[str, float], None]]) -> None:
+    """Send every finished stage to `sink(name, elapsed_ms)`; None turns aggregation off."""
+
+    global _sink
+    _sink = sink
+
+
+def record(name: str, elapsed_ms: float) -> None:
+    if _sink is not None:
+        _sink(name, elapsed_ms)
+    for breakdown in _breakdowns.get():
+        breakdown.add(name, elapsed_ms)
+
+
+class _Stage:
+    __slots__ = ('name', 'start')
+
+    def __init__(self, name: str) -> None:
+        self.name = name
+
+    def __enter__(self) -> '_Stage':
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc_info: Any) -> None:
+        record(self.name, (time.perf_counter() - self.start) * 1000)
+
+
+_NOOP = contextlib.nullcontext()
+
+
+def stage(name: str) -> contextlib.AbstractContextManager:
+    """Time the `with` block as stage `name` (errors included)."""
+
+    if _sink is None and not _breakdowns.get():
+        return _NOOP
+    return _Stage(name)
+
+
+def current_breakdowns() -> Tuple[StageBreakdown, ...]:
+    return _breakdowns.get()
+
+
+@contextlib.contextmanager
+def attribute_to(breakdowns: Iterable[StageBreakdown]) -> Iterator[None]:
+    """Add stages timed in this block to `breakdowns`, e.g. every request in a shared batch."""
+
+    token = _breakdowns.set(tuple(breakdowns))
+    try:
+        yield
+    finally:
+        _breakdowns.reset(token)
+
+
+@contextlib.contextmanager
+def collect_breakdown() -> Iterator[StageBreakdown]:
+    breakdown = StageBreakdown()
+    token = _breakdowns.set(_breakdowns.get() + (breakdown,))
+    try:
+        yield breakdown
+    finally:
+        _breakdowns.reset(token)
+
+
+Scope = MutableMapping[str, Any]
+Receive = Callable[[], Awaitable[MutableMapping[str, Any]]]
+Send = Callable[[MutableMapping[str, Any]], Awaitable[None]]
+
+
+class StageTimingMiddleware:
+    """ASGI middleware: requests sending `X-Stage-Timing` get a `Server-Timing` breakdown.
+
+    Headers go out with the first response message, so a streamed response only reports
+    the stages that finished before it started.
+    """
+
+    def __init__(self, app: Callable[[Scope, Receive, Send], Awaitable[None]]) -> None:
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope['type'] != 'http' or not any(key == REQUEST_HEADER for key, _ in scope['headers']):
+            await self.app(scope, receive, send)
+            return
+
+        with collect_breakdown() as breakdown:
+
+            async def _send(message: MutableMapping[str, Any]) -> None:
+                if message['type'] == 'http.response.start':
+                    headers: List[Tuple[bytes, bytes]] = list(message.get('headers', []))
+                    headers.append((RESPONSE_HEADER, breakdown.server_timing().encode('latin-1')))
+                    message['headers'] = headers
+                await send(message)
+
+            await self.app(scope, receive, _send)
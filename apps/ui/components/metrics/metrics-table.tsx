@@ -2,6 +2,9 @@ import { MetricsOverview } from "@/lib/types";
 import { formatNumber } from "@/lib/utils";
 import { Table } from "@/components/ui/table";
 
+// `/metrics/overview` keys that hold stage and component stats rather than an endpoint.
+const NON_ENDPOINT_KEYS = new Set(["stages", "components"]);
+
 export function MetricsTable({ data }: { data?: MetricsOverview }) {
   if (!data) return null;
   return (
@@ -16,15 +19,17 @@ export function MetricsTable({ data }: { data?: MetricsOverview }) {
         </tr>
       </thead>
       <tbody>
-        {Object.entries(data).map(([endpoint, metrics]) => (
-          <tr key={endpoint} className="border-t text-sm">
-            <td className="p-2 font-medium">{endpoint}</td>
-            <td className="p-2">{metrics.count}</td>
-            <td className="p-2">{metrics.errors}</td>
-            <td className="p-2">{formatNumber(metrics.avg_latency_ms)}</td>
-            <td className="p-2">{formatNumber(metrics.p95_latency_ms)}</td>
-          </tr>
-        ))}
+        {Object.entries(data)
+          .filter(([endpoint]) => !NON_ENDPOINT_KEYS.has(endpoint))
+          .map(([endpoint, metrics]) => (
+            <tr key={endpoint} className="border-t text-sm">
+              <td className="p-2 font-medium">{endpoint}</td>
+              <td className="p-2">{metrics.count}</td>
+              <td className="p-2">{metrics.errors}</td>
+              <td className="p-2">{formatNumber(metrics.avg_latency_ms)}</td>
+              <td className="p-2">{formatNumber(metrics.p95_latency_ms)}</td>
+            </tr>
+          ))}
       </tbody>
     </Table>
   );
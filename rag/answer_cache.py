@@ -0,0 +1,117 @@
+"""Semantic cache of generated answers, keyed by query embedding.
+
+A lookup is a hit when a cached query is within `threshold` cosine similarity of the
+new one *and* the new query retrieved exactly the same chunks from the same index
+generation with the same LLM tier, so a paraphrase is only ever answered from the
+context the cached answer was generated from. Entries are bounded by count (LRU) and
+age (TTL); the owning service drops them all when the index is re-ingested.
+"""
+
+from __future__ import annotations
+
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Dict, Hashable, List, NamedTuple, Optional, Sequence, Tuple
+
+import numpy as np
+
+
+class _Entry(NamedTuple):
+    key: Tuple[Hashable, ...]  # (source chunk ids, index generation, tier)
+    payload: Dict[str, Any]
+    expires_at: float
+
+
+class SemanticAnswerCache:
+    """Bounded, thread-safe nearest-neighbour cache over unit-normalised query embeddings.
+
+    Embeddings live in one preallocated matrix (one row per slot), so a lookup is a
+    single matrix-vector product over the occupied rows.
+    """
+
+    def __init__(self, max_entries: int, *, threshold: float = 0.95, ttl_s: Optional[float] = None) -> None:
+        self.max_entries = max(1, max_entries)
+        self.threshold = threshold
+        self.ttl_s = ttl_s
+        self._entries: 'OrderedDict[int, _Entry]' = OrderedDict()  # slot -> entry, LRU order
+        self._vectors: Optional[np.ndarray] = None
+        self._free: List[int] = []
+        self._lock = threading.Lock()
+        self._stats = {'hits': 0, 'misses': 0, 'evictions': 0, 'expirations': 0, 'invalidations': 0}
+
+    def lookup(
+        self, embedding: Sequence[float], *, sources: Sequence[str], generation: int, tier: str
+    ) -> Optional[Tuple[Dict[str, Any], float]]:
+        """Best cached `(payload, similarity)` for this query and retrieval, or None."""
+
+        query = _unit(embedding)
+        key = (tuple(sources), generation, tier)
+        now = time.monotonic()
+        with self._lock:
+            if self._entries and self._vectors is not None and self._vectors.shape[1] == len(query):
+                slots = np.fromiter(self._entries, dtype=np.intp, count=len(self._entries))
+                similarities = self._vectors[slots] @ query
+                for i in np.argsort(-similarities, kind='stable'):
+                    similarity = float(similarities[i])
+                    if similarity < self.threshold:
+                        break
+                    slot = int(slots[i])
+                    entry = self._entries[slot]
+                    if entry.expires_at and entry.expires_at <= now:
+                        self._release(slot)
+                        self._stats['expirations'] += 1
+                        continue
+                    if entry.key == key:
+                        self._entries.move_to_end(slot)
+                        self._stats['hits'] += 1
+                        return dict(entry.payload), similarity
+            self._stats['misses'] += 1
+            return None
+
+    def put(
+        self, embedding: Sequence[float], payload: Dict[str, Any], *, sources: Sequence[str], generation: int, tier: str
+    ) -> None:
+        vector = _unit(embedding)
+        expires_at = time.monotonic() + self.ttl_s if self.ttl_s else 0.0
+        with self._lock:
+            if self._vectors is None or self._vectors.shape[1] != len(vector):
+                self._vectors = np.zeros((self.max_entries, len(vector)), dtype=np.float32)
+                self._entries.clear()
+                self._free = list(range(self.max_entries - 1, -1, -1))
+            if not self._free:
+                self._release(next(iter(self._entries)))
+                self._stats['evictions'] += 1
+            slot = self._free.pop()
+            self._vectors[slot] = vector
+            self._entries[slot] = _Entry((tuple(sources), generation, tier), dict(payload), expires_at)
+
+    def _release(self, slot: int) -> None:
+        del self._entries[slot]
+        self._free.append(slot)
+
+    def clear(self) -> None:
+        with self._lock:
+            for slot in list(self._entries):
+                self._release(slot)
+            self._stats['invalidations'] += 1
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            lookups = self._stats['hits'] + self._stats['misses']
+            return {
+                **self._stats,
+                'size': len(self._entries),
+                'max_entries': self.max_entries,
+                'threshold': self.threshold,
+                'hit_rate': round(self._stats['hits'] / lookups, 4) if lookups else 0.0,
+            }
+
+
+def _unit(embedding: Sequence[float]) -> np.ndarray:
+    vector = np.asarray(embedding, dtype=np.float32)
+    norm = float(np.linalg.norm(vector))
+    return vector / norm if norm else vector
@@ -0,0 +1,189 @@
+"""Okapi BM25 inverted index over the ingested chunks.
+
+Persisted (postings included) as ``bm25.json`` next to the vector store. An ingest
+updates it in place from the chunks it added and removed: removed chunks lose their
+postings and leave an empty slot, and the slots are compacted once they outnumber the
+live chunks. Queries made of exact identifiers such as error codes, config keys and
+endpoint paths are answered from it without running the embedding model.
+"""
+
+from __future__ import annotations
+
+import heapq
+import json
+import math
+import os
+import re
+import uuid
+from collections import Counter
+from pathlib import Path
+from typing import Any, Dict, Iterable, List, Optional, Sequence, Tuple
+
+from langchain_core.documents import Document
+
+BM25_FILE = 'bm25.json'
+
+_TOKEN = re.compile(r'[a-z0-9_]+')
+# Tokens that look like identifiers rather than prose: snake_case/CONFIG_KEYS, paths,
+# dotted keys, and words mixing letters with digits (E1234, http503, v2).
+_IDENTIFIER = re.compile(r'\w+_\w+|/\w+|\w+\.\w+|[A-Za-z]+\d+\w*|\d+[A-Za-z]+\w*|\b[A-Z]{3,}\b')
+
+
+def tokenize(text: str) -> List[str]:
+    tokens = []
+    for token in _TOKEN.findall(text.lower()):
+        tokens.append(token)
+        if '_' in token:
+            tokens.extend(part for part in token.split('_') if part)
+    return tokens
+
+
+def looks_like_identifier_query(query: str) -> bool:
+    """True when most of the query's words are identifiers rather than natural language."""
+
+    words = query.split()
+    if not words:
+        return False
+    identifiers = sum(bool(_IDENTIFIER.search(word)) for word in words)
+    return identifiers > 0 and identifiers * 2 >= len(words)
+
+
+class BM25Index:
+    """Inverted index (term -> [(chunk position, term frequency)]) plus the chunks it covers.
+
+    Positions listed in `deleted` are empty slots left by `remove()`: no postings point at
+    them and they do not count towards the corpus statistics.
+    """
+
+    def __init__(
+        self,
+        ids: Sequence[str],
+        texts: Sequence[str],
+        metadatas: Sequence[Dict[str, Any]],
+        postings: Dict[str, List[Tuple[int, int]]],
+        doc_lens: Sequence[int],
+        *,
+        deleted: Iterable[int] = (),
+        k1: float = 1.5,
+        b: float = 0.75,
+    ) -> None:
+        self.ids = list(ids)
+        self.texts = list(texts)
+        self.metadatas = [dict(m or {}) for m in metadatas]
+        self.postings = postings
+        self.doc_lens = list(doc_lens)
+        self.deleted = set(deleted)
+        self.k1 = k1
+        self.b = b
+        self._positions = {doc_id: i for i, doc_id in enumerate(self.ids) if i not in self.deleted}
+        self._total_len = sum(self.doc_lens[i] for i in self._positions.values())
+
+    @classmethod
+    def build(cls, ids: Sequence[str], texts: Sequence[str], metadatas: Sequence[Dict[str, Any]]) -> 'BM25Index':
+        index = cls([], [], [], {}, [])
+        index.add(ids, texts, metadatas)
+        return index
+
+    def __len__(self) -> int:
+        return len(self._positions)
+
+    def __contains__(self, doc_id: object) -> bool:
+        return doc_id in self._positions
+
+    def live_ids(self) -> List[str]:
+        return list(self._positions)
+
+    @property
+    def avg_len(self) -> float:
+        return self._total_len / len(self._positions) if self._positions else 0.0
+
+    def add(self, ids: Sequence[str], texts: Sequence[str], metadatas: Sequence[Dict[str, Any]]) -> None:
+        """Index chunks, replacing any already indexed under the same id."""
+
+        self.remove(ids)
+        for doc_id, text, metadata in zip(ids, texts, metadatas, strict=True):
+            if doc_id in self._positions:  # repeated within `ids`: the last one wins
+                self.remove([doc_id])
+            position = len(self.ids)
+            counts = Counter(tokenize(text))
+            self.ids.append(doc_id)
+            self.texts.append(text)
+            self.metadatas.append(dict(metadata or {}))
+            self.doc_lens.append(sum(counts.values()))
+            for term, tf in counts.items():
+                self.postings.setdefault(term, []).append((position, tf))
+            self._positions[doc_id] = position
+            self._total_len += self.doc_lens[position]
+
+    def remove(self, ids: Iterable[str]) -> None:
+        """Drop chunks: only the postings of their own terms are rewritten."""
+
+        dropped = {self._positions.pop(doc_id) for doc_id in ids if doc_id in self._positions}
+        if not dropped:
+            return
+        for term in {term for position in dropped for term in tokenize(self.texts[position])}:
+            kept = [entry for entry in self.postings[term] if entry[0] not in dropped]
+            if kept:
+                self.postings[term] = kept
+            else:
+                del self.postings[term]
+        self._total_len -= sum(self.doc_lens[position] for position in dropped)
+        self.deleted |= dropped
+        if len(self.deleted) > len(self._positions):
+            self._compact()
+
+    def _compact(self) -> None:
+        live = sorted(self._positions.values())
+        ids = [self.ids[i] for i in live]
+        texts = [self.texts[i] for i in live]
+        metadatas = [self.metadatas[i] for i in live]
+        self.ids, self.texts, self.metadatas, self.doc_lens = [], [], [], []
+        self.postings, self.deleted, self._positions, self._total_len = {}, set(), {}, 0
+        self.add(ids, texts, metadatas)
+
+    def idf(self, term: str) -> float:
+        df = len(self.postings.get(term, ()))
+        return math.log(1 + (len(self._positions) - df + 0.5) / (df + 0.5))
+
+    def search(self, query: str, k: int) -> List[Tuple[Document, float]]:
+        scores: Dict[int, float] = {}
+        avg_len = self.avg_len
+        for term in set(tokenize(query)):
+            postings = self.postings.get(term)
+            if not postings:
+                continue
+            idf = self.idf(term)
+            for position, tf in postings:
+                norm = self.k1 * (1 - self.b + self.b * self.doc_lens[position] / avg_len)
+                scores[position] = scores.get(position, 0.0) + idf * tf * (self.k1 + 1) / (tf + norm)
+        best = heapq.nlargest(k, scores.items(), key=lambda item: (item[1], -item[0]))
+        return [
+            (Document(id=self.ids[i], page_content=self.texts[i], metadata=dict(self.metadatas[i])), score)
+            for i, score in best
+        ]
+
+    # ------------------------------------------------------------------
+    # Persistence
+    # ------------------------------------------------------------------
+    def save(self, directory: Path) -> None:
+        payload = {
+            'k1': self.k1, 'b': self.b,
+            'ids': self.ids, 'texts': self.texts, 'metadatas': self.metadatas,
+            'doc_lens': self.doc_lens, 'postings': self.postings, 'deleted': sorted(self.deleted),
+        }
+        directory = Path(directory)
+        tmp = directory / f'{BM25_FILE}.{uuid.uuid4().hex}.tmp'
+        tmp.write_text(json.dumps(payload))
+        os.replace(tmp, directory / BM25_FILE)
+
+    @classmethod
+    def load(cls, directory: Path) -> Optional['BM25Index']:
+        try:
+            payload = json.loads((Path(directory) / BM25_FILE).read_text())
+        except (FileNotFoundError, json.JSONDecodeError):
+            return None
+        postings = {term: [tuple(entry) for entry in entries] for term, entries in payload['postings'].items()}
+        return cls(
+            payload['ids'], payload['texts'], payload['metadatas'], postings, payload['doc_lens'],
+            deleted=payload.get('deleted', ()), k1=payload['k1'], b=payload['b'],
+        )
@@ -0,0 +1,156 @@
+"""Named knowledge bases served from one API process.
+
+The default collection is ``RAG_DOCS_PATH`` indexed into ``RAG_VECTORSTORE_PATH``. Every
+subdirectory ``<name>`` of ``RAG_COLLECTIONS_PATH`` is another collection, ingested on its
+own with ``rag/ingest.py --collection <name>`` into
+``RAG_COLLECTIONS_VECTORSTORE_PATH/<name>``. Each collection gets its own `RAGService`
+(vector store handle, BM25 index and caches) created on first query; all of them share
+the process-wide embedding model.
+"""
+
+from __future__ import annotations
+
+import contextlib
+import threading
+from collections import Counter, OrderedDict
+from pathlib import Path
+from typing import Any, Dict, Iterator, List, Optional
+
+from apps.api.config.settings import AppSettings
+from rag.config import DEFAULT_COLLECTION, RAGSettings, UnknownCollection
+from rag.manifest import IngestManifest
+from rag.service import RAGService
+
+
+def collection_names(settings: AppSettings) -> List[str]:
+    """The default collection plus every subdirectory of the collections root, sorted."""
+
+    root = Path(settings.rag_collections_path)
+    named = sorted(path.name for path in root.iterdir() if path.is_dir()) if root.is_dir() else []
+    return [DEFAULT_COLLECTION] + [name for name in named if name != DEFAULT_COLLECTION]
+
+
+class RAGCollections:
+    """LRU of per-collection `RAGService`s; the default collection is always resident.
+
+    At most `max_resident` named collections are held open. Opening one more evicts the
+    least recently used service. Requests take a service through `use()`; an evicted
+    service is closed (`RAGService.close()`: Chroma client, BM25 index and caches) as soon
+    as no request is using it, so requests already holding it finish normally.
+    """
+
+    def __init__(self, default: RAGService, max_resident: int) -> None:
+        self.default = default
+        self.settings = default.settings
+        self.max_resident = max(1, max_resident)
+        self._resident: 'OrderedDict[str, RAGService]' = OrderedDict()
+        self._lock = threading.Lock()
+        self._queries: Counter = Counter()
+        self._users: Counter = Counter()  # service -> requests inside `use()`
+        self._evicted: set = set()  # evicted services still in use, closed by the last user
+        self._stats = {'opens': 0, 'evictions': 0, 'closes': 0}
+
+    def get(self, name: Optional[str] = None) -> RAGService:
+        """The collection's service, opened on first use (`UnknownCollection` if it does not exist)."""
+
+        return self._open(name, use=False)
+
+    @contextlib.contextmanager
+    def use(self, name: Optional[str] = None) -> Iterator[RAGService]:
+        """`get()` for the length of a request: eviction waits for the request before closing it."""
+
+        service = self._open(name, use=True)
+        try:
+            yield service
+        finally:
+            with self._lock:
+                self._users[service] -= 1
+                close = False
+                if not self._users[service]:
+                    del self._users[service]
+                    close = service in self._evicted
+                    self._evicted.discard(service)
+            if close:
+                self._close(service)
+
+    def _open(self, name: Optional[str], use: bool) -> RAGService:
+        name = name or DEFAULT_COLLECTION
+        with self._lock:
+            self._queries[name] += 1
+            if name == DEFAULT_COLLECTION:
+                if use:
+                    self._users[self.default] += 1
+                return self.default
+            service = self._resident.get(name)
+            if service is not None:
+                self._resident.move_to_end(name)
+                if use:
+                    self._users[service] += 1
+                return service
+
+        paths = RAGSettings.from_app(self.settings, name)
+        if not (paths.docs_path.is_dir() or paths.vectorstore_path.exists()):
+            with self._lock:
+                self._queries.pop(name, None)
+            raise UnknownCollection(f'Unknown collection {name!r}')
+        service = RAGService(self.settings, embeddings=self.default.embeddings, collection=name)
+        with self._lock:
+            # Another request may have opened it meanwhile; keep that one.
+            opened = self._resident.setdefault(name, service)
+            self._stats['opens'] += opened is service
+            service = opened
+            self._resident.move_to_end(name)
+            if use:
+                self._users[service] += 1
+            idle = []
+            while len(self._resident) > self.max_resident:
+                _, evicted = self._resident.popitem(last=False)
+                self._stats['evictions'] += 1
+                if self._users[evicted]:
+                    self._evicted.add(evicted)
+                else:
+                    idle.append(evicted)
+        for evicted in idle:
+            self._close(evicted)
+        return service
+
+    def _close(self, service: RAGService) -> None:
+        service.close()
+        with self._lock:
+            self._stats['closes'] += 1
+
+    def resident(self) -> List[str]:
+        with self._lock:
+            return [DEFAULT_COLLECTION, *self._resident]
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                **self._stats,
+                'max_resident': self.max_resident,
+                'resident': [DEFAULT_COLLECTION, *self._resident],
+                'queries': dict(self._queries),
+            }
+
+
+def describe_collections(settings: AppSettings, registry: Optional[RAGCollections] = None) -> List[Dict[str, Any]]:
+    """Per-collection size (from the ingest manifest) and residency, without opening any store."""
+
+    resident = set(registry.resident()) if registry is not None else set()
+    queries = registry.stats()['queries'] if registry is not None else {}
+    described = []
+    for name in collection_names(settings):
+        paths = RAGSettings.from_app(settings, name)
+        manifest = IngestManifest.load(paths.vectorstore_path)
+        described.append({
+            'name': name,
+            'docs_path': str(paths.docs_path),
+            'vector_store_path': str(paths.vectorstore_path),
+            'ingested': bool(manifest.files),
+            'files': len(manifest.files),
+            'chunks': sum(len(entry['chunks']) for entry in manifest.files.values()),
+            'generation': manifest.generation,
+            'resident': name in resident,
+            'queries': queries.get(name, 0),
+        })
+    return described
@@ -2,11 +2,21 @@
 
 from __future__ import annotations
 
+import re
 from dataclasses import dataclass
 from pathlib import Path
+from typing import Optional
 
 from apps.api.config.settings import AppSettings, get_settings
 
+DEFAULT_COLLECTION = 'default'
+# Collection names become directory names, so keep them to a safe, path-free alphabet.
+_COLLECTION_NAME = re.compile(r'[A-Za-z0-9][A-Za-z0-9_-]{0,63}')
+
+
+class UnknownCollection(LookupError):
+    """Raised for a collection name that is invalid or has neither docs nor a vector store."""
+
 
 @dataclass(frozen=True)
 class RAGSettings:
@@ -16,18 +26,28 @@ class RAGSettings:
     vectorstore_path: Path
     embedding_model_name: str
     top_k: int
+    collection: str = DEFAULT_COLLECTION
 
     @classmethod
-    def from_app(cls, settings: AppSettings) -> "RAGSettings":
+    def from_app(cls, settings: AppSettings, collection: Optional[str] = None) -> "RAGSettings":
+        """Paths for `collection`: the configured defaults, or `<collections root>/<name>` for a named one."""
+
+        docs_path, vectorstore_path = settings.rag_docs_path, settings.rag_vectorstore_path
+        if collection and collection != DEFAULT_COLLECTION:
+            if not _COLLECTION_NAME.fullmatch(collection):
+                raise UnknownCollection(f'Invalid collection name {collection!r}')
+            docs_path = Path(settings.rag_collections_path) / collection
+            vectorstore_path = Path(settings.rag_collections_vectorstore_path) / collection
         return cls(
-            docs_path=settings.rag_docs_path,
-            vectorstore_path=settings.rag_vectorstore_path,
+            docs_path=docs_path,
+            vectorstore_path=vectorstore_path,
             embedding_model_name=settings.embedding_model_name,
             top_k=settings.rag_top_k,
+            collection=collection or DEFAULT_COLLECTION,
         )
 
 
-def get_rag_settings() -> RAGSettings:
+def get_rag_settings(collection: Optional[str] = None) -> RAGSettings:
     """Convenience accessor mirroring `apps.api.config.settings.get_settings`."""
 
-    return RAGSettings.from_app(get_settings())
+    return RAGSettings.from_app(get_settings(), collection)
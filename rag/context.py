@@ -0,0 +1,174 @@
+"""Build the LLM prompt context from retrieved chunks.
+
+The splitter overlaps neighbouring chunks by `chunk_overlap` characters, so two adjacent
+hits repeat that text verbatim. `pack_context` trims those repeated spans (and drops
+chunks wholly contained in another), then packs what is left into a token budget in
+relevance order. `mmr_order` optionally re-ranks chunks by maximal marginal relevance
+first so near-duplicates lose their slot to chunks that add something new.
+
+Tokens are counted with tiktoken's ``cl100k_base`` when it is installed, otherwise with
+a regex approximation of BPE (short words one token, long words split, digits in runs
+of three, one token per punctuation mark), which tracks real counts far better than
+``len(text) / 4`` on code-heavy docs.
+"""
+
+from __future__ import annotations
+
+import logging
+import re
+from dataclasses import dataclass, field
+from typing import Callable, List, Optional, Sequence, Tuple
+
+import numpy as np
+from langchain_core.documents import Document
+
+try:  # optional: exact counts for OpenAI-style BPE; the heuristic below is close enough otherwise
+    import tiktoken
+except ImportError:  # pragma: no cover - depends on the environment
+    tiktoken = None
+
+logger = logging.getLogger(__name__)
+
+SEPARATOR = '\n\n'
+# Shorter shared spans are treated as coincidence (headings, boilerplate), not chunk overlap.
+MIN_OVERLAP_CHARS = 20
+# MMR drops a chunk outright when it is at least this similar to one already selected.
+NEAR_DUPLICATE_SIMILARITY = 0.95
+
+_PIECE = re.compile(r'[A-Za-z]+|\d{1,3}|[^\sA-Za-z\d]')
+_encoder: Optional[Callable[[str], List[int]]] = None
+
+
+def count_tokens(text: str) -> int:
+    global _encoder
+    if not text:
+        return 0
+    if tiktoken is not None and _encoder is None:
+        try:
+            _encoder = tiktoken.get_encoding('cl100k_base').encode
+        except Exception:  # encoding files unavailable offline
+            logger.warning('tiktoken encoding unavailable; using the heuristic token counter')
+            _encoder = _heuristic_tokens
+    if _encoder is not None:
+        return len(_encoder(text))
+    return len(_heuristic_tokens(text))
+
+
+def _heuristic_tokens(text: str) -> List[int]:
+    tokens: List[int] = []
+    for piece in _PIECE.findall(text):
+        tokens.extend([0] * ((len(piece) + 4) // 5 if piece[0].isalpha() else 1))
+    return tokens
+
+
+@dataclass
+class PackedContext:
+    text: str
+    documents: List[Document] = field(default_factory=list)  # chunks that made it into `text`
+    tokens: int = 0
+    tokens_saved: int = 0  # versus joining every retrieved chunk verbatim
+
+
+def _overlap(head: str, tail: str) -> int:
+    """Length of the longest suffix of `head` that is also a prefix of `tail`."""
+
+    if len(head) < MIN_OVERLAP_CHARS or len(tail) < MIN_OVERLAP_CHARS:
+        return 0
+    probe = tail[:MIN_OVERLAP_CHARS]
+    start = head.find(probe, max(0, len(head) - len(tail)))
+    while start != -1:
+        if tail.startswith(head[start:]):
+            return len(head) - start
+        start = head.find(probe, start + 1)
+    return 0
+
+
+def dedupe_overlaps(documents: Sequence[Document]) -> List[Tuple[Document, str]]:
+    """Each chunk's text minus spans already carried by an earlier chunk of the same source."""
+
+    kept: List[Tuple[Document, str]] = []
+    for doc in documents:
+        text = doc.page_content
+        source = doc.metadata.get('source')
+        for other, _ in kept:
+            if other.metadata.get('source') != source:
+                continue
+            original = other.page_content
+            if text in original:
+                text = ''
+                break
+            text = text[_overlap(original, text):]
+            cut = _overlap(text, original)
+            if cut:
+                text = text[:-cut]
+        if len(text.strip()) >= MIN_OVERLAP_CHARS or (text.strip() and text == doc.page_content):
+            kept.append((doc, text.strip()))
+    return kept
+
+
+def mmr_order(
+    query_embedding: Sequence[float], doc_embeddings: Sequence[Sequence[float]], lambda_mult: float
+) -> List[int]:
+    """Indices in maximal-marginal-relevance order, near-duplicates of a selected chunk removed."""
+
+    docs = np.asarray(doc_embeddings, dtype=np.float32)
+    if not len(docs):
+        return []
+    docs = docs / np.maximum(np.linalg.norm(docs, axis=1, keepdims=True), 1e-12)
+    query = np.asarray(query_embedding, dtype=np.float32)
+    query = query / max(float(np.linalg.norm(query)), 1e-12)
+    relevance = docs @ query
+    similarity = docs @ docs.T
+
+    selected: List[int] = []
+    candidates = list(range(len(docs)))
+    while candidates:
+        if selected:
+            redundancy = similarity[np.ix_(candidates, selected)].max(axis=1)
+        else:
+            redundancy = np.zeros(len(candidates), dtype=np.float32)
+        scores = lambda_mult * relevance[candidates] - (1 - lambda_mult) * redundancy
+        best = int(np.argmax(scores))
+        choice = candidates.pop(best)
+        if not selected or redundancy[best] < NEAR_DUPLICATE_SIMILARITY:
+            selected.append(choice)
+    return selected
+
+
+def pack_context(
+    documents: Sequence[Document], token_budget: int = 0, *, retrieved: Optional[Sequence[Document]] = None
+) -> PackedContext:
+    """Join de-duplicated chunks in the given order until `token_budget` (0 = unlimited) is spent.
+
+    Chunks that do not fit are skipped so a later, shorter one can still be used; the
+    first chunk is truncated rather than dropped if it alone exceeds the budget. Savings
+    are measured against `retrieved` (default `documents`) joined verbatim.
+    """
+
+    baseline = documents if retrieved is None else retrieved
+    raw_tokens = count_tokens(SEPARATOR.join(doc.page_content for doc in baseline))
+    parts: List[str] = []
+    used: List[Document] = []
+    spent = 0
+    for doc, text in dedupe_overlaps(documents):
+        cost = count_tokens(text) + (count_tokens(SEPARATOR) if parts else 0)
+        if token_budget and spent + cost > token_budget:
+            if parts:
+                continue
+            text = _truncate(text, token_budget)
+            cost = count_tokens(text)
+        parts.append(text)
+        used.append(doc)
+        spent += cost
+
+    text = SEPARATOR.join(parts)
+    tokens = count_tokens(text)
+    return PackedContext(text, used, tokens, max(0, raw_tokens - tokens))
+
+
+def _truncate(text: str, token_budget: int) -> str:
+    tokens = count_tokens(text)
+    while text and tokens > token_budget:
+        text = text[:max(1, int(len(text) * token_budget / tokens) - 1)]
+        tokens = count_tokens(text)
+    return text
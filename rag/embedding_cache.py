@@ -0,0 +1,195 @@
+"""On-disk cache of chunk embeddings, keyed by (embedding model, chunk text sha256).
+
+One directory per embedding model::
+
+    <root>/<model slug>/vectors.f32   # row-major float32 matrix, append-only
+    <root>/<model slug>/index.json    # {"dim": 384, "rows": {"<text sha256>": row, ...}}
+
+Rows are appended before the index that references them is rewritten, so a crash can
+only leave unreferenced rows behind, never an index entry pointing at garbage.
+"""
+
+from __future__ import annotations
+
+import contextlib
+import json
+import logging
+import multiprocessing
+import os
+import re
+import uuid
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+from typing import Callable, Dict, Iterator, List, Optional, Sequence
+
+import numpy as np
+from langchain_core.embeddings import Embeddings
+
+from rag.embeddings import get_embeddings
+from rag.manifest import sha256_text
+
+try:  # POSIX only; without it concurrent ingests may append interleaved rows.
+    import fcntl
+except ImportError:  # pragma: no cover - non-POSIX platforms
+    fcntl = None
+
+logger = logging.getLogger(__name__)
+
+VECTORS_FILE = 'vectors.f32'
+INDEX_FILE = 'index.json'
+
+
+class EmbeddingCache:
+    """Append-only float32 vector file plus a hash -> row index for one embedding model."""
+
+    def __init__(self, root: Path, model_name: str) -> None:
+        slug = re.sub(r'[^A-Za-z0-9_.-]+', '_', model_name).strip('_') or 'default'
+        self.model_name = model_name
+        self.path = Path(root) / slug
+        self.path.mkdir(parents=True, exist_ok=True)
+        self._index = self._read_index()
+
+    @property
+    def dim(self) -> Optional[int]:
+        return self._index.get('dim')
+
+    def __len__(self) -> int:
+        return len(self._index['rows'])
+
+    def get_many(self, hashes: Sequence[str]) -> Dict[str, np.ndarray]:
+        rows = self._index['rows']
+        found = {h: rows[h] for h in hashes if h in rows}
+        if not found:
+            return {}
+        vectors = np.memmap(self.path / VECTORS_FILE, dtype=np.float32, mode='r').reshape(-1, self.dim)
+        return {h: np.array(vectors[row]) for h, row in found.items()}
+
+    def put_many(self, hashes: Sequence[str], vectors: np.ndarray) -> None:
+        vectors = np.ascontiguousarray(vectors, dtype=np.float32)
+        if not len(hashes):
+            return
+        with self._locked():
+            # Another process may have appended since we loaded the index.
+            self._index = self._read_index()
+            if self.dim is None:
+                self._index['dim'] = int(vectors.shape[1])
+            elif vectors.shape[1] != self.dim:
+                raise ValueError(f'Embedding dim {vectors.shape[1]} does not match cached dim {self.dim}')
+            row_bytes = self.dim * 4
+            vectors_path = self.path / VECTORS_FILE
+            with open(vectors_path, 'ab') as handle:
+                size = handle.tell()
+                if size % row_bytes:  # torn write from a crash; drop the partial row
+                    handle.truncate(size - size % row_bytes)
+                    size -= size % row_bytes
+                handle.write(vectors.tobytes())
+                handle.flush()
+                os.fsync(handle.fileno())
+            first_row = size // row_bytes
+            for offset, chunk_hash in enumerate(hashes):
+                self._index['rows'].setdefault(chunk_hash, first_row + offset)
+            tmp = self.path / f'{INDEX_FILE}.{uuid.uuid4().hex}.tmp'
+            tmp.write_text(json.dumps(self._index))
+            os.replace(tmp, self.path / INDEX_FILE)
+
+    def _read_index(self) -> Dict:
+        try:
+            index = json.loads((self.path / INDEX_FILE).read_text())
+        except (FileNotFoundError, json.JSONDecodeError):
+            index = {}
+        index.setdefault('dim', None)
+        index.setdefault('rows', {})
+        return index
+
+    @contextlib.contextmanager
+    def _locked(self) -> Iterator[None]:
+        if fcntl is None:
+            yield
+            return
+        with open(self.path / '.lock', 'w') as handle:
+            fcntl.flock(handle, fcntl.LOCK_EX)
+            try:
+                yield
+            finally:
+                fcntl.flock(handle, fcntl.LOCK_UN)
+
+
+_worker_embeddings: Optional[Embeddings] = None
+
+
+def _init_encoder(factory: Callable[[str], Embeddings], model_name: str) -> None:
+    global _worker_embeddings
+    _worker_embeddings = factory(model_name)
+
+
+def _encode(texts: List[str]) -> np.ndarray:
+    return np.asarray(_worker_embeddings.embed_documents(texts), dtype=np.float32)
+
+
+class CachedEmbeddings(Embeddings):
+    """Wrap an embedding model so `embed_documents` only encodes texts the cache has not seen.
+
+    Duplicate texts within a call are encoded once. Misses are encoded `batch_size` texts
+    at a time and written to the cache every `batch_size * max(processes, 1) * 4` texts, so
+    an interrupted ingest keeps what it already paid for. With `processes > 1`, batches are
+    spread over a spawn-started process pool whose workers build the model via
+    `factory(model_name)`. Queries pass straight through.
+    """
+
+    def __init__(
+        self,
+        base: Embeddings,
+        cache: EmbeddingCache,
+        *,
+        batch_size: int = 32,
+        processes: int = 0,
+        factory: Callable[[str], Embeddings] = get_embeddings,
+    ) -> None:
+        self.base = base
+        self.cache = cache
+        self.batch_size = max(1, batch_size)
+        self.processes = processes
+        self.factory = factory
+        self.stats = {'hits': 0, 'misses': 0, 'duplicates': 0}
+
+    def embed_documents(self, texts: List[str]) -> List[List[float]]:
+        hashes = [sha256_text(text) for text in texts]
+        unique: Dict[str, str] = dict(zip(hashes, texts, strict=True))
+        self.stats['duplicates'] += len(texts) - len(unique)
+        found = self.cache.get_many(list(unique))
+        self.stats['hits'] += len(found)
+        missing = [h for h in unique if h not in found]
+        self.stats['misses'] += len(missing)
+        if missing:
+            found.update(self._encode_missing(missing, [unique[h] for h in missing]))
+        return [found[h].tolist() for h in hashes]
+
+    def embed_query(self, text: str) -> List[float]:
+        return self.base.embed_query(text)
+
+    def _encode_missing(self, hashes: List[str], texts: List[str]) -> Dict[str, np.ndarray]:
+        group = self.batch_size * max(self.processes, 1) * 4
+        encoded: Dict[str, np.ndarray] = {}
+        with contextlib.ExitStack() as stack:
+            encode_batch: Callable[[List[str]], np.ndarray] = self._encode_local
+            batch_map: Callable = map
+            if self.processes > 1 and len(texts) > self.batch_size:
+                pool = stack.enter_context(ProcessPoolExecutor(
+                    self.processes,
+                    # spawn: torch/tokenizers thread pools do not survive fork.
+                    mp_context=multiprocessing.get_context('spawn'),
+                    initializer=_init_encoder,
+                    initargs=(self.factory, self.cache.model_name),
+                ))
+                encode_batch, batch_map = _encode, pool.map
+            for start in range(0, len(texts), group):
+                group_hashes, group_texts = hashes[start:start + group], texts[start:start + group]
+                batches = [group_texts[i:i + self.batch_size] for i in range(0, len(group_texts), self.batch_size)]
+                vectors = np.concatenate(list(batch_map(encode_batch, batches)))
+                self.cache.put_many(group_hashes, vectors)
+                encoded.update(zip(group_hashes, vectors, strict=True))
+        logger.info('Embedded %s new chunks with %s (%s cached)', len(texts), self.cache.model_name, len(self.cache))
+        return encoded
+
+    def _encode_local(self, texts: List[str]) -> np.ndarray:
+        return np.asarray(self.base.embed_documents(texts), dtype=np.float32)
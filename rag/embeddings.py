@@ -0,0 +1,19 @@
+"""Process-wide embedding model shared by every RAG consumer."""
+
+from __future__ import annotations
+
+import logging
+from functools import lru_cache
+
+from langchain_community.embeddings import HuggingFaceEmbeddings
+from langchain_core.embeddings import Embeddings
+
+logger = logging.getLogger(__name__)
+
+
+@lru_cache(maxsize=None)
+def get_embeddings(model_name: str) -> Embeddings:
+    """Load `model_name` once per process; sentence-transformers models are large and slow to load."""
+
+    logger.info('Loading embedding model %s', model_name)
+    return HuggingFaceEmbeddings(model_name=model_name)
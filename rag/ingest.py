@@ -3,6 +3,7 @@
 
 from __future__ import annotations
 
+import argparse
 from pathlib import Path
 import sys
 
@@ -15,16 +16,32 @@ from rag.service import RAGService
 
 
 def main() -> None:
-    settings = get_rag_settings()
-    service = RAGService()
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument(
+        '--full-rebuild', action='store_true',
+        help='Re-embed every chunk instead of only new/changed ones.',
+    )
+    parser.add_argument(
+        '--collection', default=None,
+        help='Ingest RAG_COLLECTIONS_PATH/<name> into its own vector store instead of the default collection.',
+    )
+    args = parser.parse_args()
+
+    settings = get_rag_settings(args.collection)
+    service = RAGService(collection=args.collection)
 
     docs_path = settings.docs_path
     if not docs_path.exists():
         raise SystemExit(f'RAG docs directory {docs_path} does not exist.')
 
     doc_paths = [docs_path]
-    chunks = service.ingest_documents(doc_paths)
-    print(f'✅ Indexed {chunks} chunks into {settings.vectorstore_path}')
+    stats = service.ingest_documents(doc_paths, full_rebuild=args.full_rebuild)
+    print(
+        f'✅ Indexed {stats.total_chunks} chunks into {settings.vectorstore_path} '
+        f'({stats.added_chunks} embedded, {stats.deleted_chunks} deleted, '
+        f'{stats.unchanged_files} files unchanged, {stats.checkpoints} checkpoints'
+        f'{", resumed an interrupted rebuild" if stats.resumed_rebuild else ""})'
+    )
 
 
 if __name__ == '__main__':
@@ -0,0 +1,132 @@
+"""Content-hash manifest that lets ingestion touch only what changed.
+
+Stored as ``ingest_manifest.json`` next to the Chroma files::
+
+    {
+      "embedding_model": "sentence-transformers/all-MiniLM-L6-v2",
+      "generation": 3,
+      "files": {
+        "asfotec_job.md": {"sha256": "...", "chunks": {"<chunk id>": "<chunk sha256>", ...}}
+      }
+    }
+
+Chunk ids are derived from the source path and chunk text, so an unchanged chunk keeps
+its id (and its vector) across runs while an edited one gets a new id.
+
+``generation`` is bumped whenever an ingest changes the collection and is mirrored into a
+tiny ``GENERATION`` file, which serving processes stat to invalidate their query caches.
+
+The manifest doubles as the ingest checkpoint: it is saved after every upserted batch
+with the files completed so far, so a re-run skips them. ``rebuild_in_progress`` marks a
+full rebuild that was interrupted, so the resumed run does not trust vectors it did not
+write itself.
+"""
+
+from __future__ import annotations
+
+import hashlib
+import json
+import os
+import uuid
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Dict, List, Optional, Set
+
+MANIFEST_FILE = 'ingest_manifest.json'
+GENERATION_FILE = 'GENERATION'
+
+
+def sha256_bytes(data: bytes) -> str:
+    return hashlib.sha256(data).hexdigest()
+
+
+def sha256_text(text: str) -> str:
+    return sha256_bytes(text.encode('utf-8'))
+
+
+def sha256_file(path: Path, block_size: int = 1 << 20) -> str:
+    digest = hashlib.sha256()
+    with open(path, 'rb') as handle:
+        for block in iter(lambda: handle.read(block_size), b''):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+def chunk_ids(source: str, chunk_hashes: List[str]) -> List[str]:
+    """Stable ids for a file's chunks; repeated identical chunks get an occurrence suffix."""
+
+    seen: Dict[str, int] = {}
+    ids = []
+    for chunk_hash in chunk_hashes:
+        base = sha256_text(f'{source}\0{chunk_hash}')[:32]
+        occurrence = seen.get(base, 0)
+        seen[base] = occurrence + 1
+        ids.append(base if occurrence == 0 else f'{base}-{occurrence}')
+    return ids
+
+
+def _write_atomic(path: Path, text: str) -> None:
+    tmp = path.with_name(f'{path.name}.{uuid.uuid4().hex}.tmp')
+    tmp.write_text(text)
+    os.replace(tmp, path)
+
+
+def read_generation(directory: Path) -> int:
+    try:
+        return int((Path(directory) / GENERATION_FILE).read_text().strip() or 0)
+    except (FileNotFoundError, ValueError):
+        return 0
+
+
+@dataclass
+class IngestManifest:
+    embedding_model: Optional[str] = None
+    files: Dict[str, Dict[str, object]] = field(default_factory=dict)
+    generation: int = 0
+    rebuild_in_progress: bool = False
+
+    @classmethod
+    def load(cls, directory: Path) -> 'IngestManifest':
+        try:
+            payload = json.loads((Path(directory) / MANIFEST_FILE).read_text())
+        except (FileNotFoundError, json.JSONDecodeError):
+            return cls(generation=read_generation(directory))
+        return cls(
+            embedding_model=payload.get('embedding_model'),
+            files=payload.get('files', {}),
+            generation=payload.get('generation', 0),
+            rebuild_in_progress=payload.get('rebuild_in_progress', False),
+        )
+
+    def save(self, directory: Path) -> None:
+        directory = Path(directory)
+        directory.mkdir(parents=True, exist_ok=True)
+        payload = {
+            'embedding_model': self.embedding_model,
+            'generation': self.generation,
+            'rebuild_in_progress': self.rebuild_in_progress,
+            'files': self.files,
+        }
+        _write_atomic(directory / MANIFEST_FILE, json.dumps(payload, indent=2, sort_keys=True))
+        _write_atomic(directory / GENERATION_FILE, str(self.generation))
+
+    def chunk_ids(self, source: str) -> Set[str]:
+        entry = self.files.get(source)
+        return set(entry['chunks']) if entry else set()
+
+
+@dataclass
+class IngestStats:
+    """Outcome of one `RAGService.ingest_documents` run."""
+
+    total_chunks: int = 0
+    added_chunks: int = 0
+    deleted_chunks: int = 0
+    unchanged_files: int = 0
+    changed_files: int = 0
+    removed_files: int = 0
+    full_rebuild: bool = False
+    embedding_cache_hits: int = 0
+    embedded_texts: int = 0
+    checkpoints: int = 0  # batches upserted and recorded in the manifest
+    resumed_rebuild: bool = False
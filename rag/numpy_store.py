@@ -0,0 +1,448 @@
+"""Brute-force vector store over memory-mapped NumPy segments.
+
+For a corpus that fits in RAM, one BLAS matrix-vector product plus `argpartition`
+beats Chroma's SQLite/HNSW layers on startup time, per-query overhead and memory:
+every segment is opened with ``mmap_mode='r'``, so worker processes map the same
+page-cache pages instead of holding a private copy.
+
+Layout under ``<vectorstore_path>/numpy_index``::
+
+    CURRENT                     # name of the active manifest
+    manifest-<generation>.json  # {"generation", "segments": [{"name", "deleted": [row, ...]}]}
+    segment-<id>/vectors.npy    # (n, dim) float32 | float16 | int8
+    segment-<id>/scales.npy     # (n,) float32 per-row scale, int8 only
+    segment-<id>/sqnorms.npy    # (n,) float32 squared L2 norm of each dequantized row
+    segment-<id>/meta.json      # {"dtype", "ids", "texts", "metadatas"}
+
+Segments are immutable. An upsert writes only its new rows as a segment and
+tombstones the rows they replace; a delete only adds tombstones. Trailing segments
+are merged, dropping their dead rows, once they hold about as many rows as the
+segment before them, so an ingest copies each row O(log n) times and the segment
+count stays logarithmic. Every write publishes a new manifest and flips ``CURRENT``
+atomically, so readers never see a half-written index, and the segments of the
+last ``KEEP_MANIFESTS`` manifests stay on disk for processes still opening an
+older generation. Distances are squared L2, matching Chroma's default space.
+"""
+
+from __future__ import annotations
+
+import bisect
+import json
+import os
+import shutil
+import uuid
+from pathlib import Path
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Sequence, Set, Tuple
+
+import numpy as np
+from langchain_core.documents import Document
+from langchain_core.embeddings import Embeddings
+from langchain_core.vectorstores import VectorStore
+
+DTYPES = ('float32', 'float16', 'int8')
+CURRENT_FILE = 'CURRENT'
+# Rows scored (or copied by a merge) per block when the stored dtype has to be converted,
+# bounding the temporary copy.
+SCORE_BLOCK_ROWS = 65536
+# Multi-query search scores queries in groups so the (queries x rows) distance matrix stays
+# under this many floats.
+MAX_DISTANCE_CELLS = 1 << 24
+# Trailing segments are merged while the segment before them holds at most this many
+# times their live rows.
+MERGE_RATIO = 2
+# Manifests kept, with every segment they reference, after a write.
+KEEP_MANIFESTS = 3
+
+Block = Tuple[np.ndarray, Optional[np.ndarray], np.ndarray]
+
+
+def _quantize(vectors: np.ndarray, dtype: str) -> Block:
+    """Stored rows, int8 scales (else None) and squared norms of the dequantized rows."""
+
+    if dtype == 'int8':
+        scales = np.abs(vectors).max(axis=1) / 127.0
+        scales[scales == 0] = 1.0
+        stored = np.round(vectors / scales[:, None]).astype(np.int8)
+        scales = scales.astype(np.float32)
+        dequantized = stored.astype(np.float32) * scales[:, None]
+    else:
+        stored, scales = vectors.astype(dtype), None
+        dequantized = stored.astype(np.float32)
+    return stored, scales, np.einsum('ij,ij->i', dequantized, dequantized).astype(np.float32)
+
+
+class _Segment:
+    """One immutable segment directory, memory-mapped."""
+
+    def __init__(self, directory: Path) -> None:
+        meta = json.loads((directory / 'meta.json').read_text())
+        self.name = directory.name
+        self.dtype: str = meta['dtype']
+        self.ids: List[str] = meta['ids']
+        self.texts: List[str] = meta['texts']
+        self.metadatas: List[Dict[str, Any]] = meta['metadatas']
+        self.vectors = np.load(directory / 'vectors.npy', mmap_mode='r')
+        self.sqnorms = np.load(directory / 'sqnorms.npy', mmap_mode='r')
+        self.scales = np.load(directory / 'scales.npy', mmap_mode='r') if self.dtype == 'int8' else None
+
+    def __len__(self) -> int:
+        return len(self.ids)
+
+    def rows(self, rows: Sequence[int]) -> np.ndarray:
+        """Rows dequantized to float32."""
+
+        dense = np.asarray(self.vectors[rows], dtype=np.float32)
+        return dense * self.scales[rows][:, None] if self.scales is not None else dense
+
+    def blocks(self, rows: np.ndarray, dtype: str) -> Iterator[Block]:
+        """`rows` as `dtype` blocks for a merge: copied as stored, or requantized if the dtype changed."""
+
+        for start in range(0, len(rows), SCORE_BLOCK_ROWS):
+            chunk = rows[start:start + SCORE_BLOCK_ROWS]
+            if self.dtype == dtype:
+                scales = np.asarray(self.scales[chunk]) if self.scales is not None else None
+                yield np.asarray(self.vectors[chunk]), scales, np.asarray(self.sqnorms[chunk])
+            else:
+                yield _quantize(self.rows(chunk), dtype)
+
+    def dots(self, queries: np.ndarray) -> np.ndarray:
+        """(queries x rows) dot products with the dequantized rows."""
+
+        if self.vectors.dtype == np.float32:
+            return queries @ self.vectors.T
+        dots = np.empty((len(queries), len(self)), dtype=np.float32)
+        for start in range(0, len(self), SCORE_BLOCK_ROWS):
+            block = self.vectors[start:start + SCORE_BLOCK_ROWS].astype(np.float32)
+            dots[:, start:start + len(block)] = queries @ block.T
+        if self.scales is not None:
+            dots *= self.scales
+        return dots
+
+
+class NumpyVectorStore(VectorStore):
+    """Exact top-k search over memory-mapped embedding segments with JSON metadata sidecars."""
+
+    def __init__(self, path: Path, embedding: Embeddings, dtype: str = 'float32') -> None:
+        if dtype not in DTYPES:
+            raise ValueError(f'Unsupported dtype {dtype!r}; expected one of {DTYPES}')
+        self.path = Path(path)
+        self.embedding = embedding
+        self.dtype = dtype
+        self._generation = 0
+        self._load()
+
+    @property
+    def embeddings(self) -> Embeddings:
+        return self.embedding
+
+    # ------------------------------------------------------------------
+    # Loading / persistence
+    # ------------------------------------------------------------------
+    def _clear(self) -> None:
+        # Rows are addressed by global position: segment start + row. Dead rows keep their
+        # position until a merge drops them.
+        self._segments: List[_Segment] = []
+        self._starts: List[int] = []
+        self._ids: List[str] = []
+        self._texts: List[str] = []
+        self._metadatas: List[Dict[str, Any]] = []
+        self._dead: Set[int] = set()
+        self._positions: Dict[str, int] = {}
+
+    def _load(self) -> None:
+        self._clear()
+        while True:
+            try:
+                name = (self.path / CURRENT_FILE).read_text().strip()
+            except FileNotFoundError:
+                return
+            try:
+                manifest = json.loads((self.path / name).read_text())
+                segments = [(_Segment(self.path / entry['name']), entry['deleted']) for entry in manifest['segments']]
+                break
+            except FileNotFoundError:
+                # A writer moved KEEP_MANIFESTS generations on while we were opening this one.
+                if (self.path / CURRENT_FILE).read_text().strip() == name:
+                    raise
+        self._generation = manifest['generation']
+        for segment, deleted in segments:
+            self._append(segment, deleted)
+
+    def _append(self, segment: _Segment, deleted: Sequence[int] = ()) -> None:
+        """Add `segment` to the in-memory index; its rows supersede earlier rows with the same id."""
+
+        start = len(self._ids)
+        self._segments.append(segment)
+        self._starts.append(start)
+        self._ids.extend(segment.ids)
+        self._texts.extend(segment.texts)
+        self._metadatas.extend(segment.metadatas)
+        dead = {start + row for row in deleted}
+        self._dead.update(dead)
+        for position, doc_id in enumerate(segment.ids, start):
+            if position in dead:
+                continue
+            previous = self._positions.get(doc_id)
+            if previous is not None:
+                self._dead.add(previous)
+            self._positions[doc_id] = position
+
+    def _segment_index(self, position: int) -> int:
+        return bisect.bisect_right(self._starts, position) - 1
+
+    def _deleted_rows(self) -> List[List[int]]:
+        """Tombstoned rows of each segment, as row numbers within the segment."""
+
+        deleted: List[List[int]] = [[] for _ in self._segments]
+        for position in self._dead:
+            index = self._segment_index(position)
+            deleted[index].append(position - self._starts[index])
+        return [sorted(rows) for rows in deleted]
+
+    def _dim(self) -> Optional[int]:
+        return int(self._segments[0].vectors.shape[1]) if self._segments else None
+
+    def _write_segment(
+        self, ids: List[str], texts: List[str], metadatas: List[Dict[str, Any]], dim: int, blocks: Iterable[Block]
+    ) -> _Segment:
+        directory = self.path / f'segment-{uuid.uuid4().hex}'
+        directory.mkdir(parents=True)
+        shape = (len(ids),)
+        vectors = np.lib.format.open_memmap(directory / 'vectors.npy', mode='w+', dtype=self.dtype, shape=shape + (dim,))
+        sqnorms = np.lib.format.open_memmap(directory / 'sqnorms.npy', mode='w+', dtype=np.float32, shape=shape)
+        scales = (
+            np.lib.format.open_memmap(directory / 'scales.npy', mode='w+', dtype=np.float32, shape=shape)
+            if self.dtype == 'int8' else None
+        )
+        start = 0
+        for stored, block_scales, block_sqnorms in blocks:
+            end = start + len(stored)
+            vectors[start:end] = stored
+            sqnorms[start:end] = block_sqnorms
+            if scales is not None:
+                scales[start:end] = block_scales
+            start = end
+        for array in (vectors, sqnorms, scales):
+            if array is not None:
+                array.flush()
+        del vectors, sqnorms, scales
+        meta = {'dtype': self.dtype, 'ids': ids, 'texts': texts, 'metadatas': metadatas}
+        (directory / 'meta.json').write_text(json.dumps(meta))
+        return _Segment(directory)
+
+    def _compact(self) -> None:
+        """Merge trailing segments of comparable size, or everything once most rows are dead."""
+
+        if len(self._dead) > len(self._positions):
+            self._merge(0)
+            return
+        live = [len(segment) - len(rows) for segment, rows in zip(self._segments, self._deleted_rows(), strict=True)]
+        first, trailing = len(live) - 1, live[-1] if live else 0
+        while first > 0 and live[first - 1] <= MERGE_RATIO * trailing:
+            first -= 1
+            trailing += live[first]
+        if first < len(live) - 1:
+            self._merge(first)
+
+    def _merge(self, first: int) -> None:
+        """Rewrite segments `first:` as one segment holding only their live rows."""
+
+        if first >= len(self._segments):
+            return
+        start, dim = self._starts[first], self._dim()
+        sources = []
+        for segment, offset in zip(self._segments[first:], self._starts[first:], strict=True):
+            alive = np.ones(len(segment), dtype=bool)
+            alive[[p - offset for p in self._dead if offset <= p < offset + len(segment)]] = False
+            sources.append((segment, np.flatnonzero(alive)))
+        ids = [segment.ids[row] for segment, rows in sources for row in rows]
+        texts = [segment.texts[row] for segment, rows in sources for row in rows]
+        metadatas = [segment.metadatas[row] for segment, rows in sources for row in rows]
+        merged = (
+            self._write_segment(
+                ids, texts, metadatas, dim, (block for segment, rows in sources for block in segment.blocks(rows, self.dtype))
+            )
+            if ids else None
+        )
+
+        del self._segments[first:], self._starts[first:]
+        del self._ids[start:], self._texts[start:], self._metadatas[start:]
+        self._dead = {position for position in self._dead if position < start}
+        for doc_id in ids:
+            del self._positions[doc_id]
+        if merged is not None:
+            self._append(merged)
+
+    def _commit(self) -> None:
+        """Publish the in-memory segments as the next manifest and flip ``CURRENT`` to it."""
+
+        self._generation += 1
+        name = f'manifest-{self._generation:08d}.json'
+        segments = [
+            {'name': segment.name, 'deleted': rows}
+            for segment, rows in zip(self._segments, self._deleted_rows(), strict=True)
+        ]
+        self.path.mkdir(parents=True, exist_ok=True)
+        (self.path / name).write_text(json.dumps({'generation': self._generation, 'segments': segments}))
+        tmp = self.path / f'{CURRENT_FILE}.{uuid.uuid4().hex}.tmp'
+        tmp.write_text(name)
+        os.replace(tmp, self.path / CURRENT_FILE)
+        self._collect_garbage()
+
+    def _collect_garbage(self) -> None:
+        """Drop manifests older than the last KEEP_MANIFESTS and segments none of those reference."""
+
+        manifests = sorted(self.path.glob('manifest-*.json'))
+        for stale in manifests[:-KEEP_MANIFESTS]:
+            stale.unlink(missing_ok=True)
+        referenced = {
+            entry['name']
+            for manifest in manifests[-KEEP_MANIFESTS:]
+            for entry in json.loads(manifest.read_text())['segments']
+        }
+        for directory in self.path.glob('segment-*'):
+            if directory.name not in referenced:
+                # Open mmaps in other processes keep the unlinked files alive until they reload.
+                shutil.rmtree(directory, ignore_errors=True)
+
+    # ------------------------------------------------------------------
+    # VectorStore API
+    # ------------------------------------------------------------------
+    def add_texts(
+        self,
+        texts: Iterable[str],
+        metadatas: Optional[List[Dict[str, Any]]] = None,
+        *,
+        ids: Optional[List[str]] = None,
+        **kwargs: Any,
+    ) -> List[str]:
+        """Upsert `texts`; existing ids are replaced."""
+
+        texts = list(texts)
+        if not texts:
+            return []
+        ids = list(ids) if ids else [uuid.uuid4().hex for _ in texts]
+        metadatas = list(metadatas) if metadatas else [{} for _ in texts]
+        vectors = np.asarray(self.embedding.embed_documents(texts), dtype=np.float32)
+        dim = self._dim()
+        if dim is not None and vectors.shape[1] != dim:
+            raise ValueError(f'Collection expecting embedding with dimension of {dim}, got {vectors.shape[1]}')
+        self._append(self._write_segment(ids, texts, metadatas, vectors.shape[1], [_quantize(vectors, self.dtype)]))
+        self._compact()
+        self._commit()
+        return ids
+
+    def delete(self, ids: Optional[List[str]] = None, **kwargs: Any) -> Optional[bool]:
+        if not ids:
+            return False
+        dropped = [self._positions.pop(doc_id) for doc_id in dict.fromkeys(ids) if doc_id in self._positions]
+        if not dropped:
+            return False
+        self._dead.update(dropped)
+        self._compact()
+        self._commit()
+        return True
+
+    def reset_collection(self) -> None:
+        """Drop every row (Chroma's `reset_collection`); the next upsert may use a new dimension."""
+
+        self._clear()
+        self._commit()
+
+    def get(self, ids: Optional[Sequence[str]] = None, include: Optional[List[str]] = None) -> Dict[str, Any]:
+        """Chroma-compatible subset: ids (optionally filtered), plus documents/metadatas/embeddings if included."""
+
+        positions = [self._positions[i] for i in ids if i in self._positions] if ids else list(self._positions.values())
+        result: Dict[str, Any] = {'ids': [self._ids[i] for i in positions]}
+        include = ['documents', 'metadatas'] if include is None else include
+        if 'documents' in include:
+            result['documents'] = [self._texts[i] for i in positions]
+        if 'metadatas' in include:
+            result['metadatas'] = [self._metadatas[i] for i in positions]
+        if 'embeddings' in include:
+            result['embeddings'] = self._rows(positions)
+        return result
+
+    def _rows(self, positions: List[int]) -> np.ndarray:
+        """Stored vectors at `positions`, dequantized to float32."""
+
+        if not positions:
+            return np.zeros((0, 0), dtype=np.float32)
+        rows = np.empty((len(positions), self._dim()), dtype=np.float32)
+        located: Dict[int, Tuple[List[int], List[int]]] = {}
+        for slot, position in enumerate(positions):
+            index = self._segment_index(position)
+            slots, local = located.setdefault(index, ([], []))
+            slots.append(slot)
+            local.append(position - self._starts[index])
+        for index, (slots, local) in located.items():
+            rows[slots] = self._segments[index].rows(local)
+        return rows
+
+    def __len__(self) -> int:
+        return len(self._positions)
+
+    def _distances(self, queries: np.ndarray, dead: np.ndarray) -> np.ndarray:
+        """(queries x rows) squared L2 distances for a (queries x dim) float32 matrix; `inf` for dead rows."""
+
+        distances = np.empty((len(queries), len(self._ids)), dtype=np.float32)
+        query_sqnorms = np.einsum('ij,ij->i', queries, queries)[:, None]
+        for segment, start in zip(self._segments, self._starts, strict=True):
+            distances[:, start:start + len(segment)] = segment.sqnorms - 2.0 * segment.dots(queries) + query_sqnorms
+        distances[:, dead] = np.inf
+        return distances
+
+    def _top_k(self, distances: np.ndarray, k: int) -> List[Tuple[Document, float]]:
+        k = min(k, len(self._positions))
+        top = np.argpartition(distances, k - 1)[:k]
+        top = top[np.argsort(distances[top], kind='stable')]
+        return [
+            (Document(id=self._ids[i], page_content=self._texts[i], metadata=dict(self._metadatas[i])), float(distances[i]))
+            for i in top
+        ]
+
+    def similarity_search_by_vector_with_score(self, embedding: Sequence[float], k: int = 4) -> List[Tuple[Document, float]]:
+        return self.similarity_search_by_vectors_with_score([embedding], k)[0]
+
+    def similarity_search_by_vectors_with_score(
+        self, embeddings: Sequence[Sequence[float]], k: int = 4
+    ) -> List[List[Tuple[Document, float]]]:
+        """Top-`k` for many query vectors: one matrix-matrix product per group of queries and segment."""
+
+        if not self._positions:
+            return [[] for _ in embeddings]
+        queries = np.asarray(embeddings, dtype=np.float32).reshape(len(embeddings), -1)
+        dead = np.fromiter(self._dead, dtype=np.intp, count=len(self._dead))
+        group = max(1, MAX_DISTANCE_CELLS // len(self._ids))
+        results: List[List[Tuple[Document, float]]] = []
+        for start in range(0, len(queries), group):
+            distances = self._distances(queries[start:start + group], dead)
+            results.extend(self._top_k(row, k) for row in distances)
+        return results
+
+    def similarity_search_by_vector(self, embedding: List[float], k: int = 4, **kwargs: Any) -> List[Document]:
+        return [doc for doc, _ in self.similarity_search_by_vector_with_score(embedding, k)]
+
+    def similarity_search_with_score(self, query: str, k: int = 4, **kwargs: Any) -> List[Tuple[Document, float]]:
+        return self.similarity_search_by_vector_with_score(self.embedding.embed_query(query), k)
+
+    def similarity_search(self, query: str, k: int = 4, **kwargs: Any) -> List[Document]:
+        return self.similarity_search_by_vector(self.embedding.embed_query(query), k)
+
+    @classmethod
+    def from_texts(
+        cls,
+        texts: List[str],
+        embedding: Embeddings,
+        metadatas: Optional[List[Dict[str, Any]]] = None,
+        *,
+        path: Optional[Path] = None,
+        dtype: str = 'float32',
+        ids: Optional[List[str]] = None,
+        **kwargs: Any,
+    ) -> 'NumpyVectorStore':
+        if path is None:
+            raise ValueError('NumpyVectorStore.from_texts requires path=')
+        store = cls(path, embedding, dtype=dtype)
+        store.add_texts(texts, metadatas, ids=ids)
+        return store
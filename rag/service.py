@@ -2,94 +2,384 @@
 
 from __future__ import annotations
 
+import asyncio
+import contextlib
+import itertools
 import logging
-import shutil
+import multiprocessing
+import os
+import re
+import threading
 import time
+from collections import Counter, deque
+from concurrent.futures import Future, ProcessPoolExecutor
 from pathlib import Path
-from typing import Callable, Iterable, List, Optional, Sequence
+from typing import (
+    Any, Awaitable, Callable, Deque, Dict, Iterable, Iterator, List, NamedTuple, Optional, Sequence, Tuple, Union,
+)
 
 from langchain_chroma import Chroma
 from langchain_community.document_loaders import TextLoader
-from langchain_community.embeddings import HuggingFaceEmbeddings
 from langchain_core.documents import Document
+from langchain_core.embeddings import Embeddings
+from langchain_core.vectorstores import VectorStore
 from langchain_text_splitters import RecursiveCharacterTextSplitter
 
+from apps.api.cache import LRUCache
 from apps.api.config.settings import AppSettings, get_settings
+from apps.api.timing import stage
+from rag.answer_cache import SemanticAnswerCache
+from rag.config import RAGSettings
+from rag.context import PackedContext, mmr_order, pack_context
+from rag.bm25 import BM25Index, looks_like_identifier_query
+from rag.embedding_cache import CachedEmbeddings, EmbeddingCache
+from rag.embeddings import get_embeddings
+from rag.numpy_store import NumpyVectorStore
+from rag.manifest import (
+    GENERATION_FILE,
+    IngestManifest,
+    IngestStats,
+    chunk_ids,
+    read_generation,
+    sha256_file,
+    sha256_text,
+)
 
 logger = logging.getLogger(__name__)
 
 SUPPORTED_SUFFIXES = {".md", ".markdown", ".txt"}
 
+CHUNK_SIZE = 800
+CHUNK_OVERLAP = 100
+
+RETRIEVAL_MODES = ('vector', 'lexical', 'hybrid', 'auto')
+# Reciprocal-rank-fusion constant; 60 is the value from the original RRF paper.
+RRF_K = 60
+
+
+class Retrieval(NamedTuple):
+    documents: List[Document]
+    path: str  # which retriever produced `documents`: vector | lexical | hybrid
+
+
+def normalize_query(query: str) -> str:
+    """Cache key form of a query: case- and whitespace-insensitive."""
+
+    return re.sub(r'\s+', ' ', query).strip().lower()
+
+
+def _walk_sorted(root: Path) -> Iterator[Path]:
+    for directory, dirnames, filenames in os.walk(root):
+        dirnames.sort()
+        for name in sorted(filenames):
+            yield Path(directory) / name
+
+
+def _split_file(file_path: str, source: str) -> List[Document]:
+    """Load and chunk one file; module-level so split worker processes can run it."""
+
+    docs = TextLoader(file_path, encoding='utf-8').load()
+    for doc in docs:
+        doc.metadata.setdefault('source', source)
+    splitter = RecursiveCharacterTextSplitter(chunk_size=CHUNK_SIZE, chunk_overlap=CHUNK_OVERLAP)
+    return splitter.split_documents(docs)
+
+
+def _hybrid_depth(k: int) -> int:
+    return max(k * 4, 20)
+
+
+def _fuse(lexical: List[Document], vector: List[Document], k: int) -> List[Document]:
+    """Reciprocal-rank fusion of a BM25 and a vector ranking."""
+
+    scores: Dict[str, float] = {}
+    docs: Dict[str, Document] = {}
+    for ranking in (lexical, vector):
+        for rank, doc in enumerate(ranking):
+            scores[doc.id] = scores.get(doc.id, 0.0) + 1.0 / (RRF_K + rank + 1)
+            docs.setdefault(doc.id, doc)
+    best = sorted(scores, key=scores.get, reverse=True)[:k]
+    return [docs[doc_id] for doc_id in best]
+
+
+class _SavedTime:
+    """Average cost of a cache miss, used to estimate the time each hit saved."""
+
+    def __init__(self) -> None:
+        self.misses = 0
+        self.miss_ms = 0.0
+        self.saved_ms = 0.0
+
+    @property
+    def avg_miss_ms(self) -> float:
+        return self.miss_ms / self.misses if self.misses else 0.0
+
+    def miss(self, elapsed_ms: float) -> None:
+        self.misses += 1
+        self.miss_ms += elapsed_ms
+
+    def hit(self, avoided_ms: float) -> None:
+        self.saved_ms += avoided_ms
+
 
 class RAGService:
     """Encapsulates vector store ingestion/retrieval and lightweight answering."""
 
-    def __init__(self, settings: Optional[AppSettings] = None):
+    def __init__(
+        self,
+        settings: Optional[AppSettings] = None,
+        embeddings: Optional[Embeddings] = None,
+        collection: Optional[str] = None,
+    ):
         self.settings = settings or get_settings()
-        self.docs_path = Path(self.settings.rag_docs_path)
-        self.vectorstore_path = Path(self.settings.rag_vectorstore_path)
+        paths = RAGSettings.from_app(self.settings, collection)
+        self.collection = paths.collection
+        self.docs_path = Path(paths.docs_path)
+        self.vectorstore_path = Path(paths.vectorstore_path)
         self.embedding_model_name = self.settings.embedding_model_name
-        self.embeddings = HuggingFaceEmbeddings(model_name=self.embedding_model_name)
-        self._vectorstore: Optional[Chroma] = None
+        self.embeddings = embeddings or get_embeddings(self.embedding_model_name)
+        self._vectorstore: Optional[VectorStore] = None
+        # One Chroma client per service, shared by every store handle it opens, so close()
+        # has exactly one reference on chromadb's per-directory System to release.
+        self._chroma_client: Optional[Any] = None
+        self._client_lock = threading.Lock()
+        self._query_embeddings: Optional[LRUCache[List[float]]] = (
+            LRUCache(self.settings.rag_query_cache_max_entries) if self.settings.rag_query_cache_max_entries > 0 else None
+        )
+        self._retrievals: Optional[LRUCache[list]] = (
+            LRUCache(self.settings.rag_retrieval_cache_max_entries)
+            if self.settings.rag_retrieval_cache_max_entries > 0 else None
+        )
+        self._answers: Optional[SemanticAnswerCache] = (
+            SemanticAnswerCache(
+                self.settings.rag_answer_cache_max_entries,
+                threshold=self.settings.rag_answer_cache_threshold,
+                ttl_s=self.settings.rag_answer_cache_ttl_s,
+            )
+            if self.settings.rag_answer_cache_max_entries > 0 else None
+        )
+        self._embed_cost = _SavedTime()
+        self._search_cost = _SavedTime()
+        self._answer_cost = _SavedTime()
+        self._generation = 0
+        self._generation_mtime: Optional[int] = None
+        self._bm25: Optional[BM25Index] = None
+        self._paths: Counter = Counter()
+        self._context_stats: Counter = Counter()
 
     # ------------------------------------------------------------------
     # Ingestion
     # ------------------------------------------------------------------
-    def ingest_documents(self, doc_paths: Sequence[Path]) -> int:
-        """Ingest markdown/text documents, rebuild vector store, and persist it."""
+    def ingest_documents(self, doc_paths: Sequence[Path], *, full_rebuild: bool = False) -> IngestStats:
+        """Bring the vector store in line with `doc_paths`, embedding only new or edited chunks.
 
-        documents: List[Document] = []
-        for path in doc_paths:
-            documents.extend(self._load_path(path))
+        Files are walked lazily and hashed in blocks; unchanged files (same sha256 as in
+        the manifest) are never read into the splitter. Changed files are split by
+        `RAG_SPLIT_PROCESSES` worker processes (in-process when 0), and their chunks are
+        embedded and upserted `RAG_INGEST_BATCH_SIZE` at a time, so memory stays flat
+        however large the corpus is. After every batch the manifest is saved as a
+        checkpoint and the generation bumped, which makes the new chunks visible to
+        serving processes and lets an interrupted run resume where it stopped. Stale
+        chunks are deleted once the walk completes, so an incremental ingest never leaves
+        the collection empty. A different embedding model, or `full_rebuild=True`,
+        recreates the collection (the old vectors may not even have the new model's
+        dimension) and re-embeds everything into it.
+        """
 
-        if not documents:
+        files = self._discover_files(doc_paths)
+        first = next(files, None)
+        if first is None:
             raise ValueError(
                 f'No documents found under {[str(p) for p in doc_paths]}. '
                 'Ensure markdown/txt files exist before ingestion.'
             )
 
-        splitter = RecursiveCharacterTextSplitter(chunk_size=800, chunk_overlap=100)
-        chunks = splitter.split_documents(documents)
-        if not chunks:
+        manifest = IngestManifest.load(self.vectorstore_path)
+        stats = IngestStats()
+        if full_rebuild or manifest.embedding_model != self.embedding_model_name:
+            stats.full_rebuild = True
+            manifest = IngestManifest(generation=manifest.generation, rebuild_in_progress=True)
+        elif manifest.rebuild_in_progress:
+            stats.full_rebuild = stats.resumed_rebuild = True
+        manifest.embedding_model = self.embedding_model_name
+
+        ingest_embeddings = self._ingest_embeddings()
+        vectorstore = self._open_vectorstore(ingest_embeddings)
+        if stats.full_rebuild and not stats.resumed_rebuild:
+            # Vectors from another embedding model are unusable, and a collection only takes
+            # one dimension: start from an empty one and tell serving processes to reopen it.
+            vectorstore.reset_collection()
+            manifest.generation += 1
+            manifest.save(self.vectorstore_path)
+        existing_ids = set(vectorstore.get(include=[])['ids'])
+        lexical, lexical_synced = self._sync_lexical_index(vectorstore, existing_ids)
+        # A resumed rebuild can only trust the chunks of files it already checkpointed.
+        if stats.resumed_rebuild:
+            reusable_ids = existing_ids & {cid for source in manifest.files for cid in manifest.chunk_ids(source)}
+        else:
+            reusable_ids = existing_ids
+        seen_sources: set = set()
+        wanted_ids: set = set()
+        batch: List[Tuple[str, Document]] = []
+        completed: Dict[str, Dict[str, object]] = {}  # files whose chunks are all in `batch` or the store
+
+        def flush() -> bool:
+            for start in range(0, len(batch), self.settings.rag_ingest_batch_size):
+                part = batch[start:start + self.settings.rag_ingest_batch_size]
+                vectorstore.add_documents([chunk for _, chunk in part], ids=[chunk_id for chunk_id, _ in part])
+                lexical.add(
+                    [chunk_id for chunk_id, _ in part],
+                    [chunk.page_content for _, chunk in part],
+                    [chunk.metadata for _, chunk in part],
+                )
+            added = len(batch)
+            stats.added_chunks += added
+            manifest.files.update(completed)
+            batch.clear()
+            completed.clear()
+            return bool(added)
+
+        def checkpoint() -> None:
+            if flush():
+                manifest.generation += 1
+                manifest.save(self.vectorstore_path)
+                stats.checkpoints += 1
+
+        def unchanged(source: str, file_hash: str) -> bool:
+            entry = manifest.files.get(source)
+            known_ids = manifest.chunk_ids(source)
+            if entry and entry['sha256'] == file_hash and known_ids <= reusable_ids:
+                stats.unchanged_files += 1
+                wanted_ids.update(known_ids)
+                return True
+            return False
+
+        for source, file_hash, chunks in self._split_changed(itertools.chain([first], files), unchanged, seen_sources):
+            stats.changed_files += 1
+            hashes = [sha256_text(chunk.page_content) for chunk in chunks]
+            ids = chunk_ids(source, hashes)
+            for chunk_id, chunk_hash, chunk in zip(ids, hashes, chunks, strict=True):
+                if chunk_id not in reusable_ids:
+                    chunk.metadata['chunk_hash'] = chunk_hash
+                    batch.append((chunk_id, chunk))
+            wanted_ids.update(ids)
+            completed[source] = {'sha256': file_hash, 'chunks': dict(zip(ids, hashes, strict=True))}
+            if len(batch) >= self.settings.rag_ingest_batch_size:
+                checkpoint()
+
+        for source in set(manifest.files) - seen_sources:
+            del manifest.files[source]
+            stats.removed_files += 1
+
+        if not wanted_ids:
             raise ValueError('Document splitting yielded 0 chunks; check the source files.')
 
-        if self.vectorstore_path.exists():
-            shutil.rmtree(self.vectorstore_path)
+        added_since_checkpoint = flush()
+        stale_ids = sorted(existing_ids - wanted_ids)
+        if stale_ids:
+            vectorstore.delete(ids=stale_ids)
+            lexical.remove(stale_ids)
+        if stats.added_chunks or stale_ids or stats.full_rebuild or lexical_synced:
+            lexical.save(self.vectorstore_path)
+        if added_since_checkpoint or stale_ids:
+            manifest.generation += 1
+        manifest.rebuild_in_progress = False
+        manifest.save(self.vectorstore_path)
 
-        vectorstore = Chroma.from_documents(
-            documents=chunks,
-            embedding=self.embeddings,
-            persist_directory=str(self.vectorstore_path),
+        stats.deleted_chunks = len(stale_ids)
+        stats.total_chunks = len(wanted_ids)
+        stats.embedding_cache_hits = ingest_embeddings.stats['hits']
+        stats.embedded_texts = ingest_embeddings.stats['misses']
+        self._vectorstore = None  # reopen with the query-time embeddings on next use
+        logger.info(
+            'Ingested %s: %s chunks added, %s deleted, %s files unchanged (%s total chunks in %s)',
+            'with full rebuild' if stats.full_rebuild else 'incrementally',
+            stats.added_chunks, stats.deleted_chunks, stats.unchanged_files, stats.total_chunks, self.vectorstore_path,
         )
-        if hasattr(vectorstore, 'persist'):
-            vectorstore.persist()
-        self._vectorstore = vectorstore
-        logger.info('Persisted %s chunks to vector store %s', len(chunks), self.vectorstore_path)
-        return len(chunks)
-
-    def _load_path(self, path: Path) -> List[Document]:
-        if path.is_dir():
-            docs: List[Document] = []
-            for file_path in path.rglob('*'):
+        return stats
+
+    def _discover_files(self, doc_paths: Sequence[Path]) -> Iterator[Tuple[str, Path]]:
+        """Lazily yield `(source, path)` for supported files, in a stable (sorted) walk order."""
+
+        for path in doc_paths:
+            path = Path(path)
+            if path.is_file():
+                candidates: Iterable[Path] = [path]
+            elif path.is_dir():
+                candidates = _walk_sorted(path)
+            else:
+                logger.debug('Skipping missing path: %s', path)
+                continue
+            for file_path in candidates:
                 if file_path.suffix.lower() in SUPPORTED_SUFFIXES:
-                    docs.extend(self._load_file(file_path))
-            return docs
-        if path.is_file() and path.suffix.lower() in SUPPORTED_SUFFIXES:
-            return self._load_file(path)
-        logger.debug('Skipping unsupported path: %s', path)
-        return []
-
-    def _load_file(self, file_path: Path) -> List[Document]:
-        loader = TextLoader(str(file_path), encoding='utf-8')
-        docs = loader.load()
-        for doc in docs:
-            doc.metadata.setdefault('source', str(file_path.relative_to(self.docs_path)))
-        return docs
+                    yield str(file_path.relative_to(self.docs_path)), file_path
+
+    def _split_changed(
+        self,
+        files: Iterable[Tuple[str, Path]],
+        unchanged: Callable[[str, str], bool],
+        seen_sources: set,
+    ) -> Iterator[Tuple[str, str, List[Document]]]:
+        """Yield `(source, file sha256, chunks)` for each changed file, in walk order.
+
+        With `RAG_SPLIT_PROCESSES > 0` files are read and split in a spawn-started process
+        pool, with at most two files per worker in flight so results never pile up.
+        """
+
+        processes = self.settings.rag_split_processes
+        window = max(1, processes * 2)
+        pending: Deque[Tuple[str, str, Future]] = deque()
+        with contextlib.ExitStack() as stack:
+            pool = None
+            if processes > 0:
+                pool = stack.enter_context(ProcessPoolExecutor(processes, mp_context=multiprocessing.get_context('spawn')))
+            for source, file_path in files:
+                seen_sources.add(source)
+                file_hash = sha256_file(file_path)
+                if unchanged(source, file_hash):
+                    continue
+                if pool is not None:
+                    future = pool.submit(_split_file, str(file_path), source)
+                else:
+                    future = Future()
+                    future.set_result(_split_file(str(file_path), source))
+                pending.append((source, file_hash, future))
+                while len(pending) >= window:
+                    source_done, hash_done, done = pending.popleft()
+                    yield source_done, hash_done, done.result()
+            while pending:
+                source_done, hash_done, done = pending.popleft()
+                yield source_done, hash_done, done.result()
 
     # ------------------------------------------------------------------
     # Retrieval helpers
     # ------------------------------------------------------------------
-    def _ensure_vectorstore(self) -> Chroma:
+    def _ingest_embeddings(self) -> CachedEmbeddings:
+        return CachedEmbeddings(
+            self.embeddings,
+            EmbeddingCache(self.settings.rag_embedding_cache_dir, self.embedding_model_name),
+            batch_size=self.settings.rag_embed_batch_size,
+            processes=self.settings.rag_embed_processes,
+        )
+
+    def _open_vectorstore(self, embeddings: Optional[Embeddings] = None) -> VectorStore:
+        if self.settings.rag_vector_backend == 'numpy':
+            return NumpyVectorStore(
+                self.vectorstore_path / 'numpy_index',
+                embeddings or self.embeddings,
+                dtype=self.settings.rag_numpy_dtype,
+            )
+        with self._client_lock:
+            if self._chroma_client is not None:
+                return Chroma(client=self._chroma_client, embedding_function=embeddings or self.embeddings)
+            store = Chroma(
+                persist_directory=str(self.vectorstore_path),
+                embedding_function=embeddings or self.embeddings,
+            )
+            self._chroma_client = store._client
+            return store
+
+    def _ensure_vectorstore(self) -> VectorStore:
         if self._vectorstore:
             return self._vectorstore
         if not self.vectorstore_path.exists():
@@ -97,19 +387,310 @@ class RAGService:
                 f'No vector store found at {self.vectorstore_path}. '
                 'Run `poetry run python rag/ingest.py` first.'
             )
-        self._vectorstore = Chroma(
-            persist_directory=str(self.vectorstore_path),
-            embedding_function=self.embeddings,
-        )
+        self._vectorstore = self._open_vectorstore()
         return self._vectorstore
 
-    def retrieve(self, query: str, top_k: Optional[int] = None) -> List[Document]:
+    def close(self) -> None:
+        """Release the Chroma client and drop the BM25 index and caches.
+
+        Call it once no request is using the service any more; a later call reopens lazily.
+        """
+
+        with self._client_lock:
+            client, self._chroma_client = self._chroma_client, None
+        self._vectorstore = None
+        self._bm25 = None
+        for cache in (self._query_embeddings, self._retrievals, self._answers):
+            if cache is not None:
+                cache.clear()
+        if client is not None:
+            # chromadb keeps one System per persist directory until its last client closes.
+            client.close()
+
+    def warmup(self) -> None:
+        """Run the embedding model once and open the vector store so the first query is fast."""
+
+        self.embeddings.embed_query('warmup')
+        if self.vectorstore_path.exists():
+            self._ensure_vectorstore().similarity_search('warmup', k=1)
+        else:
+            logger.warning('Vector store %s missing; skipping retrieval warmup', self.vectorstore_path)
+
+    def index_generation(self) -> int:
+        """Current index generation; on change (a new ingest) the query caches are dropped.
+
+        Costs one `stat()` per call, so ingests run by another process are picked up too.
+        """
+
+        try:
+            mtime = (self.vectorstore_path / GENERATION_FILE).stat().st_mtime_ns
+        except FileNotFoundError:
+            mtime = None
+        if mtime != self._generation_mtime:
+            self._generation_mtime = mtime
+            generation = read_generation(self.vectorstore_path)
+            if generation != self._generation:
+                self._generation = generation
+                self._vectorstore = None
+                self._bm25 = None
+                for cache in (self._query_embeddings, self._retrievals, self._answers):
+                    if cache is not None:
+                        cache.clear()
+        return self._generation
+
+    def embed_query(self, query: str) -> List[float]:
+        """Embed a query, reusing the embedding of any earlier query with the same normalized text.
+
+        Normalization only builds the cache key: the model always sees the query as typed.
+        """
+
+        key = normalize_query(query)
+        if self._query_embeddings is not None:
+            cached = self._query_embeddings.get(key)
+            if cached is not None:
+                self._embed_cost.hit(self._embed_cost.avg_miss_ms)
+                return cached
+        start = time.perf_counter()
+        with stage('rag.embed_query'):
+            embedding = self.embeddings.embed_query(query)
+        self._embed_cost.miss((time.perf_counter() - start) * 1000)
+        if self._query_embeddings is not None:
+            self._query_embeddings.put(key, embedding)
+        return embedding
+
+    def embed_queries(self, queries: Sequence[str]) -> List[List[float]]:
+        """`embed_query()` for many queries: cache misses are encoded in one batched model call."""
+
+        keys = [normalize_query(query) for query in queries]
+        # The first spelling of each normalized query is the one that gets embedded.
+        texts: Dict[str, str] = {}
+        for key, query in zip(keys, queries, strict=True):
+            texts.setdefault(key, query)
+        found: Dict[str, List[float]] = {}
+        for key in texts:
+            cached = self._query_embeddings.get(key) if self._query_embeddings is not None else None
+            if cached is not None:
+                self._embed_cost.hit(self._embed_cost.avg_miss_ms)
+                found[key] = cached
+        missing = [key for key in texts if key not in found]
+        if missing:
+            start = time.perf_counter()
+            # HuggingFaceEmbeddings.embed_query is embed_documents([text])[0], so vectors match the single path.
+            with stage('rag.embed_query'):
+                vectors = self.embeddings.embed_documents([texts[key] for key in missing])
+            per_query_ms = (time.perf_counter() - start) * 1000 / len(missing)
+            for key, vector in zip(missing, vectors, strict=True):
+                self._embed_cost.miss(per_query_ms)
+                found[key] = vector
+                if self._query_embeddings is not None:
+                    self._query_embeddings.put(key, vector)
+        return [found[key] for key in keys]
+
+    def retrieve(self, query: str, top_k: Optional[int] = None, mode: Optional[str] = None) -> List[Document]:
         """Retrieve relevant chunks for a query."""
 
-        retriever = self._ensure_vectorstore().as_retriever(
-            search_kwargs={'k': top_k or self.settings.rag_top_k}
+        return self.search(query, top_k=top_k, mode=mode).documents
+
+    def search(self, query: str, top_k: Optional[int] = None, mode: Optional[str] = None) -> Retrieval:
+        """Retrieve chunks with `mode` (default `RAG_RETRIEVAL_MODE`) and report which path served them.
+
+        `auto` answers identifier-style queries (error codes, config keys, endpoint paths)
+        from the BM25 index alone, skipping the embedding model, and falls back to vector
+        search for prose or when BM25 finds nothing. `hybrid` fuses both rankings (RRF).
+        """
+
+        mode = mode or self.settings.rag_retrieval_mode
+        if mode not in RETRIEVAL_MODES:
+            raise ValueError(f'Unknown retrieval mode {mode!r}; expected one of {RETRIEVAL_MODES}')
+        k = top_k or self.settings.rag_top_k
+        cache_key = self._retrieval_key(query, k, mode)
+        cached = self._cached_retrieval(cache_key)
+        if cached is not None:
+            return cached
+
+        start = time.perf_counter()
+        if mode == 'lexical':
+            result = Retrieval(self._lexical_search(query, k), 'lexical')
+        elif mode == 'hybrid':
+            depth = _hybrid_depth(k)
+            result = Retrieval(_fuse(self._lexical_search(query, depth), self._vector_search(query, depth), k), 'hybrid')
+        else:
+            docs = self._lexical_search(query, k) if mode == 'auto' and looks_like_identifier_query(query) else []
+            result = Retrieval(docs, 'lexical') if docs else Retrieval(self._vector_search(query, k), 'vector')
+        self._search_cost.miss((time.perf_counter() - start) * 1000)
+        self._remember_retrieval(cache_key, result)
+        return result
+
+    def search_many(
+        self, queries: Sequence[str], top_k: Optional[int] = None, mode: Optional[str] = None
+    ) -> List[Union[Retrieval, Exception]]:
+        """`search()` for many queries, with one batched embedding pass and one multi-query vector lookup.
+
+        Each entry is that query's `Retrieval`, or the exception its retrieval raised, so
+        one bad query does not fail the rest.
+        """
+
+        mode = mode or self.settings.rag_retrieval_mode
+        if mode not in RETRIEVAL_MODES:
+            raise ValueError(f'Unknown retrieval mode {mode!r}; expected one of {RETRIEVAL_MODES}')
+        k = top_k or self.settings.rag_top_k
+        depth = _hybrid_depth(k) if mode == 'hybrid' else k
+        start = time.perf_counter()
+        results: List[Union[Retrieval, Exception, None]] = [None] * len(queries)
+        keys = [self._retrieval_key(query, k, mode) for query in queries]
+        searched: List[int] = []
+        lexical: Dict[int, List[Document]] = {}
+        needs_vector: List[int] = []
+        for i, query in enumerate(queries):
+            results[i] = self._cached_retrieval(keys[i])
+            if results[i] is not None:
+                continue
+            searched.append(i)
+            try:
+                if mode == 'lexical':
+                    results[i] = Retrieval(self._lexical_search(query, k), 'lexical')
+                elif mode == 'hybrid':
+                    lexical[i] = self._lexical_search(query, depth)
+                    needs_vector.append(i)
+                else:
+                    docs = self._lexical_search(query, k) if mode == 'auto' and looks_like_identifier_query(query) else []
+                    if docs:
+                        results[i] = Retrieval(docs, 'lexical')
+                    else:
+                        needs_vector.append(i)
+            except Exception as exc:  # noqa: BLE001 - reported per query
+                results[i] = exc
+
+        if needs_vector:
+            try:
+                rankings: List[Any] = self._vector_search_many(
+                    self.embed_queries([queries[i] for i in needs_vector]), depth
+                )
+            except Exception as exc:  # noqa: BLE001 - e.g. no vector store yet; fails only the vector queries
+                rankings = [exc] * len(needs_vector)
+            for i, ranking in zip(needs_vector, rankings, strict=True):
+                if isinstance(ranking, Exception):
+                    results[i] = ranking
+                elif mode == 'hybrid':
+                    results[i] = Retrieval(_fuse(lexical[i], ranking, k), 'hybrid')
+                else:
+                    results[i] = Retrieval(ranking, 'vector')
+
+        if searched:
+            per_query_ms = (time.perf_counter() - start) * 1000 / len(searched)
+            for i in searched:
+                if isinstance(results[i], Retrieval):
+                    self._search_cost.miss(per_query_ms)
+                    self._remember_retrieval(keys[i], results[i])
+        return results
+
+    def _retrieval_key(self, query: str, k: int, mode: str) -> Tuple[str, int, str, int]:
+        return sha256_text(normalize_query(query)), k, mode, self.index_generation()
+
+    def _cached_retrieval(self, cache_key: Tuple[str, int, str, int]) -> Optional[Retrieval]:
+        if self._retrievals is None:
+            return None
+        cached = self._retrievals.get(cache_key)
+        if cached is None:
+            return None
+        path, rows = cached
+        self._search_cost.hit(self._search_cost.avg_miss_ms)
+        self._paths[path] += 1
+        return Retrieval(
+            [Document(id=doc_id, page_content=content, metadata=dict(metadata)) for doc_id, content, metadata in rows],
+            path,
         )
-        return retriever.invoke(query)
+
+    def _remember_retrieval(self, cache_key: Tuple[str, int, str, int], result: Retrieval) -> None:
+        self._paths[result.path] += 1
+        if self._retrievals is not None:
+            rows = [(doc.id, doc.page_content, dict(doc.metadata)) for doc in result.documents]
+            self._retrievals.put(cache_key, (result.path, rows))
+
+    def _vector_search(self, query: str, k: int) -> List[Document]:
+        embedding = self.embed_query(query)
+        with stage('rag.vector_search'):
+            return self._ensure_vectorstore().similarity_search_by_vector(embedding, k=k)
+
+    def _vector_search_many(self, embeddings: Sequence[List[float]], k: int) -> List[List[Document]]:
+        """Top-`k` chunks for each query vector, in one multi-query lookup where the backend has one."""
+
+        with stage('rag.vector_search'):
+            return self._vector_lookup_many(embeddings, k)
+
+    def _vector_lookup_many(self, embeddings: Sequence[List[float]], k: int) -> List[List[Document]]:
+        store = self._ensure_vectorstore()
+        if isinstance(store, NumpyVectorStore):
+            return [[doc for doc, _ in hits] for hits in store.similarity_search_by_vectors_with_score(embeddings, k)]
+        if isinstance(store, Chroma):
+            found = store._collection.query(
+                query_embeddings=[list(embedding) for embedding in embeddings],
+                n_results=k,
+                include=['documents', 'metadatas'],
+            )
+            return [
+                [
+                    Document(id=doc_id, page_content=text, metadata=metadata or {})
+                    for text, metadata, doc_id in zip(texts, metadatas, ids, strict=True)
+                    if text is not None
+                ]
+                for texts, metadatas, ids in zip(found['documents'], found['metadatas'], found['ids'], strict=True)
+            ]
+        return [store.similarity_search_by_vector(embedding, k=k) for embedding in embeddings]
+
+    def _lexical_search(self, query: str, k: int) -> List[Document]:
+        with stage('rag.lexical_search'):
+            return [doc for doc, _ in self._lexical_index().search(query, k)]
+
+    def _lexical_index(self) -> BM25Index:
+        if self._bm25 is None:
+            # Stores ingested before the lexical index existed get one built in memory.
+            self._bm25 = BM25Index.load(self.vectorstore_path) or self._build_lexical_index(self._ensure_vectorstore())
+        return self._bm25
+
+    def _sync_lexical_index(self, vectorstore: VectorStore, stored_ids: set) -> Tuple[BM25Index, bool]:
+        """The saved BM25 index brought in line with `stored_ids`, and whether that changed it.
+
+        Normally a no-op; only chunks the index lacks (no index yet, or an interrupted ingest)
+        are read back from the store, a page at a time.
+        """
+
+        index = (BM25Index.load(self.vectorstore_path) if stored_ids else None) or BM25Index.build([], [], [])
+        extra = [doc_id for doc_id in index.live_ids() if doc_id not in stored_ids]
+        missing = sorted(doc_id for doc_id in stored_ids if doc_id not in index)
+        index.remove(extra)
+        page = self.settings.rag_ingest_batch_size
+        for start in range(0, len(missing), page):
+            stored = vectorstore.get(ids=missing[start:start + page], include=['documents', 'metadatas'])
+            index.add(stored['ids'], stored['documents'], stored['metadatas'])
+        return index, bool(extra or missing)
+
+    @staticmethod
+    def _build_lexical_index(vectorstore: VectorStore) -> BM25Index:
+        stored = vectorstore.get(include=['documents', 'metadatas'])
+        return BM25Index.build(stored['ids'], stored['documents'], stored['metadatas'])
+
+    def retrieval_stats(self) -> Dict[str, object]:
+        return {
+            'default_mode': self.settings.rag_retrieval_mode,
+            'paths': dict(self._paths),
+            'context': {
+                **self._context_stats,
+                'token_budget': self.settings.rag_context_token_budget,
+                'mmr_lambda': self.settings.rag_context_mmr_lambda,
+            },
+        }
+
+    def cache_stats(self) -> Dict[str, object]:
+        stats: Dict[str, object] = {'index_generation': self._generation}
+        for name, cache, cost in (
+            ('query_embedding', self._query_embeddings, self._embed_cost),
+            ('retrieval', self._retrievals, self._search_cost),
+            ('answer', self._answers, self._answer_cost),
+        ):
+            if cache is not None:
+                stats[name] = {**cache.stats(), 'time_saved_ms': round(cost.saved_ms, 2)}
+        return stats
 
     # ------------------------------------------------------------------
     # Answer scaffolding
@@ -121,32 +702,196 @@ class RAGService:
         llm_fn: Optional[Callable[[str, str], str]] = None,
         tier: str = 'mock-local',
         top_k: Optional[int] = None,
+        retrieval_mode: Optional[str] = None,
     ) -> dict:
         start = time.time()
-        docs = self.retrieve(query, top_k=top_k)
-        context = self._format_context(docs)
-        context_tokens = self._estimate_tokens(context)
+        retrieval, cached, embedding = self._retrieve_for_answer(query, top_k, retrieval_mode, tier)
+        if cached is not None:
+            return self._cached_payload(cached, start)
+        context = self._build_context(query, retrieval.documents)
 
-        if llm_fn:
-            answer_text = llm_fn(context, query)
-        else:
-            answer_text = self._default_answer(context, query)
+        with stage('llm.generate'):
+            if llm_fn:
+                answer_text = llm_fn(context.text, query)
+            else:
+                time.sleep(self.settings.sherlock_delay_ms / 1000)
+                answer_text = self._default_answer(context.text, query)
+
+        return self._store_answer(embedding, self._payload(answer_text, retrieval, context, tier, start), retrieval, tier)
+
+    async def answer_async(
+        self,
+        query: str,
+        *,
+        llm_afn: Optional[Callable[[str, str], Awaitable[str]]] = None,
+        tier: str = 'mock-local',
+        top_k: Optional[int] = None,
+        retrieval_mode: Optional[str] = None,
+        run_blocking: Optional[Callable[..., Awaitable[Any]]] = None,
+        timeout_s: Optional[float] = None,
+        retrieval: Optional[Retrieval] = None,
+    ) -> dict:
+        """Async `answer()`: retrieval runs via `run_blocking` (default a worker thread), and
+        generation awaits the provider's async API, bounded by `timeout_s`. Pass `retrieval`
+        when it was already done, e.g. by `search_many()` for a batch."""
+
+        start = time.time()
+        run_blocking = run_blocking or asyncio.to_thread
+        retrieval, cached, embedding = await run_blocking(
+            self._retrieve_for_answer, query, top_k, retrieval_mode, tier, retrieval
+        )
+        if cached is not None:
+            return self._cached_payload(cached, start)
+        context = await run_blocking(self._build_context, query, retrieval.documents)
+
+        generation = llm_afn(context.text, query) if llm_afn else self._default_answer_async(context.text, query)
+        with stage('llm.generate'):
+            answer_text = await asyncio.wait_for(generation, timeout_s)
+
+        return self._store_answer(embedding, self._payload(answer_text, retrieval, context, tier, start), retrieval, tier)
+
+    async def _default_answer_async(self, context: str, query: str) -> str:
+        await asyncio.sleep(self.settings.sherlock_delay_ms / 1000)
+        return self._default_answer(context, query)
+
+    def _retrieve_for_answer(
+        self,
+        query: str,
+        top_k: Optional[int],
+        retrieval_mode: Optional[str],
+        tier: str,
+        retrieval: Optional[Retrieval] = None,
+    ) -> Tuple[Retrieval, Optional[dict], Optional[List[float]]]:
+        """Retrieval plus semantic answer-cache lookup: `(retrieval, cached payload, query embedding)`."""
+
+        if retrieval is None:
+            retrieval = self.search(query, top_k=top_k, mode=retrieval_mode)
+        if self._answers is None:
+            return retrieval, None, None
+        embedding = self.embed_query(query)
+        hit = self._answers.lookup(embedding, **self._answer_key(retrieval, tier))
+        if hit is None:
+            return retrieval, None, embedding
+        payload, similarity = hit
+        self._answer_cost.hit(self._answer_cost.avg_miss_ms)
+        payload['cache_similarity'] = round(similarity, 4)
+        return retrieval, payload, embedding
 
-        latency_ms = (time.time() - start) * 1000
-        sources = [doc.metadata.get('source', 'unknown') for doc in docs]
+    def _answer_key(self, retrieval: Retrieval, tier: str) -> Dict[str, Any]:
+        # `search()` has just refreshed the generation, so it matches the retrieved chunks.
+        sources = [doc.id or sha256_text(doc.page_content) for doc in retrieval.documents]
+        return {'sources': sources, 'generation': self._generation, 'tier': tier}
 
+    def _store_answer(self, embedding: Optional[List[float]], payload: dict, retrieval: Retrieval, tier: str) -> dict:
+        if embedding is not None and self._answers is not None:
+            self._answer_cost.miss(payload['latency_ms'])
+            self._answers.put(embedding, payload, **self._answer_key(retrieval, tier))
+        return payload
+
+    @staticmethod
+    def _cached_payload(cached: dict, start: float) -> dict:
+        return {**cached, 'latency_ms': round((time.time() - start) * 1000, 2), 'from_cache': True}
+
+    def _payload(self, answer_text: str, retrieval: Retrieval, context: PackedContext, tier: str, start: float) -> dict:
         return {
             'answer': answer_text,
-            'sources': sources,
+            'sources': [doc.metadata.get('source', 'unknown') for doc in context.documents],
             'llm_tier': tier,
-            'latency_ms': round(latency_ms, 2),
-            'context_tokens_estimate': context_tokens,
+            'latency_ms': round((time.time() - start) * 1000, 2),
+            'context_tokens_estimate': context.tokens,
+            'context_tokens_saved': context.tokens_saved,
             'embedding_model': self.embedding_model_name,
+            'retrieval_path': retrieval.path,
+            'collection': self.collection,
+            'from_cache': False,
+        }
+
+    def answer_stream(
+        self,
+        query: str,
+        *,
+        llm_stream_fn: Optional[Callable[[str, str], Iterable[str]]] = None,
+        tier: str = 'mock-local',
+        top_k: Optional[int] = None,
+        retrieval_mode: Optional[str] = None,
+    ) -> Iterator[Tuple[str, Dict[str, Any]]]:
+        """Streaming `answer()`: yields `('sources', ...)`, then `('token', ...)` per chunk, then `('done', ...)`."""
+
+        start = time.time()
+        retrieval = self.search(query, top_k=top_k, mode=retrieval_mode)
+        context = self._build_context(query, retrieval.documents)
+        yield 'sources', {
+            'sources': [doc.metadata.get('source', 'unknown') for doc in context.documents],
+            'llm_tier': tier,
+            'embedding_model': self.embedding_model_name,
+            'retrieval_path': retrieval.path,
+            'collection': self.collection,
+        }
+
+        if llm_stream_fn:
+            tokens = llm_stream_fn(context.text, query)
+        else:
+            tokens = self._chunk_answer(self._default_answer(context.text, query))
+        first_token_ms = None
+        try:
+            for token in tokens:
+                if not token:
+                    continue
+                if first_token_ms is None:
+                    first_token_ms = (time.time() - start) * 1000
+                yield 'token', {'text': token}
+        finally:
+            # Release the provider's stream promptly if the consumer stops early.
+            close = getattr(tokens, 'close', None)
+            if close is not None:
+                close()
+
+        yield 'done', {
+            'latency_ms': round((time.time() - start) * 1000, 2),
+            'time_to_first_token_ms': round(first_token_ms, 2) if first_token_ms is not None else None,
+            'context_tokens_estimate': context.tokens,
+            'context_tokens_saved': context.tokens_saved,
         }
 
     @staticmethod
-    def _format_context(documents: Iterable[Document]) -> str:
-        return '\n\n'.join(doc.page_content for doc in documents)
+    def _chunk_answer(text: str) -> Iterator[str]:
+        # Word-sized chunks (whitespace kept) so the mock provider streams like a real one.
+        yield from re.findall(r'\s*\S+|\s+$', text)
+
+    def _build_context(self, query: str, documents: Sequence[Document]) -> PackedContext:
+        """Prompt context: MMR re-ranking (if enabled), overlap removal and token-budget packing."""
+
+        ranked = documents
+        lambda_mult = self.settings.rag_context_mmr_lambda
+        use_mmr = lambda_mult < 1 and len(documents) > 1
+        query_embedding = self.embed_query(query) if use_mmr else None
+        with stage('rag.context'):
+            vectors = self._stored_vectors(documents) if use_mmr else None
+            if vectors is not None:
+                ranked = [documents[i] for i in mmr_order(query_embedding, vectors, lambda_mult)]
+            context = pack_context(ranked, self.settings.rag_context_token_budget, retrieved=documents)
+        self._context_stats['contexts'] += 1
+        self._context_stats['tokens'] += context.tokens
+        self._context_stats['tokens_saved'] += context.tokens_saved
+        self._context_stats['chunks_dropped'] += len(documents) - len(context.documents)
+        return context
+
+    def _stored_vectors(self, documents: Sequence[Document]) -> Optional[List[Any]]:
+        """The vectors already stored for `documents`, read back by chunk id; None if any is missing.
+
+        Serving never embeds chunks: without a stored vector for every chunk, MMR is skipped.
+        """
+
+        ids = [doc.id for doc in documents]
+        if not all(ids):
+            return None
+        found = self._ensure_vectorstore().get(ids=ids, include=['embeddings'])
+        embeddings = found.get('embeddings')
+        by_id = dict(zip(found['ids'], embeddings, strict=True)) if embeddings is not None else {}
+        if any(doc_id not in by_id for doc_id in ids):
+            logger.debug('Stored vectors missing for some retrieved chunks; skipping MMR re-ranking')
+            return None
+        return [by_id[doc_id] for doc_id in ids]
 
     @staticmethod
     def _default_answer(context: str, query: str) -> str:
@@ -157,10 +902,3 @@ class RAGService:
             f'Question: {query}\n'
             f'Key Points: {context[:800]}'
         )
-
-    @staticmethod
-    def _estimate_tokens(context: str) -> int:
-        if not context:
-            return 0
-        # Rough heuristic: 4 characters per token for english technical text
-        return max(1, len(context) // 4)
@@ -0,0 +1,80 @@
+#!/usr/bin/env python
+"""Compare per-worker memory of the API with and without pre-fork model loading.
+
+Starts `python -m apps.api.server` twice (``--no-preload``, i.e. one model copy per
+worker as with plain ``uvicorn --workers``, then ``--preload``), waits until every
+worker has loaded the model, and prints RSS / PSS / shared / private memory per
+worker. PSS is the column to compare: it charges shared pages fractionally, so its
+sum is the real combined footprint.
+
+Requires Linux (/proc/<pid>/smaps_rollup) and a reachable MLflow Production model
+(MLFLOW_TRACKING_URI etc. are read from the environment as usual).
+
+    python scripts/bench_worker_memory.py --workers 4
+"""
+import argparse
+import os
+import signal
+import subprocess
+import sys
+import time
+
+from apps.api.server import child_pids, worker_memory
+
+MB = 1024 * 1024
+
+
+def measure(workers, port, preload, timeout):
+    flag = '--preload' if preload else '--no-preload'
+    cmd = [sys.executable, '-m', 'apps.api.server', '--workers', str(workers), '--port', str(port), flag]
+    proc = subprocess.Popen(cmd, stderr=subprocess.PIPE, text=True)
+    try:
+        ready = 0
+        deadline = time.monotonic() + timeout
+        while ready < workers:
+            line = proc.stderr.readline()
+            if not line:
+                raise RuntimeError(f'server exited early with code {proc.poll()}')
+            if time.monotonic() > deadline:
+                raise TimeoutError(f'only {ready}/{workers} workers became ready')
+            if 'Worker' in line and 'ready' in line:
+                ready += 1
+        time.sleep(1.0)  # let import-time allocations settle
+        return worker_memory(proc.pid), {pid: worker_memory(pid) for pid in child_pids(proc.pid)}
+    finally:
+        proc.send_signal(signal.SIGTERM)
+        try:
+            proc.wait(timeout=15)
+        except subprocess.TimeoutExpired:
+            proc.kill()
+
+
+def report(label, master, workers):
+    print(f'\n{label}')
+    print(f"{'process':>12} {'rss MB':>9} {'pss MB':>9} {'shared MB':>10} {'private MB':>11}")
+    rows = [('master', master)] + [(f'worker {pid}', usage) for pid, usage in workers.items()]
+    for name, usage in rows:
+        print(f"{name:>12} {usage['rss'] / MB:9.1f} {usage['pss'] / MB:9.1f} "
+              f"{usage['shared'] / MB:10.1f} {usage['private'] / MB:11.1f}")
+    total_pss = (master['pss'] + sum(u['pss'] for u in workers.values())) / MB
+    print(f'{"total PSS":>12} {total_pss:9.1f}')
+    return total_pss
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--workers', type=int, default=4)
+    parser.add_argument('--port', type=int, default=18080)
+    parser.add_argument('--timeout', type=float, default=180.0)
+    args = parser.parse_args()
+
+    if not os.path.exists('/proc/self/smaps_rollup'):
+        sys.exit('smaps_rollup not available; this benchmark needs Linux >= 4.14')
+
+    baseline = report('no preload (one model copy per worker)', *measure(args.workers, args.port, False, args.timeout))
+    shared = report('preload (model loaded before fork)', *measure(args.workers, args.port, True, args.timeout))
+    print(f'\ncombined PSS: {baseline:.1f} MB -> {shared:.1f} MB ({(1 - shared / baseline) * 100:.0f}% less)')
+
+
+if __name__ == '__main__':
+    main()
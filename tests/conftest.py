@@ -0,0 +1,170 @@
+"""Shared fixtures: a tiny Production model logged to a local MLflow file store, and an
+offline RAG stack backed by deterministic embeddings."""
+
+import hashlib
+import re
+from pathlib import Path
+
+import joblib
+import lightgbm as lgb
+import mlflow
+import mlflow.lightgbm
+import numpy as np
+import pandas as pd
+import pytest
+from langchain_core.embeddings import Embeddings
+
+from apps.api.config.settings import get_settings
+from mlops.training.feature_pipeline import preprocess_pipeline
+
+ROOT = Path(__file__).resolve().parents[1]
+TRAINING_SAMPLE_PATH = ROOT / 'training_sample.csv'
+
+
+@pytest.fixture(scope='session')
+def training_sample() -> pd.DataFrame:
+    return pd.read_csv(TRAINING_SAMPLE_PATH)
+
+
+def log_production_run(tracking_uri, experiment, training_sample, *, log_model=True):
+    """Train on `training_sample` and log a run tagged `Production`; returns its run_id."""
+
+    mlflow.set_tracking_uri(tracking_uri)
+    mlflow.set_experiment(experiment)
+    with mlflow.start_run() as run:
+        X = training_sample
+        y = (X['Contract'] == 'Month-to-month').astype(int)
+        preprocessor = preprocess_pipeline()
+        X_proc = preprocessor.fit_transform(X)
+        joblib.dump(preprocessor, 'preprocessor.joblib')
+        mlflow.log_artifact('preprocessor.joblib')
+        if log_model:
+            model = lgb.LGBMClassifier(n_estimators=10, min_child_samples=1, verbose=-1)
+            model.fit(X_proc, y)
+            mlflow.lightgbm.log_model(model, 'model')
+        mlflow.set_tag('stage', 'Production')
+    return run.info.run_id
+
+
+@pytest.fixture(scope='session')
+def mlflow_store(tmp_path_factory, training_sample):
+    """Local file store holding one Production run; returns the tracking URI and run id."""
+
+    store = tmp_path_factory.mktemp('mlruns')
+    tracking_uri = f'file:{store}'
+    with pytest.MonkeyPatch.context() as mp:
+        mp.setenv('MLFLOW_ALLOW_FILE_STORE', 'true')
+        mp.chdir(tmp_path_factory.mktemp('train'))
+        run_id = log_production_run(tracking_uri, 'ChurnClassifierTest', training_sample)
+    return {'tracking_uri': tracking_uri, 'run_id': run_id, 'experiment': 'ChurnClassifierTest'}
+
+
+@pytest.fixture
+def app_env(monkeypatch, mlflow_store, tmp_path):
+    """Point `get_settings()` at the local store; the settings cache is reset on teardown."""
+
+    monkeypatch.setenv('MLFLOW_ALLOW_FILE_STORE', 'true')
+    monkeypatch.setenv('MLFLOW_TRACKING_URI', mlflow_store['tracking_uri'])
+    monkeypatch.setenv('MLFLOW_EXPERIMENT_NAME', mlflow_store['experiment'])
+    monkeypatch.delenv('KAFKA_BOOTSTRAP_SERVERS', raising=False)
+    monkeypatch.setenv('MODEL_WATCH_INTERVAL_S', '0')
+    monkeypatch.setenv('MODEL_CACHE_DIR', str(tmp_path / 'model_cache'))
+    monkeypatch.setenv('LLM_WARMUP_ON_STARTUP', 'false')
+    get_settings.cache_clear()
+    yield monkeypatch
+    get_settings.cache_clear()
+
+
+class FakeProducer:
+    """Records produced messages and acks them on `poll`/`flush`, like confluent_kafka."""
+
+    def __init__(self, error=None):
+        self.messages = []
+        self.flushes = 0
+        self.error = error
+        self._pending = []
+
+    def produce(self, topic, key=None, value=None, on_delivery=None, **kwargs):
+        self.messages.append((topic, key, value))
+        if on_delivery:
+            self._pending.append(on_delivery)
+
+    def poll(self, timeout=None):
+        pending, self._pending = self._pending, []
+        for callback in pending:
+            callback(self.error, None)
+        return len(pending)
+
+    def flush(self, timeout=None):
+        self.flushes += 1
+        self.poll()
+        return 0
+
+
+@pytest.fixture
+def model_service(app_env):
+    from apps.api.services.model_service import ModelService
+
+    service = ModelService()
+    service._load_model()
+    return service
+
+
+@pytest.fixture
+def fake_producer():
+    return FakeProducer()
+
+
+class HashingEmbeddings(Embeddings):
+    """Bag-of-words feature hashing: texts sharing words get nearby vectors, with no model download."""
+
+    def __init__(self, size=64):
+        self.size = size
+        self.calls = 0
+        self.texts_embedded = 0
+
+    def _embed(self, text):
+        vector = np.zeros(self.size)
+        for word in re.findall(r'[a-z0-9]+', text.lower()):
+            digest = hashlib.md5(word.encode()).digest()
+            vector[int.from_bytes(digest[:4], 'little') % self.size] += 1.0 if digest[4] % 2 else -1.0
+        norm = np.linalg.norm(vector)
+        return (vector / norm if norm else vector).tolist()
+
+    def embed_documents(self, texts):
+        self.calls += 1
+        self.texts_embedded += len(texts)
+        return [self._embed(text) for text in texts]
+
+    def embed_query(self, text):
+        self.calls += 1
+        self.texts_embedded += 1
+        return self._embed(text)
+
+
+def hashing_embeddings_factory(model_name):
+    """Picklable stand-in for `rag.embeddings.get_embeddings` in spawned workers."""
+
+    return HashingEmbeddings()
+
+
+@pytest.fixture
+def rag_env(monkeypatch, tmp_path):
+    """Offline RAG settings: repo docs, a temp vector store and `HashingEmbeddings`."""
+
+    from apps.api.services import llm_orchestrator
+
+    embeddings = HashingEmbeddings()
+    monkeypatch.setenv('RAG_DOCS_PATH', str(ROOT / 'rag' / 'docs'))
+    monkeypatch.setenv('RAG_VECTORSTORE_PATH', str(tmp_path / 'chroma_db'))
+    monkeypatch.setenv('RAG_EMBEDDING_CACHE_DIR', str(tmp_path / 'embedding_cache'))
+    monkeypatch.setenv('LLM_PROVIDER', 'sherlock')
+    monkeypatch.setenv('LLM_WARMUP_ON_STARTUP', 'false')
+    monkeypatch.setattr('rag.service.get_embeddings', lambda model_name: embeddings)
+    get_settings.cache_clear()
+    llm_orchestrator.get_llm_orchestrator.cache_clear()
+    llm_orchestrator._warmup_status.update(state='pending', error=None, duration_ms=None)
+    yield embeddings
+    llm_orchestrator.get_llm_orchestrator.cache_clear()
+    llm_orchestrator._warmup_status.update(state='pending', error=None, duration_ms=None)
+    get_settings.cache_clear()
@@ -0,0 +1,101 @@
+from fastapi.testclient import TestClient
+
+from apps.api.config.settings import get_settings
+from apps.api.main import app
+from rag.answer_cache import SemanticAnswerCache
+from rag.service import RAGService
+
+QUESTION = 'How do I retrain the classifier?'
+PARAPHRASE = 'how do I retrain the classifier, please'
+
+
+def _enable(monkeypatch, **env):
+    monkeypatch.setenv('RAG_ANSWER_CACHE_MAX_ENTRIES', '16')
+    monkeypatch.setenv('RAG_ANSWER_CACHE_THRESHOLD', '0.9')
+    for name, value in env.items():
+        monkeypatch.setenv(name, value)
+    get_settings.cache_clear()
+
+
+class _CountingLLM:
+    def __init__(self):
+        self.calls = 0
+
+    def __call__(self, context, question):
+        self.calls += 1
+        return f'answer #{self.calls}'
+
+
+def test_paraphrase_with_same_sources_reuses_the_answer(rag_env, monkeypatch):
+    _enable(monkeypatch)
+    service = RAGService()
+    service.ingest_documents([service.docs_path])
+    llm = _CountingLLM()
+
+    first = service.answer(QUESTION, llm_fn=llm)
+    second = service.answer(PARAPHRASE, llm_fn=llm)
+    assert llm.calls == 1
+    assert first['from_cache'] is False
+    assert second['from_cache'] is True and second['answer'] == first['answer']
+    assert 0.9 <= second['cache_similarity'] < 1
+    assert second['sources'] == first['sources']
+
+    # An unrelated question, or the same one answered from different chunks, is generated.
+    service.answer('What does the API expose?', llm_fn=llm)
+    service.answer(QUESTION, llm_fn=llm, top_k=1)
+    service.answer(QUESTION, llm_fn=llm, tier='google-flash')
+    assert llm.calls == 4
+
+    stats = service.cache_stats()['answer']
+    assert stats['hits'] == 1 and stats['misses'] == 4
+    assert stats['time_saved_ms'] >= 0
+
+
+def test_reingest_invalidates_cached_answers(rag_env, tmp_path, monkeypatch):
+    _enable(monkeypatch)
+    service = RAGService()
+    service.ingest_documents([service.docs_path])
+    llm = _CountingLLM()
+    service.answer(QUESTION, llm_fn=llm)
+    invalidations = service.cache_stats()['answer']['invalidations']
+
+    docs = tmp_path / 'docs'
+    docs.mkdir()
+    (docs / 'retraining.md').write_text('# Retraining\n\nRetrain the classifier with mlops/run_all.py.')
+    monkeypatch.setenv('RAG_DOCS_PATH', str(docs))
+    get_settings.cache_clear()
+    RAGService().ingest_documents([docs])
+
+    again = service.answer(QUESTION, llm_fn=llm)
+    assert llm.calls == 2 and again['from_cache'] is False
+    assert service.cache_stats()['answer']['invalidations'] == invalidations + 1
+
+
+def test_predict_llm_reports_cached_answers(rag_env, monkeypatch):
+    _enable(monkeypatch)
+    RAGService().ingest_documents([RAGService().docs_path])
+    client = TestClient(app)
+
+    first = client.post('/predict/llm', json={'query': QUESTION}).json()
+    second = client.post('/predict/llm', json={'query': PARAPHRASE}).json()
+    assert first['from_cache'] is False and first['cache_similarity'] is None
+    assert second['from_cache'] is True and second['answer'] == first['answer']
+    overview = client.get('/metrics/overview').json()
+    assert overview['components']['rag_cache']['answer']['hits'] == 1
+
+
+def test_cache_is_bounded_by_size_and_age(monkeypatch):
+    now = [100.0]
+    monkeypatch.setattr('rag.answer_cache.time.monotonic', lambda: now[0])
+    cache = SemanticAnswerCache(2, threshold=0.99, ttl_s=10)
+    key = {'sources': ['a'], 'generation': 1, 'tier': 'mock-local'}
+
+    for i, vector in enumerate(([1, 0, 0], [0, 1, 0], [0, 0, 1])):
+        cache.put(vector, {'answer': str(i)}, **key)
+    assert len(cache) == 2 and cache.stats()['evictions'] == 1
+    assert cache.lookup([1, 0, 0], **key) is None  # least recently used went first
+    assert cache.lookup([0, 2, 0], **key)[0] == {'answer': '1'}
+
+    now[0] += 11
+    assert cache.lookup([0, 0, 1], **key) is None
+    assert cache.stats()['expirations'] == 1 and len(cache) == 1
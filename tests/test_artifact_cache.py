@@ -0,0 +1,87 @@
+from mlflow.tracking import MlflowClient
+
+from apps.api.services.artifact_cache import ModelArtifactCache
+from apps.api.services.model_service import ModelService
+from tests.conftest import log_production_run
+
+
+def test_fetch_downloads_once_and_rejects_corruption(mlflow_store, tmp_path):
+    client = MlflowClient(tracking_uri=mlflow_store['tracking_uri'])
+    cache = ModelArtifactCache(tmp_path / 'cache', max_bytes=1 << 30)
+    run_id = mlflow_store['run_id']
+
+    path = cache.fetch(client, run_id)
+    assert (path / 'preprocessor.joblib').exists() and (path / 'model').is_dir()
+    assert cache.fetch(client, run_id) == path
+    assert cache.stats()['downloads'] == 1 and cache.stats()['hits'] == 1
+
+    (path / 'preprocessor.joblib').write_bytes(b'tampered')
+    assert cache.get(run_id) is None
+    cache.fetch(client, run_id)
+    assert cache.verify(run_id)
+    assert cache.stats()['corrupt'] == 1 and cache.stats()['downloads'] == 2
+
+
+def test_eviction_keeps_production_run(mlflow_store, training_sample, tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    client = MlflowClient(tracking_uri=mlflow_store['tracking_uri'])
+    other = log_production_run(mlflow_store['tracking_uri'], 'EvictionTest', training_sample)
+    cache = ModelArtifactCache(tmp_path / 'cache', max_bytes=1)
+
+    cache.fetch(client, mlflow_store['run_id'])
+    cache.set_production(mlflow_store['run_id'])
+    cache.fetch(client, other)
+    # Both runs exceed 1 byte, but the Production run and the run just fetched are protected.
+    assert cache.run_dir(mlflow_store['run_id']).exists() and cache.run_dir(other).exists()
+
+    cache.set_production(other)
+    cache.evict()
+    assert not cache.run_dir(mlflow_store['run_id']).exists()
+    assert cache.stats()['evictions'] == 1
+
+
+def test_cache_first_boot_works_without_mlflow(app_env, mlflow_store):
+    ModelService().get_version()  # populates the cache and manifest
+
+    app_env.setenv('MLFLOW_TRACKING_URI', 'http://127.0.0.1:9')
+    app_env.setenv('MODEL_BOOT_MODE', 'cache_first')
+    from apps.api.config.settings import get_settings
+    get_settings.cache_clear()
+
+    service = ModelService()
+    assert service.get_version() == mlflow_store['run_id']
+    assert service.artifact_cache.stats()['downloads'] == 0
+
+
+def test_runs_are_hashed_once_per_process(mlflow_store, tmp_path, monkeypatch):
+    from apps.api.services import artifact_cache
+
+    client = MlflowClient(tracking_uri=mlflow_store['tracking_uri'])
+    cache = ModelArtifactCache(tmp_path / 'cache', max_bytes=1 << 30)
+    run_id = mlflow_store['run_id']
+    cache.fetch(client, run_id)
+
+    hashed = []
+    hash_tree = artifact_cache._hash_tree
+    monkeypatch.setattr(artifact_cache, '_hash_tree', lambda root: hashed.append(root) or hash_tree(root))
+
+    # The download was hashed as it was published, so lookups in this process reuse that.
+    assert cache.get(run_id) is not None and cache.fetch(client, run_id) is not None
+    assert hashed == []
+    # Another process (a fresh cache object) verifies once, then reuses its result.
+    other = ModelArtifactCache(tmp_path / 'cache', max_bytes=1 << 30)
+    assert other.get(run_id) is not None and other.get(run_id) is not None
+    assert len(hashed) == 1
+
+
+def test_process_workers_do_not_rewrite_the_manifest(app_env, mlflow_store):
+    from apps.api.services import model_service
+
+    ModelService().get_version()
+    cache = ModelService(background_workers=False).artifact_cache
+    cache.set_production('pinned-by-serving-process')
+
+    model_service._init_process_worker(mlflow_store['run_id'])
+
+    assert model_service._process_service.get_version() == mlflow_store['run_id']
+    assert cache.production_run_id() == 'pinned-by-serving-process'
@@ -0,0 +1,46 @@
+import numpy as np
+import pandas as pd
+from sklearn.compose import ColumnTransformer
+from sklearn.preprocessing import MinMaxScaler
+
+from apps.api.services.compiled_preprocessor import CompiledPreprocessor
+from mlops.training.feature_pipeline import NUMERICAL_FEATURES, preprocess_pipeline
+
+
+def _fitted(training_sample):
+    return preprocess_pipeline().fit(training_sample)
+
+
+def test_compiled_matches_sklearn_on_training_sample(training_sample):
+    preprocessor = _fitted(training_sample)
+    compiled = CompiledPreprocessor.compile(preprocessor)
+    assert compiled is not None
+
+    expected = preprocessor.transform(training_sample)
+    rows = training_sample.to_dict(orient='records')
+    np.testing.assert_allclose(compiled.transform_rows(rows), expected, rtol=0, atol=1e-12)
+    for row, want in zip(rows, expected, strict=True):
+        np.testing.assert_allclose(compiled.transform_row(row), want, rtol=0, atol=1e-12)
+
+
+def test_compiled_handles_unknown_categories_and_string_numbers(training_sample):
+    preprocessor = _fitted(training_sample)
+    compiled = CompiledPreprocessor.compile(preprocessor)
+    row = training_sample.iloc[0].to_dict()
+    row.update({'Contract': 'Decade', 'PaymentMethod': None, 'tenure': '12'})
+
+    expected = preprocessor.transform(pd.DataFrame([row]).astype({'tenure': float}))
+    np.testing.assert_allclose(compiled.transform_row(row), expected[0], rtol=0, atol=1e-12)
+
+
+def test_unsupported_transformer_falls_back(training_sample):
+    preprocessor = ColumnTransformer([('num', MinMaxScaler(), NUMERICAL_FEATURES)]).fit(training_sample)
+    assert CompiledPreprocessor.compile(preprocessor) is None
+
+
+def test_model_service_uses_compiled_path(model_service, training_sample):
+    assert model_service._active.compiled is not None
+    rows = training_sample.to_dict(orient='records')
+    results = model_service.predict_batch(rows).results
+    expected = model_service.model.predict_proba(model_service.preprocessor.transform(training_sample))[:, 1]
+    assert np.allclose([r['proba'] for r in results], expected)
@@ -0,0 +1,67 @@
+import numpy as np
+
+from rag.embedding_cache import CachedEmbeddings, EmbeddingCache
+from rag.service import RAGService
+from tests.conftest import HashingEmbeddings, hashing_embeddings_factory
+
+
+def test_cache_round_trips_float32_rows(tmp_path):
+    cache = EmbeddingCache(tmp_path, 'sentence-transformers/all-MiniLM-L6-v2')
+    vectors = np.arange(12, dtype=np.float64).reshape(3, 4)
+    cache.put_many(['a', 'b', 'c'], vectors)
+
+    reopened = EmbeddingCache(tmp_path, 'sentence-transformers/all-MiniLM-L6-v2')
+    found = reopened.get_many(['c', 'a', 'missing'])
+    assert set(found) == {'a', 'c'}
+    np.testing.assert_array_equal(found['c'], vectors[2].astype(np.float32))
+    assert EmbeddingCache(tmp_path, 'other-model').get_many(['a']) == {}
+
+
+def test_torn_append_is_discarded(tmp_path):
+    cache = EmbeddingCache(tmp_path, 'm')
+    cache.put_many(['a'], np.ones((1, 4)))
+    with open(cache.path / 'vectors.f32', 'ab') as handle:
+        handle.write(b'\x00\x01\x02')  # crash mid-row, index never updated
+    cache.put_many(['b'], np.full((1, 4), 2.0))
+
+    found = EmbeddingCache(tmp_path, 'm').get_many(['a', 'b'])
+    np.testing.assert_array_equal(found['b'], np.full(4, 2.0, dtype=np.float32))
+
+
+def test_duplicates_and_repeats_are_embedded_once(tmp_path):
+    base = HashingEmbeddings()
+    embeddings = CachedEmbeddings(base, EmbeddingCache(tmp_path, 'm'), batch_size=2)
+    texts = ['alpha beta', 'gamma', 'alpha beta', 'delta epsilon', 'gamma']
+
+    first = embeddings.embed_documents(texts)
+    assert base.texts_embedded == 3
+    assert embeddings.stats == {'hits': 0, 'misses': 3, 'duplicates': 2}
+    np.testing.assert_allclose(first[0], base._embed('alpha beta'), rtol=1e-6)
+
+    again = CachedEmbeddings(base, EmbeddingCache(tmp_path, 'm'), batch_size=2).embed_documents(texts)
+    assert base.texts_embedded == 3
+    np.testing.assert_allclose(again, first)
+
+
+def test_process_pool_encodes_misses(tmp_path):
+    texts = [f'chunk number {i}' for i in range(10)]
+    embeddings = CachedEmbeddings(
+        HashingEmbeddings(), EmbeddingCache(tmp_path, 'm'),
+        batch_size=3, processes=2, factory=hashing_embeddings_factory,
+    )
+    vectors = embeddings.embed_documents(texts)
+    np.testing.assert_allclose(vectors, HashingEmbeddings().embed_documents(texts), rtol=1e-6)
+    assert embeddings.base.texts_embedded == 0
+    assert len(EmbeddingCache(tmp_path, 'm')) == 10
+
+
+def test_rebuild_reads_embeddings_from_cache(rag_env):
+    service = RAGService()
+    first = service.ingest_documents([service.docs_path])
+    assert first.embedded_texts == first.total_chunks
+
+    embedded = rag_env.texts_embedded
+    rebuilt = RAGService().ingest_documents([service.docs_path], full_rebuild=True)
+    assert rebuilt.added_chunks == rebuilt.total_chunks
+    assert rebuilt.embedding_cache_hits == rebuilt.total_chunks and rebuilt.embedded_texts == 0
+    assert rag_env.texts_embedded == embedded
@@ -0,0 +1,90 @@
+import threading
+import time
+
+import pytest
+
+from apps.api.services.event_publisher import PredictionEventPublisher
+
+
+def _events(n):
+    return [{'event_id': str(i)} for i in range(n)]
+
+
+@pytest.fixture
+def stalled_producer(fake_producer):
+    """`fake_producer` whose `produce` waits until `release` is set."""
+
+    fake_producer.release = threading.Event()
+    produce = fake_producer.produce
+
+    def _stalled(*args, **kwargs):
+        fake_producer.release.wait(5)
+        produce(*args, **kwargs)
+
+    fake_producer.produce = _stalled
+    return fake_producer
+
+
+def test_close_flushes_queued_events_and_counts_deliveries(fake_producer):
+    publisher = PredictionEventPublisher(fake_producer, 'predictions', poll_interval_ms=5)
+    publisher.publish(_events(50))
+    publisher.close(timeout=5)
+
+    stats = publisher.stats()
+    assert stats['queued'] == 0
+    assert stats['enqueued'] == stats['delivered'] == 50
+    assert fake_producer.flushes == 1
+    assert [key for _, key, _ in fake_producer.messages] == [str(i) for i in range(50)]
+
+
+def test_delivery_errors_are_counted_as_failed(fake_producer):
+    fake_producer.error = 'broker down'
+    publisher = PredictionEventPublisher(fake_producer, 'predictions')
+    publisher.publish(_events(3))
+    publisher.close(timeout=5)
+    assert publisher.stats()['failed'] == 3
+
+
+def test_drop_oldest_policy_bounds_the_queue(stalled_producer):
+    publisher = PredictionEventPublisher(stalled_producer, 'predictions', max_queue_size=5)
+    publisher.publish(_events(1))  # worker picks this up and stalls
+    publisher.publish(_events(20))
+    assert publisher.stats()['queued'] <= 5
+    assert publisher.stats()['dropped'] >= 15
+    stalled_producer.release.set()
+    publisher.close(timeout=5)
+    assert stalled_producer.messages[-1][1] == '19'
+
+
+def test_block_policy_drops_new_events_after_timeout(stalled_producer):
+    publisher = PredictionEventPublisher(
+        stalled_producer, 'predictions', max_queue_size=2, overflow_policy='block', block_timeout_ms=10
+    )
+    publisher.publish(_events(1))
+    publisher.publish(_events(10))
+    assert publisher.stats()['dropped'] >= 7
+    stalled_producer.release.set()
+    publisher.close(timeout=5)
+    assert stalled_producer.messages[-1][1] != '9'
+
+
+def test_block_policy_waits_once_per_batch(stalled_producer):
+    publisher = PredictionEventPublisher(
+        stalled_producer, 'predictions', max_queue_size=2, overflow_policy='block', block_timeout_ms=50
+    )
+    publisher.publish(_events(1))  # worker picks this up and stalls
+    publisher.publish(_events(2))  # fills the queue
+    while publisher.stats()['queued'] < 2:
+        time.sleep(0.001)
+
+    start = time.monotonic()
+    publisher.publish(_events(20))
+    elapsed = time.monotonic() - start
+
+    # 20 x 50 ms if every event waited on its own; one shared 50 ms budget otherwise.
+    assert elapsed < 0.5
+    stats = publisher.stats()
+    assert stats['enqueued'] == 3
+    assert stats['dropped'] == 20
+    stalled_producer.release.set()
+    publisher.close(timeout=5)
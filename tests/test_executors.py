@@ -0,0 +1,60 @@
+import asyncio
+import threading
+
+import numpy as np
+import pytest
+
+from apps.api.config.settings import get_settings
+from apps.api.services.executors import ExecutorPools, get_executor_pools
+
+
+def test_pool_stats_track_queue_depth_and_wait():
+    pools = ExecutorPools(get_settings().model_copy(update={'classifier_pool_workers': 1}))
+    gate = threading.Event()
+    first = pools.classifier.submit(gate.wait, 5)
+    second = pools.classifier.submit(lambda: 'done')
+    stats = pools.classifier.stats()
+    assert stats['in_flight'] == 2
+    assert stats['queued'] == 1
+    gate.set()
+    assert first.result(5) is True
+    assert second.result(5) == 'done'
+    stats = pools.stats()['classifier']
+    assert stats['completed'] == 2 and stats['in_flight'] == 0
+    assert stats['max_wait_ms'] > 0
+    pools.shutdown()
+
+
+def test_run_awaits_without_blocking_event_loop():
+    pools = ExecutorPools()
+
+    async def main():
+        gate = threading.Event()
+        slow = asyncio.ensure_future(pools.llm.run(gate.wait, 5))
+        fast = await pools.classifier.run(sum, [1, 2, 3])
+        gate.set()
+        return fast, await slow
+
+    assert asyncio.run(main()) == (6, True)
+    with pytest.raises(ZeroDivisionError):
+        pools.classifier.submit(lambda: 1 / 0).result(5)
+    assert pools.classifier.stats()['failed'] == 1
+    pools.shutdown()
+
+
+def test_large_batches_use_process_pool(app_env, training_sample):
+    app_env.setenv('CLASSIFIER_PROCESS_WORKERS', '1')
+    app_env.setenv('CLASSIFIER_PROCESS_MIN_BATCH', '10')
+    get_executor_pools.cache_clear()
+    from apps.api.services.model_service import ModelService
+
+    service = ModelService()
+    rows = training_sample.to_dict(orient='records')
+    try:
+        results = service.predict_batch(rows).results
+        assert get_executor_pools().stats()['classifier_process']['completed'] == 1
+    finally:
+        get_executor_pools().shutdown()
+        get_executor_pools.cache_clear()
+    expected = service.model.predict_proba(service.preprocessor.transform(training_sample))[:, 1]
+    assert np.allclose([r['proba'] for r in results], expected)
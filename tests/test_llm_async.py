@@ -0,0 +1,68 @@
+import asyncio
+
+import pytest
+from fastapi.testclient import TestClient
+
+from apps.api.config.settings import get_settings
+from apps.api.main import app
+from apps.api.services import llm_orchestrator
+from rag.service import RAGService
+
+
+def _fresh_orchestrator(monkeypatch, **env):
+    for name, value in env.items():
+        monkeypatch.setenv(name, value)
+    get_settings.cache_clear()
+    llm_orchestrator.get_llm_orchestrator.cache_clear()
+    return llm_orchestrator.get_llm_orchestrator()
+
+
+def test_identical_concurrent_queries_share_one_generation(rag_env, monkeypatch):
+    RAGService().ingest_documents([RAGService().docs_path])
+    orchestrator = _fresh_orchestrator(monkeypatch, SHERLOCK_DELAY_MS='200')
+
+    async def burst():
+        same = [orchestrator.aquery('How is the classifier retrained?') for _ in range(8)]
+        # Case and whitespace differences normalise to the same key.
+        same.append(orchestrator.aquery('  how is the CLASSIFIER retrained? '))
+        other = orchestrator.aquery('What does the API expose?')
+        return await asyncio.gather(*same, other)
+
+    results = asyncio.run(burst())
+
+    stats = orchestrator.async_stats()['singleflight']
+    assert stats['calls'] == 10
+    assert stats['executions'] == 2
+    assert stats['coalesced'] == 8
+    assert stats['in_flight'] == 0
+    assert len({r['answer'] for r in results[:9]}) == 1
+    assert results[0] is not results[1]  # callers get their own copy
+    assert results[-1]['answer'] != results[0]['answer']
+    assert all(r['model_provider'] == 'sherlock' for r in results)
+
+
+def test_concurrency_limit_queues_distinct_queries(rag_env, monkeypatch):
+    RAGService().ingest_documents([RAGService().docs_path])
+    orchestrator = _fresh_orchestrator(monkeypatch, SHERLOCK_DELAY_MS='100', LLM_MAX_CONCURRENCY='2')
+
+    async def burst():
+        loop = asyncio.get_running_loop()
+        start = loop.time()
+        await asyncio.gather(*(orchestrator.aquery(f'question number {i}') for i in range(4)))
+        return loop.time() - start
+
+    elapsed = asyncio.run(burst())
+    # Four distinct 100 ms generations through two slots take at least two rounds.
+    assert elapsed >= 0.2
+    assert orchestrator.async_stats()['singleflight']['executions'] == 4
+
+
+def test_provider_timeout_returns_504(rag_env, monkeypatch):
+    RAGService().ingest_documents([RAGService().docs_path])
+    orchestrator = _fresh_orchestrator(monkeypatch, SHERLOCK_DELAY_MS='500', LLM_TIMEOUT_S='0.05')
+
+    with pytest.raises(asyncio.TimeoutError):
+        asyncio.run(orchestrator.aquery('How is the classifier retrained?'))
+
+    resp = TestClient(app).post('/predict/llm', json={'query': 'How is the classifier retrained?'})
+    assert resp.status_code == 504
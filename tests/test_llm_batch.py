@@ -0,0 +1,82 @@
+import asyncio
+
+from fastapi.testclient import TestClient
+
+from apps.api.config.settings import get_settings
+from apps.api.main import app
+from apps.api.services import llm_orchestrator
+from rag.service import RAGService
+
+QUERIES = [
+    'How is the classifier retrained?',
+    'What does the API expose?',
+    'Which services does the architecture include?',
+]
+
+
+def test_batch_embeds_all_queries_in_one_call(rag_env):
+    RAGService().ingest_documents([RAGService().docs_path])
+    service = RAGService()
+    calls = rag_env.calls
+
+    batched = service.search_many(QUERIES, top_k=3, mode='vector')
+
+    assert rag_env.calls == calls + 1
+    assert rag_env.texts_embedded >= len(QUERIES)
+    single = RAGService()
+    for query, retrieval in zip(QUERIES, batched, strict=True):
+        expected = single.search(query, top_k=3, mode='vector')
+        assert [doc.page_content for doc in retrieval.documents] == [doc.page_content for doc in expected.documents]
+        assert retrieval.path == 'vector'
+
+
+def test_numpy_multi_query_matches_single_query(rag_env, monkeypatch):
+    monkeypatch.setenv('RAG_VECTOR_BACKEND', 'numpy')
+    get_settings.cache_clear()
+    RAGService().ingest_documents([RAGService().docs_path])
+    service = RAGService()
+
+    for mode in ('vector', 'hybrid'):
+        batched = service.search_many(QUERIES, top_k=4, mode=mode)
+        for query, retrieval in zip(QUERIES, batched, strict=True):
+            expected = RAGService().search(query, top_k=4, mode=mode)
+            assert [doc.id for doc in retrieval.documents] == [doc.id for doc in expected.documents]
+
+
+def test_batch_endpoint_matches_single_queries(rag_env):
+    RAGService().ingest_documents([RAGService().docs_path])
+    client = TestClient(app)
+
+    resp = client.post('/predict/llm/batch', json={'queries': QUERIES, 'retrieval_mode': 'hybrid'})
+
+    assert resp.status_code == 200
+    body = resp.json()
+    assert body['succeeded'] == len(QUERIES) and body['failed'] == 0
+    assert body['model_provider'] == 'sherlock' and body['collection'] == 'default'
+    assert [item['index'] for item in body['results']] == [0, 1, 2]
+    for query, item in zip(QUERIES, body['results'], strict=True):
+        single = client.post('/predict/llm', json={'query': query, 'retrieval_mode': 'hybrid'}).json()
+        assert item['answer'] == single['answer']
+        assert item['sources'] == single['sources']
+        assert item['error'] is None
+
+    assert client.post('/predict/llm/batch', json={'queries': []}).status_code == 422
+    assert client.post('/predict/llm/batch', json={'queries': QUERIES, 'collection': 'nope'}).status_code == 404
+
+
+def test_batch_reports_per_query_errors(rag_env, monkeypatch):
+    # No ingest: vector search has no store, so every query fails, but the batch itself succeeds.
+    resp = TestClient(app).post('/predict/llm/batch', json={'queries': QUERIES[:2], 'retrieval_mode': 'vector'})
+
+    assert resp.status_code == 200
+    body = resp.json()
+    assert body['succeeded'] == 0 and body['failed'] == 2
+    assert all(item['error'] and item['answer'] is None for item in body['results'])
+
+    RAGService().ingest_documents([RAGService().docs_path])
+    monkeypatch.setenv('SHERLOCK_DELAY_MS', '500')
+    monkeypatch.setenv('LLM_TIMEOUT_S', '0.05')
+    get_settings.cache_clear()
+    llm_orchestrator.get_llm_orchestrator.cache_clear()
+    results = asyncio.run(llm_orchestrator.get_llm_orchestrator().abatch(QUERIES[:2]))
+    assert all(isinstance(result, asyncio.TimeoutError) for result in results)
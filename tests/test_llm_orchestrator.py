@@ -0,0 +1,52 @@
+from fastapi.testclient import TestClient
+
+from apps.api.main import app
+from apps.api.services import llm_orchestrator
+from rag.service import RAGService
+
+
+def test_orchestrator_is_a_process_wide_singleton(rag_env):
+    RAGService().ingest_documents([RAGService().docs_path])
+
+    first = llm_orchestrator.get_llm_orchestrator()
+    assert llm_orchestrator.get_llm_orchestrator() is first
+    assert first.rag_service.embeddings is rag_env
+
+    first.query('How is the classifier retrained?')
+    store = first.rag_service._vectorstore
+    first.query('What does the API expose?')
+    assert first.rag_service._vectorstore is store
+
+
+def test_ready_waits_for_llm_warmup(rag_env):
+    RAGService().ingest_documents([RAGService().docs_path])
+    client = TestClient(app)
+
+    llm_orchestrator._warmup_status['state'] = 'warming'
+    resp = client.get('/ready')
+    assert resp.status_code == 503
+    assert resp.json()['checks']['llm']['state'] == 'warming'
+
+    llm_orchestrator._warmup_status['state'] = 'pending'
+    calls_before = rag_env.calls
+    llm_orchestrator.warmup_llm_orchestrator()
+    assert rag_env.calls > calls_before
+    assert llm_orchestrator.get_llm_orchestrator().rag_service._vectorstore is not None
+
+    resp = client.get('/ready')
+    assert resp.status_code == 200
+    assert resp.json()['ready'] is True
+    assert resp.json()['checks']['llm']['duration_ms'] is not None
+
+
+def test_failed_warmup_is_not_ready(rag_env, monkeypatch):
+    def _broken(model_name):
+        raise OSError('model download failed')
+
+    monkeypatch.setattr('rag.service.get_embeddings', _broken)
+    llm_orchestrator.warmup_llm_orchestrator()
+
+    status = llm_orchestrator.llm_warmup_status()
+    assert status['state'] == 'failed'
+    assert 'model download failed' in status['error']
+    assert TestClient(app).get('/ready').status_code == 503
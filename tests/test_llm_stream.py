@@ -0,0 +1,130 @@
+import asyncio
+import json
+import threading
+
+from fastapi.testclient import TestClient
+from langchain_core.messages import AIMessageChunk
+
+from apps.api.main import app
+from apps.api.routers.llm import predict_llm_stream
+from apps.api.schemas import LLMRequest
+from apps.api.services.llm_orchestrator import get_llm_orchestrator
+from rag.service import RAGService
+
+
+def _events(body):
+    events = []
+    for block in body.strip().split('\n\n'):
+        lines = dict(line.split(': ', 1) for line in block.split('\n'))
+        events.append((lines['event'], json.loads(lines['data'])))
+    return events
+
+
+def test_stream_sends_sources_tokens_then_summary(rag_env):
+    RAGService().ingest_documents([RAGService().docs_path])
+    client = TestClient(app)
+    query = 'How is the classifier retrained?'
+
+    with client.stream('POST', '/predict/llm/stream', json={'query': query}) as resp:
+        assert resp.status_code == 200
+        assert resp.headers['content-type'].startswith('text/event-stream')
+        events = _events(resp.read().decode())
+
+    names = [name for name, _ in events]
+    assert names[0] == 'sources' and names[-1] == 'done'
+    assert names.count('token') > 5 and set(names[1:-1]) == {'token'}
+
+    sources = events[0][1]
+    assert sources['sources'] and sources['model_provider'] == 'sherlock'
+    done = events[-1][1]
+    assert 0 <= done['time_to_first_token_ms'] <= done['latency_ms']
+    assert done['context_tokens_estimate'] > 0
+
+    streamed = ''.join(data['text'] for name, data in events if name == 'token')
+    full = client.post('/predict/llm', json={'query': query}).json()
+    assert streamed == full['answer']
+
+
+def test_stream_reports_errors_in_band(rag_env):
+    # No vector store has been ingested.
+    with TestClient(app).stream('POST', '/predict/llm/stream', json={'query': 'anything', 'retrieval_mode': 'vector'}) as resp:
+        events = _events(resp.read().decode())
+    assert events[-1][0] == 'error'
+    assert 'No vector store' in events[-1][1]['detail']
+
+
+class _FakeChatModel:
+    def stream(self, prompt):
+        assert 'Question: What is ASFOTEC?' in prompt
+        yield AIMessageChunk(content='Hel')
+        yield AIMessageChunk(content='')
+        yield AIMessageChunk(content='lo.')
+
+
+def test_provider_chunks_are_forwarded_as_tokens(rag_env):
+    RAGService().ingest_documents([RAGService().docs_path])
+    orchestrator = get_llm_orchestrator()
+    orchestrator._model = _FakeChatModel()
+
+    events = list(orchestrator.query_stream('What is ASFOTEC?'))
+    assert [data['text'] for name, data in events if name == 'token'] == ['Hel', 'lo.']
+    assert events[-1][0] == 'done'
+
+
+class _EndlessChatModel:
+    def __init__(self):
+        self.closed = threading.Event()
+
+    def stream(self, prompt):
+        try:
+            while True:
+                yield AIMessageChunk(content='more ')
+        finally:
+            self.closed.set()
+
+
+def test_disconnect_closes_the_provider_stream_and_frees_the_slot(rag_env):
+    RAGService().ingest_documents([RAGService().docs_path])
+    orchestrator = get_llm_orchestrator()
+    model = orchestrator._model = _EndlessChatModel()
+
+    async def disconnect_mid_stream():
+        resp = await predict_llm_stream(LLMRequest(query='What is ASFOTEC?'), orchestrator)
+        body = resp.body_iterator
+        assert (await body.__anext__()).startswith('event: sources')
+        assert (await body.__anext__()).startswith('event: token')
+        in_use = orchestrator.settings.llm_max_concurrency - orchestrator._limiter()._value
+        await body.aclose()  # what the server does when the client goes away
+        await asyncio.sleep(0.05)  # a step still running on the pool closes the stream when it returns
+        return in_use, orchestrator.settings.llm_max_concurrency - orchestrator._limiter()._value
+
+    in_use, after = asyncio.run(disconnect_mid_stream())
+
+    assert in_use == 1 and after == 0
+    assert model.closed.wait(5)
+
+
+class _StalledChatModel:
+    def __init__(self):
+        self.release = threading.Event()
+
+    def stream(self, prompt):
+        yield AIMessageChunk(content='Hel')
+        self.release.wait(5)
+        yield AIMessageChunk(content='lo.')
+
+
+def test_stalled_provider_times_out_in_band(rag_env, monkeypatch):
+    RAGService().ingest_documents([RAGService().docs_path])
+    orchestrator = get_llm_orchestrator()
+    model = orchestrator._model = _StalledChatModel()
+    monkeypatch.setattr(orchestrator.settings, 'llm_timeout_s', 0.2)
+
+    try:
+        with TestClient(app).stream('POST', '/predict/llm/stream', json={'query': 'What is ASFOTEC?'}) as resp:
+            events = _events(resp.read().decode())
+    finally:
+        model.release.set()
+
+    assert [name for name, _ in events] == ['sources', 'token', 'error']
+    assert events[-1][1]['detail'] == 'LLM provider timed out'
@@ -0,0 +1,75 @@
+import random
+import threading
+
+import numpy as np
+
+from apps.api.services.histogram import N_BUCKETS, HistogramCounts, WindowedHistogram, bucket_bounds, bucket_index
+from apps.api.services.metrics_collector import MetricsCollector, parse_windows
+
+
+def test_buckets_are_contiguous_and_tight():
+    previous_high = 0
+    for index in range(N_BUCKETS):
+        low, high = bucket_bounds(index)
+        assert low == previous_high
+        assert bucket_index(low) == index and bucket_index(high - 1) == index
+        assert high - low <= max(1, low / 64)
+        previous_high = high
+
+
+def test_percentiles_track_exact_values():
+    rng = random.Random(7)
+    samples = [rng.lognormvariate(3, 1) for _ in range(50_000)]
+    counts = HistogramCounts()
+    for value in samples:
+        counts.add(value)
+
+    summary = counts.summary()
+    for name, q in (('p50', 0.5), ('p90', 0.9), ('p99', 0.99), ('p999', 0.999)):
+        exact = float(np.quantile(samples, q))
+        assert abs(summary[f'{name}_latency_ms'] - exact) / exact < 0.02
+    assert summary['count'] == len(samples)
+    assert summary['max_latency_ms'] == round(max(samples), 2)
+    assert summary['avg_latency_ms'] == round(sum(samples) / len(samples), 2)
+
+
+def test_windows_forget_old_slices():
+    now = [1000.0]
+    histogram = WindowedHistogram((60, 300), slice_s=10, clock=lambda: now[0])
+    for _ in range(10):
+        histogram.record(500.0, success=False)
+    now[0] += 120
+    for _ in range(30):
+        histogram.record(5.0)
+
+    snapshot = histogram.snapshot()
+    assert snapshot['count'] == 40 and snapshot['errors'] == 10
+    assert snapshot['windows']['60s']['count'] == 30
+    assert snapshot['windows']['60s']['errors'] == 0
+    assert snapshot['windows']['60s']['p99_latency_ms'] < 6
+    assert snapshot['windows']['300s']['count'] == 40
+    assert snapshot['windows']['300s']['p99_latency_ms'] > 490
+
+    now[0] += 3600
+    assert histogram.snapshot()['windows']['300s']['count'] == 0
+    assert histogram.snapshot()['count'] == 40
+
+
+def test_concurrent_records_are_all_counted():
+    collector = MetricsCollector(parse_windows('60, 300,'), stripes=4)
+
+    def work(offset):
+        for i in range(2000):
+            collector.record('classifier', float(offset + i % 50), success=i % 100 != 0)
+
+    threads = [threading.Thread(target=work, args=(n,)) for n in range(8)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    stats = collector.snapshot()['classifier']
+    assert stats['count'] == 16_000
+    assert stats['errors'] == 160
+    assert stats['windows']['60s']['count'] == 16_000
+    assert set(stats) >= {'avg_latency_ms', 'p50_latency_ms', 'p95_latency_ms', 'p999_latency_ms'}
@@ -0,0 +1,127 @@
+import json
+
+import numpy as np
+import pytest
+from fastapi.testclient import TestClient
+
+from apps.api.main import app
+from apps.api.services.event_publisher import PredictionEventPublisher
+from apps.api.services.model_service import get_model_service
+
+
+def _rows(training_sample, n=None):
+    return training_sample.head(n).to_dict(orient='records')
+
+
+def test_predict_matches_sklearn_path(model_service, training_sample):
+    features = _rows(training_sample, 1)[0]
+    prediction, proba, latency_ms, event_id, cached, version = model_service.predict(features)
+
+    X_proc = model_service.preprocessor.transform(training_sample.head(1))
+    assert prediction == int(model_service.model.predict(X_proc)[0])
+    assert np.isclose(proba, model_service.model.predict_proba(X_proc)[0][1])
+    assert latency_ms >= 0
+    assert event_id is None
+    assert cached is False
+    assert version == model_service.version
+
+
+def test_predict_batch_scores_in_order_with_row_errors(model_service, training_sample, fake_producer):
+    model_service.publisher = PredictionEventPublisher(fake_producer, 'predictions')
+    rows = _rows(training_sample, 5)
+    rows.insert(2, {'tenure': 3})
+
+    results = model_service.predict_batch(rows).results
+
+    assert [r['index'] for r in results] == list(range(6))
+    assert 'Missing required features' in results[2]['error']
+    expected = model_service.model.predict_proba(
+        model_service.preprocessor.transform(training_sample.head(5))
+    )[:, 1]
+    got = [r['proba'] for i, r in enumerate(results) if i != 2]
+    assert np.allclose(got, expected)
+    model_service.publisher.close(timeout=5)
+    assert len(fake_producer.messages) == 5
+    assert model_service.publisher.stats()['delivered'] == 5
+    assert all(r.get('event_id') for i, r in enumerate(results) if i != 2)
+    assert json.loads(fake_producer.messages[0][2])['model_version'] == model_service.version
+
+
+def test_classifier_endpoints(model_service, training_sample):
+    app.dependency_overrides[get_model_service] = lambda: model_service
+    try:
+        client = TestClient(app)
+        single = client.post('/predict/classifier', json={'features': _rows(training_sample, 1)[0]})
+        rows = _rows(training_sample, 3) + [{}]
+        resp = client.post('/predict/classifier/batch', json={'items': rows})
+    finally:
+        app.dependency_overrides.clear()
+    assert single.status_code == 200
+    assert single.json()['model_version'] == model_service.version
+    assert resp.status_code == 200
+    body = resp.json()
+    assert body['succeeded'] == 3
+    assert body['failed'] == 1
+    assert body['model_version'] == model_service.version
+    assert body['results'][3]['error']
+
+
+def test_micro_batcher_coalesces_queued_calls():
+    import threading
+
+    from apps.api.services.micro_batcher import MicroBatcher
+
+    release = threading.Event()
+    sizes = []
+
+    def batch_fn(items):
+        release.wait(5)
+        sizes.append(len(items))
+        return [ValueError('odd') if item % 2 else item * 10 for item in items]
+
+    batcher = MicroBatcher(batch_fn, max_batch_size=64, max_wait_ms=1)
+    futures = [batcher.submit(i) for i in range(10)]
+    release.set()
+    assert [f.result(5) for f in futures if not f.exception(5)] == [0, 20, 40, 60, 80]
+    assert all(isinstance(futures[i].exception(), ValueError) for i in range(1, 10, 2))
+    assert sum(sizes) == 10 and len(sizes) <= 2
+    batcher.close(timeout=5)
+
+
+def test_single_predictions_share_batches(model_service, training_sample):
+    from concurrent.futures import ThreadPoolExecutor
+
+    from apps.api.services.metrics_collector import metrics_collector
+
+    rows = _rows(training_sample)
+    with ThreadPoolExecutor(max_workers=8) as pool:
+        outputs = list(pool.map(model_service.predict, rows))
+    expected = model_service.model.predict_proba(model_service.preprocessor.transform(training_sample))[:, 1]
+    assert np.allclose([output.proba for output in outputs], expected)
+    assert metrics_collector.snapshot()['components']['classifier_batching']['rows'] >= len(rows)
+
+    with pytest.raises(ValueError, match='Missing required features'):
+        model_service.predict({'tenure': 1})
+
+
+def test_prediction_cache_hits_and_version_invalidation(app_env, training_sample):
+    from apps.api.services.model_service import ModelService
+
+    app_env.setenv('PREDICTION_CACHE_MAX_ENTRIES', '100')
+    service = ModelService()
+    rows = _rows(training_sample, 4)
+
+    first = service.predict(rows[0])
+    again = service.predict(dict(rows[0]))
+    assert first.cached is False and again.cached is True
+    assert again[:2] == first[:2]
+
+    results = service.predict_batch(rows).results
+    # The first two sample rows are identical, so both are served from the cache.
+    assert [r['cached'] for r in results] == [True, True, False, False]
+    stats = service.cache.stats()
+    assert stats['hits'] >= 2 and stats['size'] >= 1
+
+    service._load_run(service.version)
+    assert len(service.cache) == 0
+    assert service.predict(rows[0]).cached is False
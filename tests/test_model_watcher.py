@@ -0,0 +1,35 @@
+import numpy as np
+
+from apps.api.services.model_service import ModelService
+from apps.api.services.model_watcher import ModelWatcher
+from tests.conftest import log_production_run
+
+
+def test_hot_swap_activates_newer_production_run(app_env, mlflow_store, training_sample, tmp_path):
+    app_env.setenv('MLFLOW_EXPERIMENT_NAME', 'WatcherTest')
+    app_env.chdir(tmp_path)
+    first = log_production_run(mlflow_store['tracking_uri'], 'WatcherTest', training_sample)
+    service = ModelService()
+    assert service.get_version() == first
+    old_bundle = service._active
+    watcher = ModelWatcher(service.refresh, interval_s=3600)
+
+    assert watcher.check_now() is False
+
+    broken = log_production_run(mlflow_store['tracking_uri'], 'WatcherTest', training_sample, log_model=False)
+    assert broken != first
+    assert watcher.check_now() is False
+    assert service.version == first
+    assert watcher.stats()['failures'] == 1
+
+    second = log_production_run(mlflow_store['tracking_uri'], 'WatcherTest', training_sample)
+    assert watcher.check_now() is True
+    assert service.version == second
+    assert watcher.stats()['swaps'] == 1
+
+    # A request that captured the old bundle still scores on it after the swap.
+    row = training_sample.head(1).to_dict(orient='records')
+    _, probas = service._score(old_bundle, row)
+    assert old_bundle.version == first
+    assert np.isfinite(probas).all()
+    assert service.predict(row[0]).model_version == second
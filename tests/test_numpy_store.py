@@ -0,0 +1,137 @@
+import numpy as np
+import pytest
+
+from rag.numpy_store import KEEP_MANIFESTS, NumpyVectorStore
+from rag.service import RAGService
+from tests.conftest import HashingEmbeddings
+
+QUERIES = [
+    'How do I retrain the classifier?',
+    'restart worker 3',
+    'Which services does the architecture include?',
+    'step 5 checks service',
+    'kafka prediction events',
+    'MLflow model registry',
+]
+
+
+@pytest.fixture
+def corpus(rag_env, tmp_path, monkeypatch):
+    from apps.api.config.settings import get_settings
+
+    docs = tmp_path / 'docs'
+    docs.mkdir()
+    for path in RAGService().docs_path.glob('*.md'):
+        (docs / path.name).write_text(path.read_text())
+    topics = ['kafka', 'mlflow', 'postgres', 'minio', 'chroma', 'fastapi', 'lightgbm', 'docker']
+    for i, topic in enumerate(topics):
+        body = '\n\n'.join(f'Step {j} checks service {j} and restarts worker {j} for {topic}.' for j in range(i, i + 6))
+        (docs / f'{topic}.md').write_text(f'# {topic} runbook\n\n{body}')
+    monkeypatch.setenv('RAG_DOCS_PATH', str(docs))
+    get_settings.cache_clear()
+    return docs
+
+
+def _build(monkeypatch, tmp_path, corpus, backend, dtype='float32'):
+    from apps.api.config.settings import get_settings
+
+    monkeypatch.setenv('RAG_VECTOR_BACKEND', backend)
+    monkeypatch.setenv('RAG_NUMPY_DTYPE', dtype)
+    monkeypatch.setenv('RAG_VECTORSTORE_PATH', str(tmp_path / f'{backend}-{dtype}'))
+    get_settings.cache_clear()
+    service = RAGService()
+    service.ingest_documents([corpus])
+    return service
+
+
+def _chroma_distances(service, embedding):
+    store = service._ensure_vectorstore()
+    return store.similarity_search_by_vector_with_relevance_scores(embedding, k=len(store.get(include=[])['ids']))
+
+
+@pytest.mark.parametrize('dtype, min_recall', [('float32', 1.0), ('float16', 0.95), ('int8', 0.85)])
+def test_recall_matches_chroma(corpus, monkeypatch, tmp_path, dtype, min_recall):
+    chroma = _build(monkeypatch, tmp_path, corpus, 'chroma')
+    numpy_service = _build(monkeypatch, tmp_path, corpus, 'numpy', dtype)
+    assert isinstance(numpy_service._ensure_vectorstore(), NumpyVectorStore)
+
+    hits = total = 0
+    for query in QUERIES:
+        embedding = chroma.embed_query(query)
+        expected = chroma._ensure_vectorstore().similarity_search_by_vector_with_relevance_scores(embedding, k=5)
+        got = numpy_service._ensure_vectorstore().similarity_search_by_vector_with_score(embedding, k=5)
+        # Equidistant chunks may be ordered differently; anything within the k-th distance counts.
+        cutoff = expected[-1][1] + 1e-4
+        exact = {doc.id: distance for doc, distance in _chroma_distances(chroma, embedding)}
+        hits += sum(exact[doc.id] <= cutoff for doc, _ in got)
+        total += len(expected)
+    assert hits / total >= min_recall
+
+
+def test_upsert_delete_and_reload(tmp_path):
+    embeddings = HashingEmbeddings()
+    store = NumpyVectorStore(tmp_path, embeddings)
+    store.add_texts(['alpha beta', 'gamma delta', 'epsilon'], [{'n': 1}, {'n': 2}, {'n': 3}], ids=['a', 'b', 'c'])
+    store.add_texts(['gamma delta zeta'], [{'n': 4}], ids=['b'])
+    assert store.delete(ids=['c'])
+
+    reopened = NumpyVectorStore(tmp_path, embeddings)
+    assert sorted(reopened.get(include=[])['ids']) == ['a', 'b']
+    top, distance = reopened.similarity_search_with_score('gamma delta zeta', k=1)[0]
+    assert (top.id, top.page_content, top.metadata) == ('b', 'gamma delta zeta', {'n': 4})
+    assert distance == pytest.approx(0.0, abs=1e-5)
+    assert all(isinstance(segment.vectors, np.memmap) for segment in reopened._segments)
+
+    assert reopened.delete(ids=['a', 'b'])
+    assert NumpyVectorStore(tmp_path, embeddings).similarity_search('gamma', k=3) == []
+
+
+def _segment_names(path):
+    return {directory.name for directory in path.glob('segment-*')}
+
+
+@pytest.mark.parametrize('dtype', ['float32', 'int8'])
+def test_writes_append_segments_and_tombstone_deletes(tmp_path, dtype):
+    embeddings = HashingEmbeddings()
+    store = NumpyVectorStore(tmp_path, embeddings, dtype=dtype)
+    store.add_texts([f'chunk {i} about topic {i % 7}' for i in range(40)], ids=[f'c{i}' for i in range(40)])
+    (base,) = store._segments
+
+    store.add_texts(['chunk 3 rewritten'], ids=['c3'])
+    assert [segment.name for segment in store._segments][0] == base.name
+    assert len(store._segments[-1]) == 1
+    assert store.delete(ids=['c5', 'c6'])
+    assert store._segments[0] is base and len(store) == 38
+
+    reopened = NumpyVectorStore(tmp_path, embeddings, dtype=dtype)
+    assert sorted(reopened.get(include=[])['ids']) == sorted(store.get(include=[])['ids'])
+    top, _ = reopened.similarity_search_with_score('chunk 3 rewritten', k=1)[0]
+    assert (top.id, top.page_content) == ('c3', 'chunk 3 rewritten')
+    assert {doc.id for doc in reopened.similarity_search('chunk 5 about topic 5', k=40)}.isdisjoint({'c5', 'c6'})
+
+    for i in range(64):
+        store.add_texts([f'extra {i}'], ids=[f'e{i}'])
+    # Small appends are merged log-structured style, so the segment count stays logarithmic.
+    assert len(store._segments) <= 8 and len(store) == 38 + 64
+    np.testing.assert_allclose(
+        store.get(ids=['e7'], include=['embeddings'])['embeddings'][0], embeddings.embed_query('extra 7'), atol=0.02
+    )
+
+
+def test_old_generations_stay_readable_until_collected(tmp_path):
+    embeddings = HashingEmbeddings()
+    store = NumpyVectorStore(tmp_path, embeddings)
+    store.add_texts(['alpha', 'beta'], ids=['a', 'b'])
+    reader = NumpyVectorStore(tmp_path, embeddings)
+    opened_by_reader = _segment_names(tmp_path)
+
+    store.add_texts(['alpha beta gamma'] * 4, ids=['c', 'd', 'e', 'f'])  # merges the first segment away
+    assert opened_by_reader <= _segment_names(tmp_path)
+
+    for i in range(KEEP_MANIFESTS):
+        store.delete(ids=[['a', 'b', 'c'][i]])
+    assert len(list(tmp_path.glob('manifest-*.json'))) == KEEP_MANIFESTS
+    assert not opened_by_reader & _segment_names(tmp_path)
+    # Files already mapped by a reader outlive their collection.
+    assert reader.similarity_search('alpha', k=1)[0].id == 'a'
+    assert sorted(NumpyVectorStore(tmp_path, embeddings).get(include=[])['ids']) == ['d', 'e', 'f']
@@ -0,0 +1,93 @@
+import multiprocessing
+import os
+import re
+
+from fastapi.testclient import TestClient
+
+from apps.api.main import app
+from apps.api.services.metrics_collector import MetricsCollector, metrics_collector
+from apps.api.services.prometheus import MultiprocessStore, exposition
+
+
+def _samples(text):
+    """`{(metric, labels): value}` from Prometheus text, with labels as a sorted tuple of pairs."""
+
+    samples = {}
+    for line in text.splitlines():
+        if not line or line.startswith('#'):
+            continue
+        match = re.fullmatch(r'([a-z_]+)(?:\{(.*)\})? (\S+)', line)
+        assert match, line
+        labels = tuple(sorted(re.findall(r'(\w+)="([^"]*)"', match.group(2) or '')))
+        samples[(match.group(1), labels)] = float(match.group(3))
+    return samples
+
+
+def _collector(latencies):
+    collector = MetricsCollector()
+    for latency in latencies:
+        collector.record('llm', latency, success=latency < 1000)
+    collector.record_batch('classifier_batching', 8)
+    collector.set_info('model', {'version': 'churn:1'})
+    collector.register_source('prediction_cache', lambda: {'size': 3, 'hit_rate': 0.5})
+    return collector
+
+
+def _exited_worker(directory, latencies):
+    MultiprocessStore(directory).publish(_collector(latencies).export())
+
+
+def test_histogram_series_are_cumulative_and_consistent():
+    collector = MetricsCollector()
+    for latency in (0.4, 3.0, 3.0, 40.0, 700.0, 2000.0):
+        collector.record('classifier', latency, success=latency < 1000)
+    collector.record_stage('classifier.transform', 0.2)
+
+    text = exposition(None, collector)
+    samples = _samples(text)
+
+    assert '# TYPE asfotec_request_latency_seconds histogram' in text
+    assert samples[('asfotec_requests_total', (('endpoint', 'classifier'),))] == 6
+    assert samples[('asfotec_request_errors_total', (('endpoint', 'classifier'),))] == 1
+    buckets = [
+        value for (name, labels), value in samples.items()
+        if name == 'asfotec_request_latency_seconds_bucket' and ('endpoint', 'classifier') in labels
+    ]
+    assert buckets == sorted(buckets) and buckets[-1] == 6
+    assert samples[('asfotec_request_latency_seconds_bucket', (('endpoint', 'classifier'), ('le', '0.005')))] == 3
+    assert samples[('asfotec_request_latency_seconds_bucket', (('endpoint', 'classifier'), ('le', '1')))] == 5
+    assert abs(samples[('asfotec_request_latency_seconds_sum', (('endpoint', 'classifier'),))] - 2.7464) < 1e-6
+    assert samples[('asfotec_stage_latency_seconds_count', (('stage', 'classifier.transform'),))] == 1
+
+
+def test_workers_are_aggregated_through_the_store(tmp_path):
+    ctx = multiprocessing.get_context('spawn')
+    exited = ctx.Process(target=_exited_worker, args=(tmp_path, [10.0, 20.0, 5000.0]))
+    exited.start()
+    exited.join(30)
+    assert exited.exitcode == 0
+
+    store = MultiprocessStore(tmp_path)
+    live = _collector([15.0])  # this process: a live worker, published on scrape
+    samples = _samples(exposition(store, live))
+
+    # Counters and histograms include the worker that has exited.
+    assert samples[('asfotec_requests_total', (('endpoint', 'llm'),))] == 4
+    assert samples[('asfotec_request_errors_total', (('endpoint', 'llm'),))] == 1
+    assert samples[('asfotec_batch_rows_total', (('batcher', 'classifier_batching'),))] == 16
+    # Gauges and info only come from live workers.
+    assert samples[('asfotec_model_info', (('version', 'churn:1'),))] == 1
+    gauges = {labels for name, labels in samples if name == 'asfotec_prediction_cache_size'}
+    assert gauges == {(('worker', str(os.getpid())),)}
+    # Each scrape replaces this worker's file rather than adding to it.
+    assert _samples(exposition(store, live)) == samples
+
+
+def test_metrics_endpoint_serves_prometheus_text():
+    metrics_collector.record('classifier', 12.5)
+
+    resp = TestClient(app).get('/metrics')
+
+    assert resp.status_code == 200
+    assert resp.headers['content-type'].startswith('text/plain; version=0.0.4')
+    assert ('asfotec_requests_total', (('endpoint', 'classifier'),)) in _samples(resp.text)
@@ -0,0 +1,78 @@
+from fastapi.testclient import TestClient
+
+from apps.api.main import app
+from apps.api.services import llm_orchestrator
+from rag.service import RAGService
+
+
+def test_repeated_queries_skip_embedding_and_search(rag_env):
+    service = RAGService()
+    service.ingest_documents([service.docs_path])
+    first = service.retrieve('How do I retrain the classifier?')
+
+    calls = rag_env.calls
+    again = service.retrieve('  how do I   RETRAIN the classifier? ')
+    assert rag_env.calls == calls
+    assert [(d.id, d.page_content) for d in again] == [(d.id, d.page_content) for d in first]
+
+    service.retrieve('How do I retrain the classifier?', top_k=1)
+    assert rag_env.calls == calls  # new top_k searches again but reuses the query embedding
+
+    stats = service.cache_stats()
+    assert stats['query_embedding']['hits'] == 1
+    assert stats['retrieval']['hits'] == 1 and stats['retrieval']['misses'] == 2
+    assert stats['retrieval']['time_saved_ms'] >= 0
+
+
+def test_ingest_bumps_generation_and_invalidates(rag_env, tmp_path, monkeypatch):
+    from apps.api.config.settings import get_settings
+
+    service = RAGService()
+    service.ingest_documents([service.docs_path])
+    serving = RAGService()
+    serving.retrieve('deployment runbook')
+    generation = serving.index_generation()
+
+    # An unchanged re-ingest keeps the generation and the caches.
+    RAGService().ingest_documents([service.docs_path])
+    assert serving.index_generation() == generation
+    assert serving.cache_stats()['retrieval']['size'] == 1
+
+    docs = tmp_path / 'docs'
+    docs.mkdir()
+    (docs / 'runbook.md').write_text('# Deployment runbook\n\nRoll back with the previous image tag.')
+    monkeypatch.setenv('RAG_DOCS_PATH', str(docs))
+    get_settings.cache_clear()
+    RAGService().ingest_documents([docs])
+
+    assert serving.index_generation() == generation + 1
+    assert serving.cache_stats()['retrieval']['size'] == 0
+    results = serving.retrieve('deployment runbook')
+    assert results[0].page_content.startswith('# Deployment runbook')
+
+
+def test_cache_stats_are_in_metrics_overview(rag_env):
+    RAGService().ingest_documents([RAGService().docs_path])
+    orchestrator = llm_orchestrator.get_llm_orchestrator()
+    orchestrator.query('What does the API expose?')
+    orchestrator.query('What does the API expose?')
+
+    overview = TestClient(app).get('/metrics/overview').json()
+    assert overview['components']['rag_cache']['retrieval']['hits'] == 1
+
+
+def test_the_model_sees_the_query_as_typed(rag_env, monkeypatch):
+    from apps.api.config.settings import get_settings
+
+    monkeypatch.setenv('RAG_QUERY_CACHE_MAX_ENTRIES', '0')
+    get_settings.cache_clear()
+    seen = []
+    embed_documents = rag_env.embed_documents
+    monkeypatch.setattr(rag_env, 'embed_query', lambda text: embed_documents(seen.append(text) or [text])[0])
+    monkeypatch.setattr(rag_env, 'embed_documents', lambda texts: embed_documents(seen.extend(texts) or texts))
+
+    service = RAGService()
+    service.embed_query('  Retrain the CLASSIFIER ')
+    service.embed_queries(['API  docs', 'api docs', 'Deploy'])
+    # Normalization only dedupes: the first spelling of each query is what gets embedded.
+    assert seen == ['  Retrain the CLASSIFIER ', 'API  docs', 'Deploy']
@@ -0,0 +1,101 @@
+import pytest
+from chromadb.api.shared_system_client import SharedSystemClient
+from fastapi.testclient import TestClient
+
+from apps.api.config.settings import get_settings
+from apps.api.main import app
+from apps.api.services.llm_orchestrator import get_llm_orchestrator
+from rag.config import UnknownCollection
+from rag.service import RAGService
+
+PRODUCTS = {
+    'billing': 'Invoices are generated on the first business day of each month.',
+    'support': 'Support tickets are triaged within four hours by the on-call agent.',
+    'payroll': 'Payroll runs every second Friday and payslips are emailed afterwards.',
+}
+
+
+@pytest.fixture
+def collections(rag_env, tmp_path, monkeypatch):
+    root = tmp_path / 'collections'
+    for name, text in PRODUCTS.items():
+        (root / name).mkdir(parents=True)
+        (root / name / f'{name}.md').write_text(f'# {name.title()}\n\n{text}\n')
+    monkeypatch.setenv('RAG_COLLECTIONS_PATH', str(root))
+    monkeypatch.setenv('RAG_COLLECTIONS_VECTORSTORE_PATH', str(tmp_path / 'collection_stores'))
+    monkeypatch.setenv('RAG_MAX_RESIDENT_COLLECTIONS', '2')
+    get_settings.cache_clear()
+    RAGService().ingest_documents([RAGService().docs_path])
+    for name in PRODUCTS:
+        service = RAGService(collection=name)
+        service.ingest_documents([service.docs_path])
+        service.close()
+    return root
+
+
+def test_queries_are_answered_from_the_named_collection(collections):
+    client = TestClient(app)
+    for name in PRODUCTS:
+        resp = client.post('/predict/llm', json={'query': 'When does this happen?', 'collection': name})
+        assert resp.status_code == 200
+        body = resp.json()
+        assert body['collection'] == name
+        assert PRODUCTS[name] in body['answer']
+        assert all(source.endswith(f'{name}.md') for source in body['sources'])
+
+    default = client.post('/predict/llm', json={'query': 'What does the API expose?'}).json()
+    assert default['collection'] == 'default'
+    assert not any(PRODUCTS[name] in default['answer'] for name in PRODUCTS)
+
+
+def test_least_recently_used_collection_is_evicted(collections):
+    registry = get_llm_orchestrator().collections
+    billing = registry.get('billing')
+    registry.get('support')
+    assert registry.get('billing') is billing  # refreshes billing's recency
+    registry.get('payroll')
+
+    stats = registry.stats()
+    assert stats['resident'] == ['default', 'billing', 'payroll']
+    assert stats['opens'] == 3 and stats['evictions'] == 1
+    assert registry.get('support') is not None  # reopened on demand
+    assert registry.stats()['resident'] == ['default', 'payroll', 'support']
+
+
+def test_evicted_collection_is_closed_once_its_requests_finish(collections):
+    registry = get_llm_orchestrator().collections
+    open_systems = SharedSystemClient._identifier_to_system
+
+    support = registry.get('support')
+    support.retrieve('tickets')
+    with registry.use('billing') as billing:
+        billing.retrieve('invoices')
+        registry.get('payroll')  # evicts support, which nobody is using
+        assert str(support.vectorstore_path) not in open_systems
+        registry.get('support')  # evicts billing while this request still holds it
+        assert str(billing.vectorstore_path) in open_systems
+        assert billing.retrieve('invoices')[0].page_content.endswith(PRODUCTS['billing'])
+    assert str(billing.vectorstore_path) not in open_systems
+    assert registry.stats()['closes'] == 2
+
+
+def test_architecture_reports_collection_size_and_residency(collections):
+    client = TestClient(app)
+    client.post('/predict/llm', json={'query': 'invoices', 'collection': 'billing'})
+
+    rag = client.get('/meta/architecture').json()['models']['rag_llm']
+    described = {entry['name']: entry for entry in rag['collections']}
+    assert list(described) == ['default', 'billing', 'payroll', 'support']
+    assert all(entry['ingested'] and entry['chunks'] >= 1 for entry in described.values())
+    assert described['billing']['resident'] and described['billing']['queries'] == 1
+    assert not described['support']['resident']
+    assert rag['max_resident_collections'] == 2
+
+
+def test_unknown_or_unsafe_collection_is_404(collections):
+    client = TestClient(app)
+    for name in ('marketing', '../chroma_db'):
+        assert client.post('/predict/llm', json={'query': 'x', 'collection': name}).status_code == 404
+        assert client.post('/predict/llm/stream', json={'query': 'x', 'collection': name}).status_code == 404
+    with pytest.raises(UnknownCollection):
+        RAGService(collection='../etc')
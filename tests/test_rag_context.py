@@ -0,0 +1,111 @@
+import re
+import shutil
+
+import pytest
+from fastapi.testclient import TestClient
+from langchain_core.documents import Document
+from langchain_text_splitters import RecursiveCharacterTextSplitter
+
+from apps.api.config.settings import get_settings
+from apps.api.main import app
+from rag.context import count_tokens, mmr_order, pack_context
+from rag.service import RAGService
+
+RUNBOOK = ' '.join(f'Step {i}: restart worker_{i} and confirm the health check passes.' for i in range(60))
+
+
+def _chunks(text=RUNBOOK, source='runbook.md'):
+    splitter = RecursiveCharacterTextSplitter(chunk_size=800, chunk_overlap=100)
+    return splitter.split_documents([Document(page_content=text, metadata={'source': source})])
+
+
+def _words(text):
+    return re.findall(r'\w+', text)
+
+
+def test_overlapping_chunks_are_packed_without_repeats():
+    chunks = _chunks()
+    assert len(chunks) > 3
+
+    for order in (chunks, chunks[::-1]):
+        packed = pack_context(order)
+        assert sorted(_words(packed.text)) == sorted(_words(RUNBOOK))
+        assert packed.tokens_saved > 0
+        assert packed.tokens + packed.tokens_saved == count_tokens('\n\n'.join(c.page_content for c in order))
+
+    # The same text under another source is not treated as overlap.
+    other = Document(page_content=chunks[1].page_content, metadata={'source': 'copy.md'})
+    assert len(pack_context([chunks[0], chunks[1], other]).documents) == 3
+    assert len(pack_context([chunks[0], chunks[0]]).documents) == 1
+
+
+def test_context_is_packed_into_the_token_budget():
+    chunks = _chunks()
+    packed = pack_context(chunks, token_budget=300)
+    assert packed.tokens <= 300
+    assert 0 < len(packed.documents) < len(chunks)
+    assert packed.documents[0] is chunks[0]
+
+    # A first chunk larger than the budget is truncated, not dropped.
+    single = pack_context(chunks[:1], token_budget=20)
+    assert 0 < single.tokens <= 20
+    assert chunks[0].page_content.startswith(single.text)
+
+
+def test_mmr_prefers_novel_chunks_and_drops_near_duplicates():
+    query = [1.0, 0.0, 0.0]
+    docs = [[1.0, 0.1, 0.0], [1.0, 0.1, 0.001], [0.7, 0.0, 0.7]]
+    assert mmr_order(query, docs, lambda_mult=1.0) == [0, 2]
+    assert mmr_order(query, docs, lambda_mult=0.5) == [0, 2]
+    assert mmr_order(query, [[0.9, 0.4, 0.0], [1.0, 0.0, 0.0]], lambda_mult=0.5) == [1, 0]
+
+
+def test_answer_reports_tokens_saved(rag_env, tmp_path, monkeypatch):
+    docs = tmp_path / 'docs'
+    docs.mkdir()
+    (docs / 'runbook.md').write_text(RUNBOOK)
+    monkeypatch.setenv('RAG_DOCS_PATH', str(docs))
+    monkeypatch.setenv('RAG_TOP_K', '4')
+    get_settings.cache_clear()
+    RAGService().ingest_documents([docs])
+
+    plain = RAGService().answer('restart worker health check', retrieval_mode='vector')
+    assert len(plain['sources']) == 4
+    assert plain['context_tokens_saved'] > 0
+
+    # Every runbook chunk uses the same words, so to the hashing embeddings they are near-duplicates.
+    monkeypatch.setenv('RAG_CONTEXT_MMR_LAMBDA', '0.7')
+    get_settings.cache_clear()
+    service = RAGService()
+    calls = rag_env.calls
+    diverse = service.answer('restart worker health check', retrieval_mode='vector')
+    assert rag_env.calls == calls + 1  # chunk vectors are read back from the store; only the query is embedded
+    assert len(diverse['sources']) < 4
+    assert diverse['context_tokens_saved'] > plain['context_tokens_saved']
+    assert service.retrieval_stats()['context']['chunks_dropped'] == 4 - len(diverse['sources'])
+
+    response = TestClient(app).post('/predict/llm', json={'query': 'restart worker health check'}).json()
+    assert response['context_tokens_saved'] > 0
+    assert response['context_tokens_estimate'] <= get_settings().rag_context_token_budget
+
+
+@pytest.mark.parametrize('backend', ['chroma', 'numpy'])
+def test_mmr_reads_stored_vectors_and_never_writes_the_ingest_cache(rag_env, tmp_path, monkeypatch, backend):
+    docs = tmp_path / 'docs'
+    docs.mkdir()
+    (docs / 'runbook.md').write_text(RUNBOOK)
+    monkeypatch.setenv('RAG_DOCS_PATH', str(docs))
+    monkeypatch.setenv('RAG_TOP_K', '4')
+    monkeypatch.setenv('RAG_VECTOR_BACKEND', backend)
+    get_settings.cache_clear()
+    RAGService().ingest_documents([docs])
+    shutil.rmtree(get_settings().rag_embedding_cache_dir)
+
+    monkeypatch.setenv('RAG_CONTEXT_MMR_LAMBDA', '0.7')
+    get_settings.cache_clear()
+    texts = rag_env.texts_embedded
+    answer = RAGService().answer('restart worker health check', retrieval_mode='vector')
+
+    assert len(answer['sources']) < 4  # near-duplicates dropped, so MMR ran
+    assert rag_env.texts_embedded == texts + 1  # the query alone
+    assert not get_settings().rag_embedding_cache_dir.exists()
@@ -0,0 +1,199 @@
+import shutil
+
+import pytest
+from langchain_chroma import Chroma
+
+from rag.manifest import IngestManifest
+from rag.service import RAGService
+
+
+@pytest.fixture
+def docs(rag_env, tmp_path, monkeypatch):
+    from apps.api.config.settings import get_settings
+
+    docs_path = tmp_path / 'docs'
+    shutil.copytree(RAGService().docs_path, docs_path)
+    sections = [f'## Runbook step {i}\n\n' + f'Step {i} checks service {i} and restarts worker {i}. ' * 12 for i in range(8)]
+    (docs_path / 'runbook.md').write_text('\n\n'.join(sections))
+    monkeypatch.setenv('RAG_DOCS_PATH', str(docs_path))
+    get_settings.cache_clear()
+    return docs_path
+
+
+def _ids(service):
+    return set(service._open_vectorstore().get(include=[])['ids'])
+
+
+def test_reingest_without_changes_embeds_nothing(docs, rag_env):
+    service = RAGService()
+    first = service.ingest_documents([docs])
+    assert first.full_rebuild and first.added_chunks == first.total_chunks > 0
+
+    embedded = rag_env.texts_embedded
+    second = RAGService().ingest_documents([docs])
+    assert rag_env.texts_embedded == embedded
+    assert (second.added_chunks, second.deleted_chunks, second.changed_files) == (0, 0, 0)
+    assert second.unchanged_files == len(list(docs.glob('*.md')))
+    assert len(_ids(service)) == first.total_chunks
+
+
+def test_edits_and_removals_only_touch_affected_chunks(docs, rag_env):
+    service = RAGService()
+    service.ingest_documents([docs])
+    manifest = IngestManifest.load(service.vectorstore_path)
+    edited, removed = 'runbook.md', 'asfotec_job.md'
+    edited_chunks = set(manifest.files[edited]['chunks'])
+    assert len(edited_chunks) > 3
+
+    path = docs / edited
+    path.write_text(path.read_text() + '\n\nNew section: the API now supports incremental ingestion.\n')
+    (docs / removed).unlink()
+    embedded = rag_env.texts_embedded
+
+    stats = RAGService().ingest_documents([docs])
+    after = _ids(service)
+
+    assert stats.changed_files == 1 and stats.removed_files == 1
+    # Only the tail chunk(s) of the edited file are re-embedded; the rest keep their vectors.
+    assert 1 <= rag_env.texts_embedded - embedded == stats.added_chunks <= 2
+    assert len(edited_chunks & after) >= len(edited_chunks) - 1
+    assert not (set(manifest.files[removed]['chunks']) & after)
+    current = IngestManifest.load(service.vectorstore_path)
+    assert after == set().union(*(current.chunk_ids(source) for source in current.files))
+    assert removed not in current.files
+
+    results = RAGService().retrieve('incremental ingestion', top_k=1)
+    assert 'incremental ingestion' in results[0].page_content
+
+
+def test_embedding_model_change_forces_full_rebuild(docs, rag_env, monkeypatch):
+    from apps.api.config.settings import get_settings
+
+    first = RAGService().ingest_documents([docs])
+    monkeypatch.setenv('EMBEDDING_MODEL_NAME', 'another-model')
+    get_settings.cache_clear()
+
+    stats = RAGService().ingest_documents([docs])
+    assert stats.full_rebuild
+    assert stats.added_chunks == stats.total_chunks == first.total_chunks
+
+
+def test_embedding_dimension_change_recreates_the_collection(docs, rag_env, monkeypatch):
+    from apps.api.config.settings import get_settings
+    from tests.conftest import HashingEmbeddings
+
+    first = RAGService().ingest_documents([docs])
+    monkeypatch.setenv('EMBEDDING_MODEL_NAME', 'smaller-model')
+    get_settings.cache_clear()
+
+    service = RAGService(embeddings=HashingEmbeddings(size=32))
+    stats = service.ingest_documents([docs])
+    assert stats.full_rebuild and stats.added_chunks == stats.total_chunks == first.total_chunks
+    assert len(_ids(service)) == first.total_chunks
+    assert service.retrieve('incremental ingestion', top_k=1)
+
+
+@pytest.fixture
+def corpus(docs, monkeypatch):
+    from apps.api.config.settings import get_settings
+
+    for i in range(5):
+        (docs / f'extra_{i}.md').write_text(f'# Extra {i}\n\n' + f'Extra document {i} covers topic {i} in depth. ' * 30)
+    monkeypatch.setenv('RAG_INGEST_BATCH_SIZE', '2')
+    get_settings.cache_clear()
+    return docs
+
+
+def _interrupt_after(monkeypatch, files):
+    import rag.service
+
+    real = rag.service.sha256_file
+    calls = []
+
+    def flaky(path, *args):
+        calls.append(path)
+        if len(calls) > files:
+            raise RuntimeError('disk went away')
+        return real(path, *args)
+
+    monkeypatch.setattr('rag.service.sha256_file', flaky)
+    return lambda: monkeypatch.setattr('rag.service.sha256_file', real)
+
+
+def test_ingest_checkpoints_batches_and_resumes(corpus, rag_env, monkeypatch):
+    service = RAGService()
+    restore = _interrupt_after(monkeypatch, 5)
+    with pytest.raises(RuntimeError):
+        service.ingest_documents([corpus])
+
+    # Completed batches are already in the store and recorded in the manifest.
+    partial = IngestManifest.load(service.vectorstore_path)
+    assert 0 < len(partial.files) < 8 and partial.generation >= 1
+    stored = _ids(service)
+    assert stored == set().union(*(partial.chunk_ids(source) for source in partial.files))
+    assert RAGService().index_generation() == partial.generation
+
+    restore()
+    stats = RAGService().ingest_documents([corpus])
+    assert stats.unchanged_files == len(partial.files)
+    assert stats.added_chunks == stats.total_chunks - len(stored)
+    assert stats.checkpoints >= 2
+    final = IngestManifest.load(service.vectorstore_path)
+    assert len(final.files) == 8 and not final.rebuild_in_progress
+    assert _ids(service) == set().union(*(final.chunk_ids(source) for source in final.files))
+
+
+def test_interrupted_full_rebuild_resumes_as_a_rebuild(corpus, rag_env, monkeypatch):
+    first = RAGService().ingest_documents([corpus])
+    restore = _interrupt_after(monkeypatch, 4)
+    with pytest.raises(RuntimeError):
+        RAGService().ingest_documents([corpus], full_rebuild=True)
+    partial = IngestManifest.load(RAGService().vectorstore_path)
+    assert partial.rebuild_in_progress
+    rebuilt = sum(len(partial.chunk_ids(source)) for source in partial.files)
+
+    restore()
+    stats = RAGService().ingest_documents([corpus])
+    # The rebuild emptied the collection, so files the interrupted run had not reached are embedded now.
+    assert stats.full_rebuild and stats.resumed_rebuild
+    assert stats.unchanged_files == len(partial.files)
+    assert stats.added_chunks == first.total_chunks - rebuilt
+
+
+def test_split_worker_processes_match_in_process_split(corpus, rag_env, monkeypatch, tmp_path):
+    from apps.api.config.settings import get_settings
+
+    in_process = RAGService()
+    in_process.ingest_documents([corpus])
+
+    monkeypatch.setenv('RAG_SPLIT_PROCESSES', '2')
+    monkeypatch.setenv('RAG_VECTORSTORE_PATH', str(tmp_path / 'parallel_db'))
+    get_settings.cache_clear()
+    parallel = RAGService()
+    parallel.ingest_documents([corpus])
+
+    assert _ids(parallel) == _ids(in_process)
+    assert IngestManifest.load(parallel.vectorstore_path).files == IngestManifest.load(in_process.vectorstore_path).files
+
+
+def test_ingest_updates_the_lexical_index_without_reading_the_store(docs, rag_env, monkeypatch):
+    from rag.bm25 import BM25_FILE, BM25Index
+
+    service = RAGService()
+    service.ingest_documents([docs])
+    saved = (service.vectorstore_path / BM25_FILE).stat().st_mtime_ns
+    reads = []
+    real_get = Chroma.get
+    monkeypatch.setattr(Chroma, 'get', lambda self, *a, **kw: reads.append(kw.get('include')) or real_get(self, *a, **kw))
+
+    RAGService().ingest_documents([docs])
+    assert (service.vectorstore_path / BM25_FILE).stat().st_mtime_ns == saved
+
+    (docs / 'runbook.md').write_text('# Runbook\n\nRestart the E4127 watcher.\n')
+    (docs / 'asfotec_job.md').unlink()
+    RAGService().ingest_documents([docs])
+    assert reads == [[], []]  # only the id listing at the start of each ingest
+
+    index = BM25Index.load(service.vectorstore_path)
+    assert sorted(index.live_ids()) == sorted(_ids(service))
+    assert index.search('E4127', k=1)[0][0].page_content.endswith('Restart the E4127 watcher.')
@@ -0,0 +1,105 @@
+import pytest
+from fastapi.testclient import TestClient
+
+from apps.api.main import app
+from rag.bm25 import BM25Index, looks_like_identifier_query
+from rag.service import RAGService
+
+
+@pytest.fixture
+def service(rag_env, tmp_path, monkeypatch):
+    from apps.api.config.settings import get_settings
+
+    docs = tmp_path / 'docs'
+    docs.mkdir()
+    for path in RAGService().docs_path.glob('*.md'):
+        (docs / path.name).write_text(path.read_text())
+    (docs / 'config.md').write_text(
+        '# Configuration\n\nSet MODEL_WATCH_INTERVAL_S to 0 to disable the Production watcher.\n\n'
+        'Error E4127 means the vector store is missing; run rag/ingest.py.'
+    )
+    monkeypatch.setenv('RAG_DOCS_PATH', str(docs))
+    monkeypatch.setenv('RAG_RETRIEVAL_MODE', 'auto')
+    get_settings.cache_clear()
+    service = RAGService()
+    service.ingest_documents([docs])
+    return service
+
+
+def test_identifier_queries_skip_the_embedding_model(service, rag_env):
+    assert BM25Index.load(service.vectorstore_path) is not None
+    calls = rag_env.calls
+
+    result = service.search('MODEL_WATCH_INTERVAL_S', top_k=1)
+    assert result.path == 'lexical'
+    assert 'MODEL_WATCH_INTERVAL_S' in result.documents[0].page_content
+    assert service.search('E4127', top_k=1).documents[0].page_content.endswith('run rag/ingest.py.')
+    assert rag_env.calls == calls
+
+    assert service.search('How is the classifier retrained?').path == 'vector'
+    assert rag_env.calls == calls + 1
+    assert service.retrieval_stats()['paths'] == {'lexical': 2, 'vector': 1}
+
+
+def test_auto_falls_back_to_vector_when_lexical_finds_nothing(service):
+    assert service.search('XYZ_UNKNOWN_KEY').path == 'vector'
+
+
+def test_vector_search_stays_the_default(rag_env):
+    service = RAGService()
+    service.ingest_documents([service.docs_path])
+    assert service.settings.rag_retrieval_mode == 'vector'
+    assert service.search('API docs').path == 'vector'
+
+
+def test_hybrid_fuses_both_rankings(service):
+    result = service.search('watcher interval MODEL_WATCH_INTERVAL_S', top_k=2, mode='hybrid')
+    assert result.path == 'hybrid'
+    assert 'MODEL_WATCH_INTERVAL_S' in result.documents[0].page_content
+
+    with pytest.raises(ValueError):
+        service.search('anything', mode='fuzzy')
+
+
+def test_mode_is_selectable_per_request(service):
+    client = TestClient(app)
+    resp = client.post('/predict/llm', json={'query': 'How is the classifier retrained?', 'retrieval_mode': 'lexical'})
+    assert resp.status_code == 200
+    assert resp.json()['retrieval_path'] == 'lexical'
+
+    resp = client.post('/predict/llm', json={'query': 'How is the classifier retrained?'})
+    assert resp.json()['retrieval_path'] == 'vector'
+    assert client.post('/predict/llm', json={'query': 'x', 'retrieval_mode': 'fuzzy'}).status_code == 422
+
+
+@pytest.mark.parametrize('query, expected', [
+    ('MODEL_WATCH_INTERVAL_S', True),
+    ('error E4127', True),
+    ('/predict/llm 500', True),
+    ('How do I retrain the classifier?', False),
+])
+def test_identifier_detection(query, expected):
+    assert looks_like_identifier_query(query) is expected
+
+
+def test_bm25_updates_in_place_match_a_fresh_build(tmp_path):
+    texts = {f'c{i}': f'chunk {i} sets MODEL_OPTION_{i % 4} for worker {i % 3}' for i in range(12)}
+    index = BM25Index.build(list(texts), list(texts.values()), [{}] * len(texts))
+    index.remove(['c1', 'c2', 'c3'])
+    texts['c4'] = 'chunk 4 now documents error E4127'
+    index.add(['c4', 'c12'], [texts['c4'], 'chunk 12 restarts worker 2'], [{}, {}])
+    index.save(tmp_path)
+    for doc_id in ('c1', 'c2', 'c3'):
+        del texts[doc_id]
+    texts['c12'] = 'chunk 12 restarts worker 2'
+
+    fresh = BM25Index.build(list(texts), list(texts.values()), [{}] * len(texts))
+    for updated in (index, BM25Index.load(tmp_path)):
+        assert len(updated) == len(fresh) and sorted(updated.live_ids()) == sorted(texts)
+        for query in ('model_option_1 worker', 'E4127', 'worker 2 restarts'):
+            got = {doc.id: score for doc, score in updated.search(query, k=20)}
+            expected = {doc.id: score for doc, score in fresh.search(query, k=20)}
+            assert got == pytest.approx(expected)
+
+    index.remove(list(texts)[:6])
+    assert not index.deleted and len(index.ids) == len(index) == len(texts) - 6  # compacted
@@ -0,0 +1,84 @@
+import json
+import os
+import signal
+import socket
+import subprocess
+import sys
+import time
+import urllib.request
+from pathlib import Path
+
+import pytest
+
+from apps.api.server import child_pids, worker_memory
+from apps.api.services import model_service as model_service_module
+
+ROOT = Path(__file__).resolve().parent.parent
+
+
+def _free_port():
+    with socket.socket() as sock:
+        sock.bind(('127.0.0.1', 0))
+        return sock.getsockname()[1]
+
+
+def _start(workers, preload):
+    port = _free_port()
+    flag = '--preload' if preload else '--no-preload'
+    proc = subprocess.Popen(
+        [sys.executable, '-m', 'apps.api.server', '--host', '127.0.0.1', '--port', str(port),
+         '--workers', str(workers), flag],
+        cwd=ROOT, stderr=subprocess.PIPE, text=True,
+    )
+    ready = 0
+    deadline = time.monotonic() + 120
+    while ready < workers and time.monotonic() < deadline:
+        line = proc.stderr.readline()
+        if not line:
+            break
+        ready += 'Worker' in line and 'ready' in line
+    assert ready == workers, f'only {ready}/{workers} workers became ready'
+    return proc, port
+
+
+def _stop(proc):
+    proc.send_signal(signal.SIGTERM)
+    try:
+        proc.wait(timeout=20)
+    except subprocess.TimeoutExpired:
+        proc.kill()
+
+
+def test_preloaded_service_starts_background_workers_after_fork(app_env):
+    model_service_module.get_model_service.cache_clear()
+    service = model_service_module.preload_model_service()
+    try:
+        assert service.version is not None
+        assert service.publisher is None and service._batcher is None
+
+        assert model_service_module.get_model_service() is service
+        assert service._batcher is not None
+    finally:
+        service.close()
+        model_service_module._preloaded_service = None
+        model_service_module.get_model_service.cache_clear()
+
+
+@pytest.mark.skipif(not os.path.exists('/proc/self/smaps_rollup'), reason='needs Linux smaps_rollup')
+def test_preload_shares_model_memory_between_workers(app_env):
+    footprints = {}
+    for preload in (False, True):
+        proc, port = _start(workers=2, preload=preload)
+        try:
+            with urllib.request.urlopen(f'http://127.0.0.1:{port}/health', timeout=10) as response:
+                assert json.load(response) == {'status': 'ok'}
+            workers = child_pids(proc.pid)
+            assert len(workers) == 2
+            footprints[preload] = [worker_memory(pid) for pid in workers]
+        finally:
+            _stop(proc)
+
+    pss = {preload: sum(usage['pss'] for usage in usages) for preload, usages in footprints.items()}
+    shared = {preload: min(usage['shared'] for usage in usages) for preload, usages in footprints.items()}
+    assert shared[True] > shared[False]
+    assert pss[True] < pss[False]
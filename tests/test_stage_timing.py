@@ -0,0 +1,75 @@
+import contextlib
+
+from fastapi.testclient import TestClient
+
+from apps.api import timing
+from apps.api.main import app
+from apps.api.services.metrics_collector import metrics_collector
+from apps.api.services.model_service import get_model_service
+from rag.service import RAGService
+
+
+def _server_timing(resp):
+    stages = {}
+    for entry in resp.headers['server-timing'].split(', '):
+        name, duration = entry.split(';dur=')
+        stages[name] = float(duration)
+    return stages
+
+
+def test_classifier_breakdown_only_when_requested(model_service, training_sample):
+    features = training_sample.head(1).to_dict(orient='records')[0]
+    app.dependency_overrides[get_model_service] = lambda: model_service
+    try:
+        client = TestClient(app)
+        plain = client.post('/predict/classifier', json={'features': features})
+        timed = client.post('/predict/classifier', json={'features': features}, headers={'X-Stage-Timing': '1'})
+        batch = client.post(
+            '/predict/classifier/batch', json={'items': [features] * 3}, headers={'X-Stage-Timing': '1'}
+        )
+    finally:
+        app.dependency_overrides.clear()
+
+    assert plain.status_code == timed.status_code == 200
+    assert 'server-timing' not in plain.headers
+    # The single request is scored on the micro-batcher thread and still gets its stages.
+    stages = _server_timing(timed)
+    assert {'classifier.transform', 'classifier.predict_proba'} <= set(stages)
+    assert all(duration >= 0 for duration in stages.values())
+    assert 'classifier.predict_proba' in _server_timing(batch)
+
+    aggregated = metrics_collector.snapshot()['stages']
+    assert aggregated['classifier.predict_proba']['count'] >= 2
+    assert 'p99_latency_ms' in aggregated['classifier.transform']
+
+
+def test_llm_breakdown_covers_retrieval_and_generation(rag_env):
+    RAGService().ingest_documents([RAGService().docs_path])
+    client = TestClient(app)
+
+    resp = client.post(
+        '/predict/llm',
+        json={'query': 'How is the classifier retrained?', 'retrieval_mode': 'hybrid'},
+        headers={'X-Stage-Timing': '1'},
+    )
+
+    assert resp.status_code == 200
+    stages = _server_timing(resp)
+    for name in ('rag.embed_query', 'rag.vector_search', 'rag.lexical_search', 'rag.context', 'llm.generate'):
+        assert name in stages
+    assert sum(stages.values()) <= resp.json()['latency_ms'] + 5
+
+
+def test_stage_is_a_no_op_without_sink_or_breakdown(monkeypatch):
+    recorded = []
+    monkeypatch.setattr(timing, '_sink', None)
+    assert isinstance(timing.stage('anything'), contextlib.nullcontext)
+
+    monkeypatch.setattr(timing, '_sink', lambda name, ms: recorded.append(name))
+    with timing.stage('rag.context'):
+        pass
+    with timing.collect_breakdown() as breakdown:
+        with timing.stage('llm.generate'):
+            pass
+    assert recorded == ['rag.context', 'llm.generate']
+    assert list(breakdown.as_dict()) == ['llm.generate']